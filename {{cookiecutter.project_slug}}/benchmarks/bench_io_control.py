@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Throughput of the streaming record reader and batched writer (clibones/io_control.py) compared to the
+straightforward line-at-a-time approaches.
+
+Usage:
+
+    python3 benchmarks/bench_io_control.py --size 256M
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_util import MB, BenchmarkResults, argument_parser, finish, measure
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import size_arg
+from {{cookiecutter.project_slug}}.clibones.io_control import RecordWriter, iter_record_blocks, iter_records, open_input
+
+RECORD = b"2024-06-01T12:00:00 INFO some.module: a typical log or csv style record of about eighty bytes\n"
+
+
+def make_input(path: Path, size: int) -> int:
+    """Write about size bytes of records to path, returning the number of records."""
+    count = max(1, size // len(RECORD))
+    block = RECORD * 10_000
+    with path.open("wb") as fp:
+        for _ in range(count // 10_000):
+            fp.write(block)
+        fp.write(RECORD * (count % 10_000))
+    return count
+
+
+def count_lines(path: Path) -> int:
+    with path.open("rb") as fp:
+        return sum(1 for _ in fp)
+
+
+def count_records(path: Path, buffer_size: int) -> int:
+    with open_input(path, buffer_size) as fp:
+        return sum(1 for _ in iter_records(fp, chunk_size=buffer_size))
+
+
+def count_record_blocks(path: Path, buffer_size: int) -> int:
+    with open_input(path, buffer_size) as fp:
+        return sum(len(block) for block in iter_record_blocks(fp, chunk_size=buffer_size))
+
+
+def write_lines(path: Path, records: list[bytes]) -> None:
+    with path.open("wb") as fp:
+        for record in records:
+            fp.write(record + b"\n")
+
+
+def write_batched(path: Path, records: list[bytes], buffer_size: int) -> None:
+    with path.open("wb", buffering=buffer_size) as fp, RecordWriter(fp) as writer:
+        for record in records:
+            writer.write(record)
+
+
+def main() -> int:
+    parser = argument_parser(__doc__ or "")
+    parser.add_argument("--size", type=size_arg, default=256 * MB, help="Input size.  (default: %(default)s)")
+    parser.add_argument("--buffer-size", type=size_arg, default=MB, help="Buffer size.  (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = BenchmarkResults(f"Record I/O throughput ({args.size / MB:.0f} MiB input)")
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = Path(tmp) / "records.txt"
+        count = make_input(plain, args.size)
+        compressed = Path(tmp) / "records.txt.gz"
+        with plain.open("rb") as src, gzip.open(compressed, "wb", compresslevel=1) as dst:
+            while chunk := src.read(args.buffer_size):
+                dst.write(chunk)
+
+        size_mb = plain.stat().st_size / MB
+        results.add("read: for line in file", measure(lambda: count_lines(plain), args.repeat), size_mb, "MiB")
+        results.add(
+            "read: iter_records",
+            measure(lambda: count_records(plain, args.buffer_size), args.repeat),
+            size_mb,
+            "MiB",
+        )
+        results.add(
+            "read: iter_record_blocks",
+            measure(lambda: count_record_blocks(plain, args.buffer_size), args.repeat),
+            size_mb,
+            "MiB",
+        )
+        results.add(
+            "read: iter_records (gzip input)",
+            measure(lambda: count_records(compressed, args.buffer_size), args.repeat),
+            size_mb,
+            "MiB",
+        )
+
+        records = list(iter_records(io.BytesIO(plain.read_bytes()[: 64 * MB])))
+        output = Path(tmp) / "output.txt"
+        results.add(
+            "write: fp.write per record",
+            measure(lambda: write_lines(output, records), args.repeat),
+            len(records),
+            "records",
+        )
+        results.add(
+            "write: RecordWriter batches",
+            measure(lambda: write_batched(output, records, args.buffer_size), args.repeat),
+            len(records),
+            "records",
+        )
+        sys.stdout.write(f"{count:,} records\n")
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
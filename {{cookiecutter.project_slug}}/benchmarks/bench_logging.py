@@ -0,0 +1,137 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Logging throughput of the LoggerControl (clibones/logger_control.py) configurations:
+
+* the handlers LoggerControl.setup() adds: stdout only and stdout with --logfile,
+* the stdout handler with each of LOGURU_FORMAT, LOGURU_MEDIUM_FORMAT and LOGURU_SHORT_FORMAT,
+* messages emitted (logger.info) and filtered out by the level (logger.debug at INFO).
+
+Each configuration reports messages per second, the p99 latency of a single call, the peak bytes allocated
+while logging a message and the memory blocks left allocated per message (which should be 0).  stdout is
+redirected to /dev/null, so the cost is formatting and writing, without a terminal, and the output is not
+colorized, as when it is piped.  The per call latencies include the timer overhead of about 50 ns.
+
+Save the results to compare them across versions, see the benchmark-logging task.  Usage:
+
+    python3 benchmarks/bench_logging.py --messages 100000 --json metrics/bench-logging.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from bench_util import BenchmarkResults, argument_parser, finish, measure
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.logger_control import (
+    LOGURU_FORMAT,
+    LOGURU_MEDIUM_FORMAT,
+    LOGURU_SHORT_FORMAT,
+    LoggerControl,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+FORMATS: dict[str, str] = {
+    "LOGURU_FORMAT": LOGURU_FORMAT,
+    "LOGURU_MEDIUM_FORMAT": LOGURU_MEDIUM_FORMAT,
+    "LOGURU_SHORT_FORMAT": LOGURU_SHORT_FORMAT,
+}
+
+LATENCY_SAMPLES = 10_000
+"""The individually timed calls for the p99 latency."""
+
+ALLOCATION_SAMPLES = 1_000
+"""The calls traced for the allocations, tracemalloc slows them down considerably."""
+
+
+def log_messages(log: Callable[..., None], count: int) -> None:
+    for index in range(count):
+        log("benchmark message {}", index)
+
+
+def p99_latency(log: Callable[..., None]) -> float:
+    """The 99th percentile seconds of a single call."""
+    latencies = []
+    for index in range(LATENCY_SAMPLES):
+        start = time.perf_counter_ns()
+        log("benchmark message {}", index)
+        latencies.append(time.perf_counter_ns() - start)
+    return statistics.quantiles(latencies, n=100)[98] / 1e9
+
+
+def allocations(log: Callable[..., None]) -> tuple[float, float]:
+    """The mean peak bytes allocated while logging a message and the memory blocks left allocated per message."""
+    log_messages(log, ALLOCATION_SAMPLES)
+    blocks = sys.getallocatedblocks()
+    log_messages(log, ALLOCATION_SAMPLES)
+    retained = (sys.getallocatedblocks() - blocks) / ALLOCATION_SAMPLES
+    peaks = []
+    tracemalloc.start()
+    try:
+        for index in range(ALLOCATION_SAMPLES):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            log("benchmark message {}", index)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks), retained
+
+
+def run(results: BenchmarkResults, name: str, log: Callable[..., None], args: argparse.Namespace) -> None:
+    log_messages(log, 1000)
+    timings = measure(lambda: log_messages(log, args.messages), args.repeat)
+    p99 = p99_latency(log)
+    peak_bytes, retained_blocks = allocations(log)
+    result = results.add(
+        name, timings, args.messages, "msgs", p99_seconds=p99, peak_bytes=peak_bytes, retained_blocks=retained_blocks
+    )
+    sys.stderr.write(
+        f"{name}: {result.rate or 0:,.0f} msgs/s, p99 {p99 * 1e6:.1f} us, "
+        f"{peak_bytes:,.0f} bytes peak, {retained_blocks:.2f} blocks retained per message\n"
+    )
+
+
+def main() -> int:
+    parser = argument_parser(__doc__ or "")
+    parser.add_argument("--messages", type=int, default=20_000, help="Messages per run.  (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = BenchmarkResults(f"Logging throughput ({args.messages:,} messages per run)")
+    stdout = sys.stdout
+    with tempfile.TemporaryDirectory() as tmp, Path(os.devnull).open("w") as devnull:
+        try:
+            with contextlib.redirect_stdout(devnull):
+                for logfile in (None, Path(tmp, "bench.log")):
+                    control = LoggerControl()
+                    control.setup(argparse.Namespace(loglevel="INFO", logfile=logfile))
+                    handlers = "stdout + --logfile" if logfile else "stdout"
+                    run(results, f"{handlers}, emitted", logger.info, args)
+                    run(results, f"{handlers}, filtered", logger.debug, args)
+                for format_name, log_format in FORMATS.items():
+                    # the stdout handler of LoggerControl.set_level() with the format
+                    logger.remove()
+                    logger.add(sys.stdout, level="INFO", format=log_format)
+                    run(results, f"stdout {format_name}, emitted", logger.info, args)
+        finally:
+            logger.remove()
+            logger.add(stdout)
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
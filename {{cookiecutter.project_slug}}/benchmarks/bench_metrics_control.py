@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Hot path cost of the metrics (clibones/metrics_control.py) compared to the alternatives.
+
+Usage:
+
+    python3 benchmarks/bench_metrics_control.py --calls 1000000
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import threading
+from typing import Any
+
+from bench_util import BenchmarkResults, argument_parser, finish, measure
+
+from {{cookiecutter.project_slug}}.clibones.metrics_control import MetricsRegistry
+
+
+class LockedCounter:
+    """The usual thread safe alternative."""
+
+    def __init__(self) -> None:
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self.lock:
+            self.value += amount
+
+
+class PlainCounter:
+    """Not thread safe, the lower bound for a method call."""
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+def calls(func: Any, count: int) -> None:
+    for _ in range(count):
+        func()
+
+
+def observe(func: Any, count: int) -> None:
+    for _ in range(count):
+        func(0.003)
+
+
+def main() -> int:
+    parser = argument_parser(__doc__ or "")
+    parser.add_argument("--calls", type=int, default=1_000_000, help="(default: %(default)s)")
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total")
+    histogram = registry.histogram("bench_seconds")
+    benchmarks = {
+        "PlainCounter.inc (not thread safe)": (calls, PlainCounter().inc),
+        "LockedCounter.inc": (calls, LockedCounter().inc),
+        "Counter.inc": (calls, counter.inc),
+        "Histogram.observe": (observe, histogram.observe),
+    }
+
+    results = BenchmarkResults(f"Metrics hot path ({args.calls:,} calls)")
+    for name, (loop, func) in benchmarks.items():
+        timings = measure(functools.partial(loop, func, args.calls), args.repeat)
+        result = results.add(name, timings, args.calls, "calls")
+        sys.stdout.write(f"{name}: {result.best * 1e9 / args.calls:.1f} ns/call\n")
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Core scaling of the memory-mapped, chunk-parallel input processing (clibones/parallel_control.py) on a
+synthetic multi-GB line oriented file.
+
+Usage:
+
+    python3 benchmarks/bench_parallel_control.py --size 4G --jobs 1,2,4,8
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_util import MB, BenchmarkResults, argument_parser, finish, measure
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import size_arg
+from {{cookiecutter.project_slug}}.clibones.io_control import iter_record_blocks, open_input
+from {{cookiecutter.project_slug}}.clibones.parallel_control import available_cpus, map_chunks
+
+LINE = b"2024-06-01T12:00:00,sensor-0042,23.5,ok,some free text that makes the record about 96 bytes long\n"
+
+
+def make_input(path: Path, size: int) -> None:
+    block = LINE * 100_000
+    with path.open("wb") as fp:
+        for _ in range(max(1, size // len(block))):
+            fp.write(block)
+
+
+def field_total(view: memoryview) -> int:
+    """A line oriented workload: parse the third csv field of every line."""
+    return sum(len(line.split(b",", 3)[2]) for line in view.tobytes().splitlines())
+
+
+def sequential(path: Path) -> int:
+    with open_input(path) as fp:
+        return sum(len(line.split(b",", 3)[2]) for block in iter_record_blocks(fp) for line in block)
+
+
+def main() -> int:
+    cpus = available_cpus()
+    default_jobs = ",".join(str(1 << power) for power in range(cpus.bit_length()) if 1 << power <= cpus)
+    parser = argument_parser(__doc__ or "")
+    parser.add_argument("--size", type=size_arg, default=2 << 30, help="Input size.  (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=size_arg, default=64 * MB, help="(default: %(default)s)")
+    parser.add_argument("--jobs", default=default_jobs, help="Worker counts to measure.  (default: %(default)s)")
+    parser.set_defaults(repeat=3)
+    args = parser.parse_args()
+    logger.remove(None)
+
+    results = BenchmarkResults(f"Chunk-parallel processing ({args.size / MB:,.0f} MiB input, {cpus} CPUs)")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.csv"
+        make_input(path, args.size)
+        size_mb = path.stat().st_size / MB
+        expected = sequential(path)
+
+        results.add("sequential iter_record_blocks", measure(lambda: sequential(path), args.repeat), size_mb, "MiB")
+        single = None
+        for jobs in (int(value) for value in args.jobs.split(",")):
+
+            def run(jobs: int = jobs) -> None:
+                assert sum(map_chunks(path, field_total, jobs=jobs, chunk_size=args.chunk_size)) == expected
+
+            result = results.add(f"map_chunks --jobs {jobs}", measure(run, args.repeat), size_mb, "MiB")
+            single = single or result.best
+            sys.stdout.write(f"--jobs {jobs}: speedup {single / result.best:.2f}x\n")
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
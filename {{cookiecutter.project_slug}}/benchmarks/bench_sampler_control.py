@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Overhead of the SIGPROF sampling profiler (clibones/sampler_control.py) on a cpu bound workload.
+
+Usage:
+
+    python3 benchmarks/bench_sampler_control.py --rates 100,1000
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import sys
+from collections.abc import Callable
+
+from bench_util import BenchmarkResults, argument_parser, finish, measure
+
+from {{cookiecutter.project_slug}}.clibones.sampler_control import StackSampler
+
+DOCUMENT = {"id": 1, "name": "sensor", "values": list(range(50)), "nested": {"ok": True, "tags": ["a", "b"]}}
+
+
+def workload(iterations: int) -> int:
+    """Pure Python work with a few levels of calls, so the sampler has real stacks to walk."""
+    return sum(len(json.loads(json.dumps(DOCUMENT))["values"]) for _ in range(iterations))
+
+
+def sampled(iterations: int, rate: int) -> None:
+    sampler = StackSampler(rate=rate)
+    sampler.start()
+    try:
+        workload(iterations)
+    finally:
+        sampler.stop()
+
+
+def main() -> int:
+    parser = argument_parser(__doc__ or "")
+    parser.add_argument("--iterations", type=int, default=100_000, help="(default: %(default)s)")
+    parser.add_argument("--rates", default="100,1000", help="Sample rates (Hz) to measure.  (default: %(default)s)")
+    args = parser.parse_args()
+
+    rates = [int(value) for value in args.rates.split(",")]
+    variants: dict[str, Callable[[], object]] = {"no sampler": functools.partial(workload, args.iterations)}
+    for rate in rates:
+        variants[f"StackSampler {rate} Hz"] = functools.partial(sampled, args.iterations, rate)
+
+    # interleave the variants so cpu frequency and noisy neighbours affect them equally
+    timings: dict[str, list[float]] = {name: [] for name in variants}
+    for _ in range(args.repeat):
+        for name, func in variants.items():
+            timings[name] += measure(func, 1)
+
+    results = BenchmarkResults(f"Sampling profiler overhead ({args.iterations:,} iterations)")
+    baseline = results.add("no sampler", timings["no sampler"], args.iterations, "iterations")
+    for rate in rates:
+        result = results.add(
+            f"StackSampler {rate} Hz", timings[f"StackSampler {rate} Hz"], args.iterations, "iterations"
+        )
+        sys.stdout.write(f"{rate} Hz: overhead {(result.best / baseline.best - 1) * 100:+.2f}%\n")
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Handing a payload to a worker process: pickled as a task argument vs placed in shared memory
+(clibones/shared_buffers.py) with only the handle pickled.
+
+Each run sends the payload to a worker of a warm process pool that reads every byte (zlib.adler32) and returns,
+so both transfers include the worker touching the data.  The shared memory timings include copying the payload
+into the block and releasing it.
+
+Usage:
+
+    python3 benchmarks/bench_shared_buffers.py --sizes 1M,16M,256M,1G
+"""
+
+from __future__ import annotations
+
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from bench_util import MB, BenchmarkResults, argument_parser, finish, measure
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import size_arg
+from {{cookiecutter.project_slug}}.clibones.shared_buffers import SharedBuffer, SharedBuffers, attach
+
+
+def pickled_task(payload: bytes) -> int:
+    return zlib.adler32(payload)
+
+
+def shared_task(handle: SharedBuffer) -> int:
+    with attach(handle) as view:
+        return zlib.adler32(view)
+
+
+def main() -> int:
+    parser = argument_parser(__doc__ or "")
+    parser.add_argument(
+        "--sizes", default="1M,16M,128M", help="Payload sizes, up to 1G needs 3x that in RAM.  (default: %(default)s)"
+    )
+    args = parser.parse_args()
+
+    results = BenchmarkResults("Parent to worker payload transfer")
+    with ProcessPoolExecutor(max_workers=1) as executor, SharedBuffers() as buffers:
+        # start the worker before measuring
+        executor.submit(pickled_task, b"").result()
+        for size in (size_arg(value) for value in args.sizes.split(",")):
+            payload = bytes(size)
+            expected = zlib.adler32(payload)
+            label = f"{size / MB:,.0f} MiB"
+
+            def pickled(payload: bytes = payload, expected: int = expected) -> None:
+                assert executor.submit(pickled_task, payload).result() == expected
+
+            def shared(payload: bytes = payload, expected: int = expected) -> None:
+                handle = buffers.put(payload)
+                try:
+                    assert executor.submit(shared_task, handle).result() == expected
+                finally:
+                    buffers.release(handle)
+
+            pickled_result = results.add(f"pickled {label}", measure(pickled, args.repeat), size / MB, "MiB")
+            shared_result = results.add(f"shared memory {label}", measure(shared, args.repeat), size / MB, "MiB")
+            sys.stdout.write(f"{label}: shared memory speedup {pickled_result.best / shared_result.best:.2f}x\n")
+            del payload
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Startup and end-to-end latency of the application, the numbers a user waits for on every run:
+
+* python -m <package> --version, cold (no bytecode or parser spec cached) and warm,
+* main(["--count", "0"]) in-process,
+* the cumulative import time of each of the package's modules (python -X importtime),
+* ConfigFile.load and ConfigFile.save per config file format and size.
+
+Record a baseline on the reference machine, then fail on a regression beyond the --threshold.  Usage:
+
+    python3 benchmarks/bench_startup.py --json benchmarks/baselines/startup.json
+    python3 benchmarks/bench_startup.py --baseline benchmarks/baselines/startup.json
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from bench_util import BenchmarkResults, argument_parser, finish, measure
+
+from {{cookiecutter.project_slug}}.__main__ import main as app_main
+from {{cookiecutter.project_slug}}.clibones.config_file import ConfigFile
+
+PACKAGE = "{{cookiecutter.project_slug}}"
+
+CONFIG_FORMATS: tuple[str, ...] = (".toml", ".json")
+CONFIG_SIZES: tuple[int, ...] = (10, 100, 1000)
+"""The number of settings in the benchmarked config files."""
+CONFIG_CALLS = 20
+"""The config file calls per timing, the smaller files are faster than the timer resolution."""
+
+
+def run_cli(args: list[str], env: dict[str, str]) -> None:
+    subprocess.run([sys.executable, "-m", PACKAGE, *args], env=env, stdout=subprocess.DEVNULL, check=True)
+
+
+def cli_startup(results: BenchmarkResults, repeat: int, tmp: Path) -> None:
+    def cold() -> None:
+        # fresh bytecode and parser spec caches
+        with tempfile.TemporaryDirectory(dir=tmp) as run_dir:
+            env = {**os.environ, "XDG_CACHE_HOME": run_dir, "PYTHONPYCACHEPREFIX": run_dir}
+            run_cli(["--version"], env)
+
+    warm_env = {**os.environ, "XDG_CACHE_HOME": str(tmp / "warm")}
+    run_cli(["--version"], warm_env)
+    results.add(f"python -m {PACKAGE} --version (cold)", measure(cold, repeat))
+    results.add(f"python -m {PACKAGE} --version (warm)", measure(lambda: run_cli(["--version"], warm_env), repeat))
+
+
+def in_process(results: BenchmarkResults, repeat: int) -> None:
+    def run() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app_main(["--count", "0"])
+
+    run()
+    results.add('main(["--count", "0"])', measure(run, repeat))
+
+
+def import_times(results: BenchmarkResults, repeat: int) -> None:
+    """Add the cumulative import time of each of the package's modules, from python -X importtime."""
+    timings: dict[str, list[float]] = defaultdict(list)
+    command = [sys.executable, "-X", "importtime", "-c", f"import {PACKAGE}.__main__"]
+    subprocess.run(command, capture_output=True, check=True)
+    for _ in range(repeat):
+        stderr = subprocess.run(command, capture_output=True, check=True, text=True).stderr
+        # import time: self [us] | cumulative | imported package
+        for line in stderr.splitlines():
+            fields = line.removeprefix("import time:").split("|")
+            if len(fields) == 3 and fields[2].strip().startswith(PACKAGE):
+                timings[fields[2].strip()].append(int(fields[1]) / 1e6)
+    for module, module_timings in sorted(timings.items()):
+        results.add(f"import {module}", module_timings)
+
+
+def config_files(results: BenchmarkResults, repeat: int, tmp: Path) -> None:
+    config_file = ConfigFile()
+    for suffix in CONFIG_FORMATS:
+        for size in CONFIG_SIZES:
+            path = tmp / f"config-{size}{suffix}"
+            data = {PACKAGE: {f"setting_{index}": f"value {index}" if index % 2 else index for index in range(size)}}
+
+            def save(path: Path = path, data: dict[str, dict[str, str | int]] = data) -> None:
+                config_file.save(path, data)
+
+            def load(path: Path = path) -> None:
+                config_file.load(path)
+
+            save()
+            results.add(f"ConfigFile.save {suffix} {size} settings", measure(save, repeat, CONFIG_CALLS))
+            results.add(f"ConfigFile.load {suffix} {size} settings", measure(load, repeat, CONFIG_CALLS))
+
+
+def main() -> int:
+    parser = argument_parser(__doc__ or "")
+    parser.set_defaults(repeat=10)
+    args = parser.parse_args()
+
+    results = BenchmarkResults("Startup and end-to-end latency")
+    with tempfile.TemporaryDirectory() as tmp:
+        cli_startup(results, args.repeat, Path(tmp))
+        in_process(results, args.repeat)
+        import_times(results, args.repeat)
+        config_files(results, args.repeat, Path(tmp))
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Helpers shared by the benchmark scripts in this directory.
+
+Each benchmark script is a standalone program (python3 benchmarks/bench_*.py) that collects its measurements in
+a BenchmarkResults, prints them as a table and optionally writes them as JSON (--json FILE).
+
+A JSON file written on a reference machine is a baseline: --baseline FILE compares the best timings with it and
+the script fails (exit code 1) when any benchmark is slower than the baseline by more than --threshold (a
+fraction) and more than --min-delta seconds, which keeps the noise of sub-millisecond timings from failing it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+MB: int = 1 << 20
+
+
+DEFAULT_THRESHOLD: float = 0.25
+"""Default --threshold, a benchmark 25% slower than its baseline is a regression."""
+
+DEFAULT_MIN_DELTA: float = 0.001
+"""Default --min-delta, a regression must also be at least 1 ms slower than its baseline."""
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> list[float]:
+    """Call func number times per run, for repeat runs, returning the mean elapsed seconds of a call in each run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+@dataclass
+class Result:
+    """The timings of one benchmark."""
+
+    name: str
+    best: float
+    median: float
+    items: float | None = None
+    unit: str = ""
+    details: dict[str, float] = field(default_factory=dict)
+    """Further measurements of the benchmark, saved in the JSON but not compared with the baseline."""
+
+    @property
+    def rate(self) -> float | None:
+        """items per second for the best run."""
+        if self.items is None or self.best <= 0:
+            return None
+        return self.items / self.best
+
+
+@dataclass
+class BenchmarkResults:
+    """Collects, prints, and saves benchmark results."""
+
+    title: str
+    results: list[Result] = field(default_factory=list)
+
+    def add(
+        self, name: str, timings: list[float], items: float | None = None, unit: str = "", **details: float
+    ) -> Result:
+        """Add the timings (seconds) of a benchmark that processed items units per run, with further details."""
+        result = Result(
+            name=name, best=min(timings), median=statistics.median(timings), items=items, unit=unit, details=details
+        )
+        self.results.append(result)
+        return result
+
+    def print(self, file: Any = None) -> None:
+        """Print the results as a table."""
+        out = file or sys.stdout
+        out.write(f"\n{self.title}\n")
+        out.write(f"{'benchmark':<44} {'best':>12} {'median':>12} {'rate':>20}\n")
+        for result in self.results:
+            rate = f"{result.rate:,.1f} {result.unit}/s" if result.rate is not None else ""
+            out.write(f"{result.name:<44} {result.best * 1e3:>10.3f}ms {result.median * 1e3:>10.3f}ms {rate:>20}\n")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"title": self.title, "results": [asdict(result) for result in self.results]}
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def regressions(self, baseline: dict[str, Any], threshold: float, min_delta: float) -> list[str]:
+        """Describe the results slower than the baseline (a to_dict()) by more than threshold and min_delta."""
+        baseline_best = {result["name"]: result["best"] for result in baseline.get("results", [])}
+        messages = []
+        for result in self.results:
+            best = baseline_best.get(result.name)
+            if best is not None and result.best > best * (1 + threshold) and result.best - best > min_delta:
+                messages.append(
+                    f"{result.name}: {result.best * 1e3:.3f}ms is {result.best / best - 1:.0%} slower than the "
+                    f"baseline {best * 1e3:.3f}ms"
+                )
+        return messages
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    """Return a parser with the options common to all benchmark scripts."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark.  (default: %(default)s)")
+    parser.add_argument("--json", metavar="FILE", type=Path, help="Also write the results to FILE as JSON.")
+    parser.add_argument("--baseline", metavar="FILE", type=Path, help="Fail on a regression from the JSON FILE.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Slowdown, as a fraction of the baseline, that is a regression.  (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=DEFAULT_MIN_DELTA,
+        help="Smallest slowdown in seconds that is a regression.  (default: %(default)s)",
+    )
+    return parser
+
+
+def finish(results: BenchmarkResults, args: argparse.Namespace) -> int:
+    """Print, optionally save and compare with the baseline the results, returning the exit code for the script."""
+    results.print()
+    if args.json:
+        results.write_json(args.json)
+    if args.baseline:
+        if not args.baseline.is_file():
+            sys.stdout.write(f"\nNo baseline ({args.baseline}), record one with --json {args.baseline}\n")
+            return 0
+        regressions = results.regressions(json.loads(args.baseline.read_text()), args.threshold, args.min_delta)
+        for message in regressions:
+            sys.stdout.write(f"REGRESSION {message}\n")
+        if regressions:
+            return 1
+        sys.stdout.write(f"\nNo regressions from the baseline ({args.baseline})\n")
+    return 0
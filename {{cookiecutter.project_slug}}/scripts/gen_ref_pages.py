@@ -2,32 +2,106 @@
 #
 # SPDX-License-Identifier: MIT
 
-"""Generate the code reference pages and navigation."""
+"""
+Generate the code reference pages and navigation.
+
+The pages are regenerated on every build, mkdocs-gen-files starts each build with no files, but rendering them
+(mkdocstrings) is what takes the time.  So the build is made incremental for mkdocs build --dirty and
+mkdocs serve --dirty, which only render the pages modified since their output was written: a manifest
+(.cache/gen_ref_pages.json) keeps the content hash of each module, hashed in parallel, and when it was last
+changed.  The page of an unchanged module is given that time, so a dirty build skips it, while the page of a
+new or changed module is new and rendered.  The output of the pages of deleted modules is removed.
+
+A dirty build (task serve-docs-dirty) does not update the navigation of the unchanged pages, run a full build
+(task build-docs or serve-docs) after adding or deleting modules to update it.
+"""
+
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import mkdocs_gen_files
+from mkdocs.structure.files import File
 
-nav = mkdocs_gen_files.Nav()
+MANIFEST_VERSION = 1
+"""Increment when the generated pages change, so they are all rendered again."""
 
 root = Path(__file__).parent.parent
 src = root / "src"
+manifest_path = root / ".cache" / "gen_ref_pages.json"
+
+
+def load_manifest() -> dict[str, dict[str, str | float]]:
+    """The hash and change time of each module (path relative to src) of the previous build."""
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    modules: dict[str, dict[str, str | float]] = manifest.get("modules", {})
+    return modules
 
-for path in sorted(src.rglob("*.py")):
+
+def save_manifest(modules: dict[str, dict[str, str | float]]) -> None:
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps({"version": MANIFEST_VERSION, "modules": modules}, indent=2) + "\n")
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def doc_paths(path: Path) -> tuple[tuple[str, ...], Path]:
+    """The module's identifier parts and the path of its page."""
     module_path = path.relative_to(src).with_suffix("")
     doc_path = path.relative_to(src).with_suffix(".md")
-    full_doc_path = Path("reference", doc_path)
 
     parts = tuple(module_path.parts)
 
     if parts[-1] == "__init__":
         parts = parts[:-1]
         doc_path = doc_path.with_name("index.md")
-        full_doc_path = full_doc_path.with_name("index.md")
     # elif parts[-1] == "__main__":
     #     # do not document __main__.py
     #     continue
+    return parts, doc_path
+
+
+def remove_output(doc_path: Path) -> None:
+    """Remove the built page of a deleted module, a dirty build would leave it in the site."""
+    output = File(
+        Path("reference", doc_path).as_posix(),
+        editor.directory,
+        editor.config["site_dir"],
+        editor.config["use_directory_urls"],
+    )
+    dest = Path(output.abs_dest_path)
+    dest.unlink(missing_ok=True)
+    # the directory of a directory url page, when nothing else (another module's pages) is in it
+    if editor.config["use_directory_urls"] and dest.parent.is_dir() and not any(dest.parent.iterdir()):
+        dest.parent.rmdir()
+
+
+editor = mkdocs_gen_files.FilesEditor.current()
+nav = mkdocs_gen_files.Nav()
+
+paths = sorted(src.rglob("*.py"))
+with ThreadPoolExecutor() as executor:
+    hashes = dict(zip(paths, executor.map(file_hash, paths), strict=True))
+
+previous = load_manifest()
+modules: dict[str, dict[str, str | float]] = {}
+now = time.time()
+
+for path in paths:
+    parts, doc_path = doc_paths(path)
+    full_doc_path = Path("reference", doc_path)
 
     nav[parts] = doc_path.as_posix()
 
@@ -38,5 +112,20 @@ for path in sorted(src.rglob("*.py")):
     # mkdocs_gen_files.set_edit_path(full_doc_path, path.relative_to(root))
     mkdocs_gen_files.set_edit_path(full_doc_path, Path("../") / path)
 
+    key = path.relative_to(src).as_posix()
+    entry = previous.get(key)
+    if entry is not None and entry["hash"] == hashes[path]:
+        # unchanged since it was last rendered, a dirty build skips it
+        changed = float(entry["changed"])
+        os.utime(Path(editor.directory, full_doc_path), (changed, changed))
+    else:
+        changed = now
+    modules[key] = {"hash": hashes[path], "changed": changed}
+
+for key in previous.keys() - modules.keys():
+    remove_output(doc_paths(src / key)[1])
+
 with mkdocs_gen_files.open("reference/SUMMARY.md", "w") as nav_file:
     nav_file.writelines(nav.build_literate_nav())
+
+save_manifest(modules)
@@ -9,10 +9,20 @@ Consider using some of your README.md.
 
 from __future__ import annotations
 
-from importlib import metadata
-from pathlib import Path
+import os
+import time
 
-import tomlkit
+# first, so the --timings import phase includes importing this package (see clibones/timing_control.py)
+IMPORT_START_NS: int = time.perf_counter_ns()
+"""perf_counter_ns() when the application package was imported, the start of the --timings import phase."""
+
+IMPORT_PID: int = os.getpid()
+"""The process that imported the application package, forked children did not."""
+
+from importlib import metadata  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+import tomlkit  # noqa: E402
 
 try:
     # this assumes running in an installed package
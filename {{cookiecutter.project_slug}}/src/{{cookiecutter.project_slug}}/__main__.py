@@ -11,7 +11,8 @@ You need to update the following class variables in Settings class to match your
 * project_package
 * project_description
 
-and then add any arguments to Settings.add_arguments() and Settings.validate_arguments() methods.
+and then add any arguments to Settings.add_arguments() and Settings.validate_arguments() methods, and the optional
+controls the application uses to Settings.add_controls().
 
 Finally, add your application into the main() method.
 """
@@ -22,21 +23,34 @@ import atexit
 import sys
 from collections.abc import Sequence
 from pprint import pformat
-from time import sleep
 from typing import TYPE_CHECKING
 
 from loguru import logger
 
 from {{cookiecutter.project_slug}}.clibones.application_settings import ApplicationSettings
 from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.metrics_control import METRICS, MetricsControl
+from {{cookiecutter.project_slug}}.clibones.rate_control import RATE, RateControl
+from {{cookiecutter.project_slug}}.clibones.server_control import ApplicationServer, ServerControl
+from {{cookiecutter.project_slug}}.clibones.status_control import STATUS, StatusControl
+from {{cookiecutter.project_slug}}.clibones.watchdog_control import WATCHDOG, WatchdogControl
 
 if TYPE_CHECKING:
     import argparse
     from collections.abc import Sequence
 
+    from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+    from {{cookiecutter.project_slug}}.clibones.frozen_settings import FrozenSettings
+
 DEFAULT_COUNT = 5
 MAX_COUNT = 10
 MIN_COUNT = 0
+EXAMPLE_RATE = 1.0
+
+# TODO: replace the example application's metrics, written with --metrics-file FILE
+EXAMPLE_ITERATIONS = METRICS.counter("example_iterations_total", "Example loop iterations completed")
+EXAMPLE_INTERRUPTS = METRICS.counter("example_interrupts_total", "Example loops stopped by ^C")
+EXAMPLE_ITERATION_SECONDS = METRICS.histogram("example_iteration_seconds", "Example loop iteration time")
 
 
 # noinspection PyMethodMayBeStatic
@@ -88,6 +102,15 @@ class Settings(ApplicationSettings):
         """
         return []
 
+    def add_controls(self) -> list[ControlBase]:
+        """This is where you opt in to the optional controls the application uses.
+
+        :return: the controls, in the order they are set up
+        """
+        # TODO: replace the example application's controls (--status-file, --timeout, --rate, --metrics-file and
+        #  --serve), or return self.all_controls() for all of them
+        return [StatusControl(), MetricsControl(), WatchdogControl(), RateControl(), ServerControl()]
+
     def add_arguments(self, parser: argparse.ArgumentParser, defaults: dict[str, str]) -> None:  # noqa: ARG002
         """This is where you should add arguments to the parser.
 
@@ -106,6 +129,8 @@ class Settings(ApplicationSettings):
             default=DEFAULT_COUNT,
             help=f"How many times (0-{MAX_COUNT} to execute the example loop (default: {DEFAULT_COUNT})",
         )
+        # the example loop runs one iteration per second unless --rate is given
+        parser.set_defaults(rate=EXAMPLE_RATE)
 
     def validate_arguments(self, settings: argparse.Namespace, remaining_argv: list[str]) -> list[str]:  # noqa: ARG002
         """This provides a hook for validating the settings after the parsing is completed.
@@ -124,20 +149,28 @@ class Settings(ApplicationSettings):
 
 
 # TODO: remove example application
-def __example_application(settings: argparse.Namespace) -> None:
+def __example_application(settings: FrozenSettings) -> None:
     """This is just an example application, replace with the real application.
 
     :param settings: the settings object returned by ArgumentParser.parse_args()
     """
     with GracefulInterruptHandler() as handler:
         logger.debug("Executing Example Application")
-        logger.info(f"Settings: {pformat(vars(settings), indent=2)}")
+        logger.info(f"Settings: {pformat(settings.as_dict(), indent=2)}")
 
         for iteration in range(settings.count):
-            sleep(1)
-            logger.info(".", end="", flush=True)
+            with EXAMPLE_ITERATION_SECONDS.time():
+                # paced by --rate and --burst, returns early when interrupted (^C)
+                RATE.acquire(handler=handler)
+                logger.info(".", end="", flush=True)
+            EXAMPLE_ITERATIONS.inc()
+            # the heartbeat, iteration and interrupted flag for --status-file
+            STATUS.update(iteration + 1, interrupted=handler.interrupted)
+            # restart the --iteration-timeout
+            WATCHDOG.kick()
             # to break out of loop when interrupt (^C) is pressed
             if handler.interrupted:
+                EXAMPLE_INTERRUPTS.inc()
                 logger.error(f"Loop Interrupted after {iteration} iterations")
                 break
         logger.info("\n")
@@ -147,11 +180,18 @@ def __example_application(settings: argparse.Namespace) -> None:
 
 def main(args: list[str] | None = None) -> int:
     """The command line applications main function."""
-    with Settings(args=args) as settings:
+    application_settings = Settings(args=args)
+    with application_settings as settings:
         # some info commands (--version, --longhelp) need to exit immediately
         # after completion.  The quick_exit flag indicates if this is the case.
         if settings.quick_exit:
             return 0
+        # --serve SOCKET keeps this warm interpreter resident, running main() in a forked child per request.
+        if settings.serve:
+            return ApplicationServer(settings.serve, main).serve_forever()
+        # a subcommand declared by Settings.add_subcommands() runs instead of the application
+        if application_settings.subcommand is not None:
+            return application_settings.run_subcommand(settings)
         # TODO: replace invoking the example application with your application's entry point
         __example_application(settings)
     return 0
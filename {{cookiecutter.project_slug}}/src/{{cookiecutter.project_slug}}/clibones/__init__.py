@@ -40,5 +40,35 @@ The `Settings` does have a few extra features including:
 
 * config files are supported for any command arguments you want to persist.
 * standard logging setup via command line arguments.
+* optionally (parser_cache_dir), warm starts parse the command line with a cached spec of the argument parser,
+  falling back to argparse for anything unusual, see `clibones/parser_cache.py`.
+* the settings are frozen, slotted objects with `as_dict()` and `replace()`, see `clibones/frozen_settings.py`.
+* streaming record input/output (--input FILE, --output FILE, "-" for stdio) with transparent gzip/zstd support,
+  see `clibones/io_control.py`.
+* atomic, buffered application output with optional background compression (--compress, --background-compression)
+  and per-worker shards merged on commit (--shards N), see `clibones/output_control.py`.
+* memory-mapped, chunk-parallel processing of a large --input FILE (--mmap, --jobs N), see
+  `clibones/parallel_control.py`.
+* cpu (cProfile) and memory (tracemalloc) profiling with collapsed stacks for flame graphs (--profile {cpu,memory}),
+  see `clibones/profiler_control.py`.
+* a low overhead SIGPROF sampling profiler for production runs (--sample-profile FILE, --sample-rate HZ), see
+  `clibones/sampler_control.py`.
+* startup phase timings (--timings [{table,json}]), see `clibones/timing_control.py`.
+* in-process counters, gauges and histograms exported in Prometheus text or JSON format (--metrics-file FILE),
+  see `clibones/metrics_control.py`.
+* span tracing (`span()`, `@traced`) of the startup phases and the application to a Chrome trace-event file
+  (--trace FILE), see `clibones/trace_control.py`.
+* a memory budget (--max-memory SIZE) with a soft limit that gracefully interrupts the application, and peak
+  memory reporting (--memory-report), see `clibones/memory_control.py`.
+* live diagnostics: SIGUSR1 logs every thread's stack and the metrics, SIGUSR2 toggles DEBUG logging, see
+  `clibones/diagnostics_control.py`.
+* a memory-mapped status page (--status-file PATH) with the heartbeat, iteration count, throughput and phase,
+  read without locking by --show-status PATH, see `clibones/status_control.py`.
+* watchdog timeouts for the run (--timeout SECONDS) and each iteration (--iteration-timeout SECONDS) that
+  interrupt the application gracefully, then dump the stacks and exit, see `clibones/watchdog_control.py`.
+* a prewarmed server mode (--serve SOCKET) where each run of the thin client `clibones/server_client.py` forks
+  the already initialized application.
+
+Most of these are optional controls, an application opts in to the ones it uses in `Settings.add_controls()`.
 
 """
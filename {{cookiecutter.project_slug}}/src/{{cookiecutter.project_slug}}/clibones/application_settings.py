@@ -22,6 +22,13 @@ This base class adds the following features to ArgumentParser:
 
 * initializing the root logging using --verbosity LEVEL, --quiet, --debug, and --logfile FILENAME
 
+* lazily loaded subcommands (see **add_subcommands** and subcommands.py).
+
+* the optional controls the application opts in to (see **add_controls** and **all_controls**), for example
+  streaming records with --input FILE and --output FILE (written atomically, optionally compressed or sharded),
+  positional items streamed from @FILE and --args-from FILE arguments or running as a prewarmed server with
+  --serve SOCKET.  A control's module is only imported when it is added.
+
 """
 
 from __future__ import annotations
@@ -30,15 +37,21 @@ import argparse
 import sys
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, cast
 
 from {{cookiecutter.project_slug}}.clibones.config_file import ConfigFile
+from {{cookiecutter.project_slug}}.clibones.frozen_settings import FrozenSettings, frozen_settings
 from {{cookiecutter.project_slug}}.clibones.info_control import InfoControl
 from {{cookiecutter.project_slug}}.clibones.logger_control import LoggerControl
+from {{cookiecutter.project_slug}}.clibones.parser_cache import ParserCache, ParserSpec
+from {{cookiecutter.project_slug}}.clibones.subcommands import LazySubcommandsAction, Subcommand
+from {{cookiecutter.project_slug}}.clibones.timing_control import TimingControl
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
 
 class ApplicationSettings(ABC):
     """
@@ -58,6 +71,9 @@ class ApplicationSettings(ABC):
             if settings.foo:
                 pass
 
+    The context manager returns frozen, slotted settings (see frozen_settings.py), the parser is available from
+    the parser property.
+
     Traditional Usage::
 
         parser, settings = MySettings().parse()
@@ -88,16 +104,30 @@ class ApplicationSettings(ABC):
         self.__args: Sequence[str] = args or sys.argv[1:]
 
         self._parser: argparse.ArgumentParser | None = None
+        self._parser_parts: tuple[argparse.ArgumentParser, dict[str, Any]] | None = None
+        self.subcommand: Subcommand | None = None
+        self.subcommand_module: Any = None
         self._settings: argparse.Namespace | None = None
         self._remaining_argv: list[str] = []
         self._persist_keys: set[str] = set()
         self.quick_exit: bool = False
+        self.timing_control = TimingControl()
         self.logger_control = LoggerControl()
         self.info_control = InfoControl(app_package=app_package)
 
+        # the built-in controls, then the optional controls the application opts in to, are set up after the
+        # logger and info controls, in this order, and torn down in the reverse order
+        self.controls: list[ControlBase] = [self.timing_control, *self.add_controls()]
+        for control in self.controls:
+            self.add_persist_keys(set(control.PERSIST_KEYS))
+
         if self.__default_config_file is None:
             self.__default_config_file = Path.home() / ".config" / f"{self.__app_package}.toml"
 
+        # where the parser spec is cached, None (the default) to always build the parser.  An application opts in
+        # with default_cache_dir(app_package) (see parser_cache.py)
+        self.parser_cache_dir: Path | None = None
+
     @abstractmethod
     def add_parent_parsers(self) -> list[argparse.ArgumentParser]:  # pragma: no cover
         """
@@ -120,18 +150,103 @@ class ApplicationSettings(ABC):
         return
 
     @abstractmethod
-    def validate_arguments(
-        self, settings: argparse.Namespace, remaining_argv: list[str]
-    ) -> list[str]:  # pragma: no cover
+    def validate_arguments(self, settings: argparse.Namespace, remaining_argv: list[str]) -> list[str]:
         """
         This provides a hook for validating the settings after the parsing is completed.
 
+        The base implementation validates the arguments of the optional controls and of the selected subcommand.
+
         :param settings: the settings object returned by ArgumentParser.parse_args()
         :param remaining_argv: the remaining argv after the parsing is completed.
         :return: a list of error messages or an empty list
         """
+        error_messages: list[str] = []
+        for control in self.controls:
+            error_messages += control.validate_arguments(settings)
+        if self.subcommand_module is not None and hasattr(self.subcommand_module, "validate_arguments"):
+            error_messages += self.subcommand_module.validate_arguments(settings)
+        return error_messages
+
+    def add_controls(self) -> list[ControlBase]:
+        """
+        Override to opt in to the optional controls the application uses, each adds its command line arguments.
+
+        Called by ApplicationSettings.__init__(), so only the base class's attributes are set.  The controls are
+        set up in the returned order, all_controls() returns every control in the recommended order.
+
+        :return: the optional controls, none by default
+        """
+        return []
+
+    def all_controls(self) -> list[ControlBase]:
+        """
+        Every optional control, importing their modules.  The status control is first as --show-status is a quick
+        exit, then the resource placement applies to everything that follows.  The profilers and tracing are last
+        so they wrap just the application.
+
+        :return: the controls in the order they should be set up
+        """
+        from {{cookiecutter.project_slug}}.clibones.args_control import ArgsControl
+        from {{cookiecutter.project_slug}}.clibones.cache_control import CacheControl
+        from {{cookiecutter.project_slug}}.clibones.diagnostics_control import DiagnosticsControl
+        from {{cookiecutter.project_slug}}.clibones.io_control import IOControl
+        from {{cookiecutter.project_slug}}.clibones.memory_control import MemoryControl
+        from {{cookiecutter.project_slug}}.clibones.metrics_control import MetricsControl
+        from {{cookiecutter.project_slug}}.clibones.output_control import OutputControl
+        from {{cookiecutter.project_slug}}.clibones.parallel_control import ParallelControl
+        from {{cookiecutter.project_slug}}.clibones.profiler_control import ProfilerControl
+        from {{cookiecutter.project_slug}}.clibones.rate_control import RateControl
+        from {{cookiecutter.project_slug}}.clibones.resource_control import ResourceControl
+        from {{cookiecutter.project_slug}}.clibones.sampler_control import SamplerControl
+        from {{cookiecutter.project_slug}}.clibones.server_control import ServerControl
+        from {{cookiecutter.project_slug}}.clibones.status_control import StatusControl
+        from {{cookiecutter.project_slug}}.clibones.trace_control import TraceControl
+        from {{cookiecutter.project_slug}}.clibones.watchdog_control import WatchdogControl
+
+        return [
+            StatusControl(),
+            ResourceControl(),
+            ArgsControl(),
+            IOControl(),
+            CacheControl(app_package=self.__app_package),
+            OutputControl(),
+            ParallelControl(),
+            ServerControl(),
+            MetricsControl(),
+            DiagnosticsControl(logger_control=self.logger_control),
+            WatchdogControl(),
+            RateControl(),
+            ProfilerControl(),
+            MemoryControl(),
+            SamplerControl(),
+            TraceControl(timer=self.timing_control.timer),
+        ]
+
+    def add_subcommands(self) -> list[Subcommand]:
+        """
+        Override to declare the application's subcommands, see subcommands.py.
+
+        :return: the subcommands, only the module of the one selected on the command line is imported
+        """
         return []
 
+    def _build_subcommand(self, subcommand: Subcommand, parser: argparse.ArgumentParser) -> None:
+        self.subcommand = subcommand
+        self.subcommand_module = subcommand.load()
+        self.subcommand_module.add_arguments(parser)
+
+    def run_subcommand(self, settings: FrozenSettings) -> int:
+        """
+        Run the selected subcommand's main().
+
+        :return: the exit code
+        """
+        if self.subcommand_module is None:
+            errmsg = "No subcommand was selected"
+            raise ValueError(errmsg)
+        exit_code: int = self.subcommand_module.main(settings)
+        return exit_code
+
     def add_persist_keys(self, keys: set[str]) -> None:
         self._persist_keys |= keys
 
@@ -141,12 +256,19 @@ class ApplicationSettings(ABC):
 
         return: the parser, the settings, and any remaining arguments.
         """
-        config_file = ConfigFile()
-        config_file.default_config_file = self.__default_config_file
-        config_file.section_name = self.__app_package
-        config_file.persist_keys = self._persist_keys
-        dash_config_parser, remaining_args, defaults = config_file.parser(args=args)
-
+        settings, leftover_args = self._parse(args)
+        return cast("argparse.ArgumentParser", self.parser), settings, leftover_args
+
+    @property
+    def parser(self) -> argparse.ArgumentParser | None:
+        """The argument parser once parsed, built on first use when the command line was parsed from the cache."""
+        if self._parser is None and self._parser_parts is not None:
+            self._parser = self._build_parser(*self._parser_parts)
+        return self._parser
+
+    def _build_parser(
+        self, dash_config_parser: argparse.ArgumentParser, defaults: dict[str, Any]
+    ) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(
             self.__app_name,
             parents=[dash_config_parser, *self.add_parent_parsers()],
@@ -156,48 +278,115 @@ class ApplicationSettings(ABC):
         # add arguments to the parser
         self.info_control.add_arguments(parser=parser)
         self.logger_control.add_arguments(parser=parser)
-        self.add_arguments(parser=parser, defaults=defaults or {})
+        for control in self.controls:
+            control.add_arguments(parser=parser)
+        self.add_arguments(parser=parser, defaults=defaults)
+        subcommands = self.add_subcommands()
+        if subcommands:
+            subparsers = cast(
+                "LazySubcommandsAction",
+                parser.add_subparsers(
+                    title="Commands", dest="subcommand", metavar="COMMAND", action=LazySubcommandsAction
+                ),
+            )
+            subparsers.declare(subcommands, self._build_subcommand)
 
         if defaults:
             parser.set_defaults(**defaults)
+        return parser
 
-        # drum roll... Perform the parse!
-        settings, leftover_args = parser.parse_known_args(args=remaining_args)
+    def _parse(self, args: Sequence[str]) -> tuple[argparse.Namespace, list[str]]:
+        """Parse the optional config files and the command line arguments, see parse()."""
+        timer = self.timing_control.timer
+        timer.mark("settings init")
+        config_file = ConfigFile()
+        config_file.default_config_file = self.__default_config_file
+        config_file.section_name = self.__app_package
+        config_file.persist_keys = self._persist_keys
+        dash_config_parser, remaining_args, defaults = config_file.parser(args=args, timer=timer)
+        self._parser = None
+        self._parser_parts = (dash_config_parser, defaults or {})
+
+        # a warm start parses the command line with the cached spec of the parser, see parser_cache.py
+        cache = ParserCache(self.parser_cache_dir, self.__app_package) if self.parser_cache_dir else None
+        key = cache.key(defaults or {}, type(self).__qualname__) if cache else None
+        spec = cache.load(key) if cache and key else None
+        parsed = spec.parse_known_args(list(remaining_args)) if spec else None
+        if parsed is not None:
+            timer.mark("parser construction")
+            settings, leftover_args = parsed
+        else:
+            parser = cast("argparse.ArgumentParser", self.parser)
+            timer.mark("parser construction")
+
+            # drum roll... Perform the parse!
+            settings, leftover_args = parser.parse_known_args(args=remaining_args)
+            if cache and key and spec is None:
+                cache.store(key, ParserSpec.from_parser(parser))
+        timer.mark("parse_known_args")
 
         # copy quick_exit into namespace for context usage
         settings.quick_exit = self.quick_exit
         settings.config_file = config_file.config_filepath
+        # the positional items, streamed from any @FILE and --args-from FILE when the application adds the
+        # ArgsControl (see args_control.py), else just the command line items
+        if "args_from" in settings:
+            from {{cookiecutter.project_slug}}.clibones.args_control import ArgsControl
+
+            settings.arg_items = ArgsControl.arg_items(settings, leftover_args)
+        else:
+            settings.arg_items = tuple(leftover_args)
 
         config_file.save_config_file(vars(settings))
+        timer.mark("save_config_file")
 
-        return parser, settings, leftover_args
+        return settings, leftover_args
 
-    def __enter__(self) -> argparse.Namespace:
+    def __enter__(self) -> FrozenSettings:
         """context manager enter
-        :return: the settings namespace
+        :return: the frozen settings, see frozen_settings.py
         """
-        self._parser, self._settings, self._remaining_argv = self.parse(args=self.__args)
+        self._settings, self._remaining_argv = self._parse(args=self.__args)
 
+        timer = self.timing_control.timer
         self.logger_control.setup(self._settings)
+        timer.mark("LoggerControl.setup")
         self.info_control.setup(self._settings)
-
-        if not self._settings.quick_exit:
-            # validate both the base ApplicationSettings.validate_arguments and the child's validate_arguments.
-            # combine the results which each can be either a list of error message strings or an empty list
-            error_messages: list[str] = ApplicationSettings.validate_arguments(
-                self, self._settings, self._remaining_argv
-            ) + self.validate_arguments(self._settings, self._remaining_argv)
-
-            for error_msg in error_messages:
-                self._parser.error(error_msg)
-
-            self._settings.parser = self._parser
-        return self._settings
-
-    def __exit__(self, *exc: Any) -> None:  # NOQA: B027
+        timer.mark("InfoControl.setup")
+        set_up: list[ControlBase] = []
+        try:
+            for control in self.controls:
+                set_up.append(control)
+                control.setup(self._settings)
+            timer.mark("controls setup")
+
+            if not self._settings.quick_exit:
+                # validate both the base ApplicationSettings.validate_arguments and the child's validate_arguments.
+                # combine the results which each can be either a list of error message strings or an empty list
+                error_messages: list[str] = ApplicationSettings.validate_arguments(
+                    self, self._settings, self._remaining_argv
+                ) + self.validate_arguments(self._settings, self._remaining_argv)
+
+                for error_msg in error_messages:
+                    cast("argparse.ArgumentParser", self.parser).error(error_msg)
+                timer.mark("validation")
+        except BaseException:
+            # parser.error() raises SystemExit, and __exit__ is not called when __enter__ raises, so undo the
+            # threads, signal handlers, limits and environment of the controls set up so far
+            for control in reversed(set_up):
+                control.teardown()
+            raise
+        self.timing_control.report(self._settings)
+        for control in self.controls:
+            control.begin_application()
+        return frozen_settings(self._settings)
+
+    def __exit__(self, *exc: Any) -> None:
         """
         context manager exit
         """
+        for control in reversed(self.controls):
+            control.teardown()
 
     def help(self) -> int:
         """
@@ -205,6 +394,6 @@ class ApplicationSettings(ABC):
 
         :return: 2
         """
-        if self._parser:
-            self._parser.print_help()
+        if self.parser:
+            self.parser.print_help()
         return 2
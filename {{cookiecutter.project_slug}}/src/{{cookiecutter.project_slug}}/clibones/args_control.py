@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Streaming argument files for huge lists of positional items.
+
+Generated file lists of 100k+ paths exceed the argv limits, so they are usually split by xargs into many process
+launches.  Instead, the positional items may be read from files, one run handling them all:
+
+* @FILE on the command line reads the items from FILE, in place of the @FILE argument,
+* --args-from FILE reads the items from FILE ("-" for stdin) after the command line items,
+* --null splits the files on NUL instead of newline, for "find -print0" output.
+
+Unlike ArgumentParser's fromfile_prefix_chars, the files are not expanded into argv.  settings.arg_items is an
+iterable that reads the files in large chunks (see io_control.iter_record_blocks) only while the application
+consumes the items, so memory use stays flat however many items there are.  Empty items are skipped and gzip or
+zstd compressed files are decompressed.
+
+Usage::
+
+    $ find . -name "*.py" -print0 | app --null --args-from -
+
+    with Settings() as settings:
+        for path in settings.arg_items:
+            process(path)
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.io_control import DEFAULT_BUFFER_SIZE, STDIO, iter_record_blocks, open_input
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+    from collections.abc import Iterator
+
+ARGS_FILE_PREFIX: str = "@"
+"""The prefix of a command line argument naming a file of items."""
+
+
+def args_file(arg: str) -> str | None:
+    """The file named by an @FILE argument, else None."""
+    if arg.startswith(ARGS_FILE_PREFIX) and len(arg) > len(ARGS_FILE_PREFIX):
+        return arg[len(ARGS_FILE_PREFIX) :]
+    return None
+
+
+@dataclass(frozen=True)
+class ArgItems:
+    """
+    The positional items, re-read from the argument files each time it is iterated.
+
+    :param args: the positional command line arguments, "@FILE" arguments name files of items
+    :param args_from: the --args-from file, "-" for stdin
+    :param null: the files are NUL separated instead of newline separated
+    """
+
+    args: tuple[str, ...] = ()
+    args_from: str | None = None
+    null: bool = False
+
+    def __iter__(self) -> Iterator[str]:
+        for arg in self.args:
+            path = args_file(arg)
+            if path is None:
+                yield arg
+            else:
+                yield from self.read(path)
+        if self.args_from is not None:
+            yield from self.read(self.args_from)
+
+    @property
+    def files(self) -> list[str]:
+        """The argument files, in the order they are read."""
+        files = [path for path in map(args_file, self.args) if path is not None]
+        return files if self.args_from is None else [*files, self.args_from]
+
+    def read(self, path: str) -> Iterator[str]:
+        """Generate the non-empty items of the argument file, decoded as file names are."""
+        separator = b"\0" if self.null else b"\n"
+        with open_input(path, DEFAULT_BUFFER_SIZE) as fp:
+            for block in iter_record_blocks(fp, separator, DEFAULT_BUFFER_SIZE):
+                yield from map(os.fsdecode, filter(None, block))
+
+
+class ArgsControl(ControlBase):
+    """Add streaming argument file (@FILE, --args-from FILE, --null) support."""
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        args_group = parser.add_argument_group(
+            title="Argument File Options",
+            description=f"Positional items are also read from {ARGS_FILE_PREFIX}FILE arguments (settings.arg_items).",
+        )
+
+        args_group.add_argument(
+            "--args-from",
+            dest="args_from",
+            metavar="FILE",
+            default=None,
+            help='Read positional items from FILE, one per line, "-" for stdin.  (default: None)',
+        )
+        args_group.add_argument(
+            "--null",
+            dest="null",
+            action="store_true",
+            default=False,
+            help="Argument file items are NUL separated, as written by find -print0.",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        # not only regular files, a FIFO or a process substitution (<(find . -print0)) is streamed too
+        errors = []
+        for path in settings.arg_items.files:
+            if path == STDIO:
+                continue
+            if not os.path.exists(path):  # noqa: PTH110
+                errors.append(f"argument file ({path}) does not exist")
+            elif os.path.isdir(path):  # noqa: PTH112
+                errors.append(f"argument file ({path}) is a directory")
+        return errors
+
+    @staticmethod
+    def arg_items(settings: argparse.Namespace, leftover_args: list[str]) -> ArgItems:
+        """The positional items of the parsed command line."""
+        return ArgItems(tuple(leftover_args), settings.args_from, settings.null)
@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""argparse "type=" converters shared by the controls."""
+
+from __future__ import annotations
+
+import argparse
+import re
+
+SIZE_MULTIPLIERS: dict[str, int] = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+"""Binary multipliers for the size suffixes."""
+
+_SIZE_PATTERN = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", re.IGNORECASE)
+
+
+def size_arg(value: str) -> int:
+    """
+    Convert a size such as "4096", "64K", "1.5M", "2GiB" to a number of bytes greater than zero.
+
+    raises: argparse.ArgumentTypeError
+    """
+    match = _SIZE_PATTERN.fullmatch(value)
+    if match is None:
+        errmsg = f"invalid size: {value!r} (examples: 4096, 64K, 16M, 2G)"
+        raise argparse.ArgumentTypeError(errmsg)
+    result = int(float(match.group(1)) * SIZE_MULTIPLIERS[match.group(2).upper()])
+    if result <= 0:
+        errmsg = f"must be at least one byte: {value!r}"
+        raise argparse.ArgumentTypeError(errmsg)
+    return result
+
+
+def positive_int_arg(value: str) -> int:
+    """
+    Convert value to an integer greater than zero.
+
+    raises: argparse.ArgumentTypeError
+    """
+    try:
+        result = int(value)
+    except ValueError as ex:
+        errmsg = f"invalid integer: {value!r}"
+        raise argparse.ArgumentTypeError(errmsg) from ex
+    if result <= 0:
+        errmsg = f"must be greater than zero: {value!r}"
+        raise argparse.ArgumentTypeError(errmsg)
+    return result
+
+
+def cpu_list_arg(value: str) -> tuple[int, ...]:
+    """
+    Convert a CPU list such as "0-3,8,10-11" (the taskset/cpuset format) to the sorted CPU numbers.
+
+    raises: argparse.ArgumentTypeError
+    """
+    cpus: set[int] = set()
+    for part in value.split(","):
+        first, dash, last = part.strip().partition("-")
+        try:
+            start = int(first)
+            end = int(last) if dash else start
+        except ValueError as ex:
+            errmsg = f"invalid CPU list: {value!r} (examples: 0-3, 0,2,4, 0-3,8-11)"
+            raise argparse.ArgumentTypeError(errmsg) from ex
+        if start < 0 or end < start:
+            errmsg = f"invalid CPU range: {part!r}"
+            raise argparse.ArgumentTypeError(errmsg)
+        cpus.update(range(start, end + 1))
+    return tuple(sorted(cpus))
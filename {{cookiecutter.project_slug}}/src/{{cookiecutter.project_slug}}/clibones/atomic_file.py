@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Write a file atomically: write a temporary file next to it then rename the temporary file over it.
+
+A reader, or a crash part way through the write, sees either the old file or the complete new file, never a
+partial one.  The temporary files are created private (0600), so before the rename they are given the mode of the
+file they replace, or, for a new file, the mode open() would have given it (0666 less the umask).
+
+atomic_open() is used by the config file savers and the controls writing small files, output_control.AtomicOutput
+adds buffering and compression for application results.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_umask_lock = threading.Lock()
+
+
+def _umask() -> int:
+    """The process's umask."""
+    # read, where available, as setting the umask to read it races with other threads creating files
+    with suppress(OSError, ValueError), Path("/proc/self/status").open() as fp:
+        for line in fp:
+            if line.startswith("Umask:"):
+                return int(line.split()[1], 8)
+    with _umask_lock:
+        mask = os.umask(0o077)
+        os.umask(mask)
+    return mask
+
+
+def replacement_mode(path: Path) -> int:
+    """The permissions for a file replacing path: those of the existing file, else 0666 less the umask."""
+    try:
+        return path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_umask()
+
+
+@contextmanager
+def atomic_open(filepath: Path, mode: str = "wt", **kwargs: Any) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file next to filepath that replaces filepath, using rename, when the context exits cleanly.
+
+    On an exception, the temporary file is removed and filepath is left untouched.  The new file has the mode of
+    the file it replaces, or 0666 less the umask for a new file.
+    """
+    with tempfile.NamedTemporaryFile(
+        mode, dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp", delete=False, **kwargs
+    ) as tf:
+        temp_name = Path(tf.name)
+        try:
+            yield tf
+            os.fchmod(tf.fileno(), replacement_mode(filepath))
+        except BaseException:
+            tf.close()
+            temp_name.unlink(missing_ok=True)
+            raise
+    temp_name.rename(filepath)
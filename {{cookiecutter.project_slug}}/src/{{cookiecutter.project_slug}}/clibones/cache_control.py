@@ -0,0 +1,309 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+A disk-backed memoization cache for expensive application results (--cache-dir, --cache-max-size, --no-cache).
+
+CACHE.memoize() decorates a function so its results are kept on disk across runs, keyed by a stable hash of:
+
+* the function's module, qualified name and code (its bytecode, constants and the names it uses, including
+  those of its nested functions), so editing the function invalidates its results,
+* the call's arguments (pickled, with dicts and sets sorted so the hash does not depend on their order),
+* the values of the named settings the result depends on.
+
+Each entry is a pickle file written atomically (a temporary file renamed into place, as TomlConfigFile.save
+does), so concurrent processes never read a partial entry and a reader keeps reading an entry evicted from under
+it.  A hit refreshes the entry's modification time, and when the entries grow past --cache-max-size the least
+recently used are removed, under an exclusive flock of the cache directory's lock file so several processes do
+not evict at once.  Each process only sees the other processes' entries when it scans the directory, so the
+limit may be briefly exceeded while several processes store entries, but holds once they have exited.  The hit,
+miss and eviction counts are logged at exit.
+
+A call whose arguments or result can not be pickled simply runs uncached, as does every call with --no-cache or
+outside the settings context.
+
+Usage::
+
+    @CACHE.memoize("count")
+    def expensive(path: str) -> dict[str, int]: ...
+
+
+    with Settings() as settings:
+        for path in settings.arg_items:
+            summary = expensive(path)
+"""
+
+from __future__ import annotations
+
+import fcntl
+import functools
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from types import CodeType
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import size_arg
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.parser_cache import default_cache_dir
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+    from collections.abc import Callable
+
+    from {{cookiecutter.project_slug}}.clibones.frozen_settings import AnySettings
+
+F = TypeVar("F", bound="Callable[..., Any]")
+
+DEFAULT_CACHE_MAX_SIZE: int = 256 << 20
+"""Default total size of the cache entries (256 MiB)."""
+
+CACHE_EVICT_FRACTION: float = 0.9
+"""Eviction removes entries until they fill this fraction of --cache-max-size, so not every store evicts."""
+
+CACHE_ENTRY_SUFFIX: str = ".pickle"
+CACHE_LOCK_NAME: str = ".lock"
+
+_MISSING: Any = object()
+
+
+def _canonical(value: Any) -> Any:
+    """The value with its dicts and sets replaced by sorted tuples, so equal values pickle the same."""
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((_canonical(k), _canonical(v)) for k, v in value.items()), key=repr)))
+    if isinstance(value, set | frozenset):
+        return ("set", tuple(sorted((_canonical(item) for item in value), key=repr)))
+    if isinstance(value, list | tuple):
+        return type(value)(_canonical(item) for item in value)
+    return value
+
+
+def _code_signature(code: CodeType) -> tuple[Any, ...]:
+    """The parts of the code that change when its source does, the bytecode alone misses edited constants and names."""
+    consts = tuple(_code_signature(const) if isinstance(const, CodeType) else const for const in code.co_consts)
+    return (code.co_code, _canonical(consts), code.co_names)
+
+
+class DiskCache:
+    """The entries of a cache directory and this run's statistics, see the module docstring."""
+
+    def __init__(self) -> None:
+        self.directory: Path | None = None
+        self.max_size: int = DEFAULT_CACHE_MAX_SIZE
+        self.settings: AnySettings | None = None
+        self.hits: int = 0
+        self.misses: int = 0
+        self.stores: int = 0
+        self.evictions: int = 0
+        # the total entry size, None until the first store scans the directory
+        self._size: int | None = None
+        self._created: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def open(
+        self, directory: Path, max_size: int = DEFAULT_CACHE_MAX_SIZE, settings: AnySettings | None = None
+    ) -> None:
+        """
+        Start caching in the directory.
+
+        :param directory: the cache directory, created by the first store
+        :param max_size: the total size of the entries to keep
+        :param settings: the settings memoize() takes the named setting values from
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.settings = settings
+        self.hits = self.misses = self.stores = self.evictions = 0
+        self._size = None
+        self._created = False
+
+    def close(self) -> None:
+        """Stop caching, logging the statistics."""
+        if self.directory is not None and self.stores:
+            # the other processes' stores are only seen by a scan, so the entries fit when the last one exits
+            self.evict()
+        if self.directory is not None and self.hits + self.misses:
+            logger.info(
+                f"Cache: {self.hits} hits, {self.misses} misses, {self.stores} stored, "
+                f"{self.evictions} evicted ({self.directory})"
+            )
+        self.directory = None
+        self.settings = None
+
+    def key(
+        self, func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any], names: tuple[str, ...]
+    ) -> str | None:
+        """The entry key of the call, None when its arguments can not be pickled."""
+        code = getattr(func, "__code__", None)
+        settings = tuple(getattr(self.settings, name, None) for name in names)
+        try:
+            data = pickle.dumps(
+                (
+                    func.__module__,
+                    func.__qualname__,
+                    _code_signature(code) if code else (),
+                    _canonical((args, kwargs, settings)),
+                ),
+                protocol=pickle.DEFAULT_PROTOCOL,
+            )
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return cast("Path", self.directory) / f"{key}{CACHE_ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Any:
+        """The cached value, or _MISSING."""
+        path = self.path(key)
+        try:
+            with path.open("rb") as fp:
+                value = pickle.load(fp)
+            # the modification time orders the entries for the LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            # a miss, or evicted by another process
+            return _MISSING
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            # corrupt or stale (the pickled classes changed), recomputed and replaced
+            return _MISSING
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store the value, evicting the least recently used entries when the cache is full."""
+        try:
+            data = pickle.dumps(value, protocol=pickle.DEFAULT_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        if len(data) > self.max_size:
+            return
+        try:
+            if not self._created:
+                cast("Path", self.directory).mkdir(parents=True, exist_ok=True)
+                self._created = True
+            with atomic_open(self.path(key), "wb") as fp:
+                fp.write(data)
+        except OSError as ex:
+            logger.warning(f"Could not write the cache entry ({self.path(key)}): {ex}")
+            return
+        self.stores += 1
+        if self._size is not None:
+            self._size += len(data)
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until they fit in CACHE_EVICT_FRACTION of the max size."""
+        directory = cast("Path", self.directory)
+        with (directory / CACHE_LOCK_NAME).open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries: list[tuple[float, int, str]] = []
+            with os.scandir(directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(CACHE_ENTRY_SUFFIX):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            size = sum(entry_size for _, entry_size, _ in entries)
+            if size > self.max_size:
+                limit = self.max_size * CACHE_EVICT_FRACTION
+                for _, entry_size, entry_path in sorted(entries):
+                    if size <= limit:
+                        break
+                    Path(entry_path).unlink(missing_ok=True)
+                    size -= entry_size
+                    self.evictions += 1
+            self._size = size
+
+    def memoize(self, *names: str) -> Callable[[F], F]:
+        """
+        Decorate a function to cache its results, see the module docstring.
+
+        :param names: the names of the settings the function's results depend on
+        """
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key = self.key(func, args, kwargs, names)
+                if key is None:
+                    return func(*args, **kwargs)
+                value = self.get(key)
+                if value is not _MISSING:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+                value = func(*args, **kwargs)
+                self.put(key, value)
+                return value
+
+            return cast("F", wrapper)
+
+        return decorator
+
+
+CACHE = DiskCache()
+"""The application's result cache, see the module docstring."""
+
+
+class CacheControl(ControlBase):
+    """Add result cache (--cache-dir, --cache-max-size, --no-cache) argument support."""
+
+    def __init__(self, app_package: str, cache: DiskCache = CACHE) -> None:
+        self.app_package: str = app_package
+        self.cache: DiskCache = cache
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        cache_group = parser.add_argument_group(title="Cache Options", description="")
+
+        cache_group.add_argument(
+            "--cache-dir",
+            dest="cache_dir",
+            metavar="DIR",
+            default=None,
+            help="Keep the cached results in DIR.  (default: ~/.cache/<application>/results)",
+        )
+        cache_group.add_argument(
+            "--cache-max-size",
+            dest="cache_max_size",
+            metavar="SIZE",
+            type=size_arg,
+            default=DEFAULT_CACHE_MAX_SIZE,
+            help="Evict the least recently used results beyond SIZE, for example 64M or 2G.  (default: %(default)s)",
+        )
+        cache_group.add_argument(
+            "--no-cache",
+            dest="no_cache",
+            action="store_true",
+            default=False,
+            help="Always recompute the results, neither reading nor writing the cache.",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if settings.cache_max_size <= 0:
+            return [f"--cache-max-size ({settings.cache_max_size}) must be positive"]
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.no_cache or settings.quick_exit:
+            return
+        directory = Path(settings.cache_dir) if settings.cache_dir else default_cache_dir(self.app_package) / "results"
+        self.cache.open(directory, settings.cache_max_size, settings)
+
+    def teardown(self) -> None:
+        self.cache.close()
@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+The clock the application reads and sleeps on, so tests can substitute a virtual one.
+
+CLOCK is used by the time-driven parts of clibones: the --rate limit and fixed_rate() (rate_control.py),
+GracefulInterruptHandler.wait(), the watchdog deadlines (watchdog_control.py) and the status page heartbeat
+(status_control.py).  Application loops should use it too instead of the time module:
+
+    with GracefulInterruptHandler() as handler:
+        deadline = CLOCK.monotonic() + checkpoint_interval
+        while not handler.interrupted:
+            work()
+            if CLOCK.monotonic() > deadline:
+                checkpoint()
+                deadline += checkpoint_interval
+            handler.wait(poll_interval)  # or CLOCK.sleep(poll_interval)
+
+A VirtualClock never blocks: sleeping advances it instead, so an hour of rate limited iterations runs in
+milliseconds and the time-driven behavior is deterministic.  Time advances when any thread sleeps or waits on
+it, so a background thread polling a VirtualClock (the watchdog) races through its deadlines.  The tests use it
+with the virtual_clock fixture (tests/conftest.py), elsewhere:
+
+    with CLOCK.use(VirtualClock()) as clock:
+        main(["--count", "10"])
+        assert clock.monotonic() - clock.start >= 9
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+VIRTUAL_CLOCK_START: float = 1_000_000.0
+"""The initial monotonic time of a VirtualClock, a monotonic clock has an arbitrary origin."""
+
+C = TypeVar("C", bound="Clock")
+
+
+class Clock:
+    """The real clock, the time module."""
+
+    def monotonic(self) -> float:
+        """Seconds of a clock that never goes backwards, for intervals and deadlines."""
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Seconds since the epoch, for timestamps."""
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: float | None = None) -> bool:
+        """
+        Wait for up to timeout seconds for the event to be set.
+
+        :return: True if the event is set
+        """
+        return event.wait(timeout)
+
+
+class VirtualClock(Clock):
+    """A clock that only advances when it is slept on, waited on or advance() is called."""
+
+    def __init__(self, start: float = VIRTUAL_CLOCK_START, epoch: float | None = None) -> None:
+        """
+        :param start: the initial monotonic time
+        :param epoch: the initial time since the epoch, the real time by default
+        """
+        self.start: float = start
+        self.now: float = start
+        self.epoch: float = time.time() if epoch is None else epoch
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.epoch + self.now - self.start
+
+    def advance(self, seconds: float) -> None:
+        if seconds > 0:
+            with self._lock:
+                self.now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def wait(self, event: threading.Event, timeout: float | None = None) -> bool:
+        """Advance by the timeout unless the event is already set, without a timeout it really waits."""
+        if event.is_set():
+            return True
+        if timeout is None:
+            return event.wait()
+        self.advance(timeout)
+        return event.is_set()
+
+
+class ClockSelector(Clock):
+    """Forwards to the selected clock, so the modules that imported CLOCK follow a substitution."""
+
+    def __init__(self, clock: Clock | None = None) -> None:
+        self.clock: Clock = clock or Clock()
+
+    def monotonic(self) -> float:
+        return self.clock.monotonic()
+
+    def time(self) -> float:
+        return self.clock.time()
+
+    def sleep(self, seconds: float) -> None:
+        self.clock.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: float | None = None) -> bool:
+        return self.clock.wait(event, timeout)
+
+    @contextlib.contextmanager
+    def use(self, clock: C) -> Iterator[C]:
+        """Select the clock within the context."""
+        previous = self.clock
+        self.clock = clock
+        try:
+            yield clock
+        finally:
+            self.clock = previous
+
+
+CLOCK = ClockSelector()
+"""The application's clock, the real clock unless a test selected another with CLOCK.use()."""
@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import argparse
+import copy
 from collections.abc import Callable
 from dataclasses import dataclass
 from json import JSONDecodeError
@@ -18,6 +19,8 @@ from {{cookiecutter.project_slug}}.clibones.config_file_base import ConfigFileBa
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from {{cookiecutter.project_slug}}.clibones.timing_control import PhaseTimer
+
 # ================================================================================
 # Add import of format specific config file then add to SUPPORTED_FORMATS list
 from {{cookiecutter.project_slug}}.clibones.json_config_file import JsonConfigFile
@@ -26,6 +29,18 @@ from {{cookiecutter.project_slug}}.clibones.toml_config_file import TomlConfigFi
 SUPPORTED_FORMATS: list[type[ConfigFileBase]] = [TomlConfigFile, JsonConfigFile]
 # ================================================================================
 
+# Parsed config files keyed by path, validated by the file's (inode, size, mtime), None when not caching.  Only a
+# prewarmed server (see server_control.py) caches, it parses the config file once and its forked children reuse the
+# parsed data, while a single run would only pay for copying the data.
+_load_cache: dict[Path, tuple[tuple[int, int, int], dict[str, Any]]] | None = None
+
+
+def enable_load_cache() -> None:
+    """Keep the parsed config files, so later loads of an unchanged file copy the data instead of parsing it."""
+    global _load_cache  # noqa: PLW0603
+    if _load_cache is None:
+        _load_cache = {}
+
 
 @dataclass
 class ConfigFile:
@@ -76,7 +91,13 @@ class ConfigFile:
             return {}
 
         try:
-            return self.registered_formats[filepath.suffix][0](filepath)
+            loader = self.registered_formats[filepath.suffix][0]
+            stat = filepath.stat()
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            cached = _load_cache.get(filepath) if _load_cache is not None else None
+            if cached is not None and cached[0] == signature:
+                return copy.deepcopy(cached[1])
+            data = loader(filepath)
         except ValueError as ex:
             raise ex
         except KeyError as ex:
@@ -85,6 +106,9 @@ class ConfigFile:
         except (JSONDecodeError, tomlkit.parser.ParseError, TypeError) as ex:
             errmsg = f"The config file ({filepath}) could not be loaded: {ex}"
             raise ValueError(errmsg) from ex
+        if _load_cache is not None:
+            _load_cache[filepath] = (signature, copy.deepcopy(data))
+        return data
 
     def save(self, filepath: Path, config_dict: dict[str, Any]) -> None:
         """
@@ -106,7 +130,9 @@ class ConfigFile:
             errmsg = f"Cannot convert the data to the format of the config file {filepath}: {ex}"
             raise ValueError(errmsg) from ex
 
-    def parser(self, args: Sequence[str]) -> tuple[argparse.ArgumentParser, Sequence[str], dict[str, Any] | None]:
+    def parser(
+        self, args: Sequence[str], timer: PhaseTimer | None = None
+    ) -> tuple[argparse.ArgumentParser, Sequence[str], dict[str, Any] | None]:
         config_parser_help = f"Configuration file (default: {self.default_config_file})"
         dash_config_parser: argparse.ArgumentParser = argparse.ArgumentParser(add_help=False)
         dash_config_parser.add_argument("--config", metavar="FILE", help=config_parser_help)
@@ -115,6 +141,8 @@ class ConfigFile:
         )
         dash_config_parser.add_argument("--save-config-as", metavar="FILE", help=config_parser_help)
         parse_args, remaining_args = dash_config_parser.parse_known_args(args=args)
+        if timer:
+            timer.mark("config pre-parse")
 
         # desired config files may also be located in self.__config_files and in self._default_config_files(),
         # so combine the three possible sources with the "--config FILE" being first in the list.
@@ -135,6 +163,8 @@ class ConfigFile:
             except FileNotFoundError:
                 # the config file doesn't exist, which is ok and means no defaults...
                 pass
+        if timer:
+            timer.mark("config load")
         return dash_config_parser, remaining_args, defaults
 
     @staticmethod
@@ -149,7 +179,8 @@ class ConfigFile:
         if self.save_config_filepath:
             if self.persist_keys:
                 for key in self.persist_keys:
-                    if key in settings:
+                    # TOML has no null, so options that are not set are not persisted
+                    if settings.get(key) is not None:
                         data[key] = settings[key]
 
             self.save(
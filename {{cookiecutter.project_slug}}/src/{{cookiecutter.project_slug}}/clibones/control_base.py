@@ -0,0 +1,46 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, ClassVar
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+
+class ControlBase(ABC):
+    """
+    Base class for the controls that ApplicationSettings adds to the application (see its add_controls()).
+
+    A control contributes an argument group to the parser, may validate and act on the parsed settings,
+    then gets a chance to clean up when the settings context exits.
+    """
+
+    PERSIST_KEYS: ClassVar[frozenset[str]] = frozenset()
+    """The settings keys that may be loaded from and saved to the config file."""
+
+    @abstractmethod
+    def add_arguments(self, parser: ArgumentParser) -> None:  # pragma: no cover
+        """Use argparse commands to add arguments to the given parser."""
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:  # noqa: ARG002
+        """
+        Validate the parsed settings.
+
+        :param settings: the settings object returned by ArgumentParser.parse_args()
+        :return: a list of error messages or an empty list
+        """
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:  # noqa: B027
+        """Set up the given settings."""
+
+    def begin_application(self) -> None:  # noqa: B027
+        """Called when the settings context has been entered, just before the application runs."""
+
+    def teardown(self) -> None:  # noqa: B027
+        """Called when the settings context manager exits."""
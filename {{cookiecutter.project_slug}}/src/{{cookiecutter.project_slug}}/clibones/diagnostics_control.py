@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Signal driven diagnostics for a running application.
+
+* SIGUSR1 logs the stack of every thread plus the current metrics (see metrics_control.py) and, with a
+  --status-file, the status page (see status_control.py), so a run that appears hung can be inspected instead of
+  killed.
+* SIGUSR2 toggles the log level between DEBUG and the level given on the command line, so a slow live process
+  can be made verbose and then quiet again.  The level is changed by replacing the loguru handlers, so there is
+  no filtering overhead afterwards.
+
+Usage::
+
+    $ kill -USR1 <pid>    # dump the stacks
+    $ kill -USR2 <pid>    # DEBUG
+    $ kill -USR2 <pid>    # back to the --loglevel level
+
+The handlers are installed when the settings context is entered (in the main thread) and the previous handlers
+are restored when it exits.  The signal handlers only capture the stacks, the logging is done by a short lived
+thread, so a signal arriving while the main thread holds a logging lock can not deadlock.
+"""
+
+from __future__ import annotations
+
+import signal
+import sys
+import threading
+import traceback
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.metrics_control import METRICS, MetricsRegistry
+from {{cookiecutter.project_slug}}.clibones.status_control import STATUS, StatusPage, read_status
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+    from types import FrameType
+
+    from {{cookiecutter.project_slug}}.clibones.logger_control import LoggerControl
+
+
+def format_thread_stacks() -> str:
+    """The current stack of every thread, most recent call last."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    sections = []
+    for ident, frame in sys._current_frames().items():
+        stack = "".join(traceback.format_stack(frame))
+        sections.append(f'Thread "{names.get(ident, "unknown")}" ({ident}):\n{stack}')
+    return "\n".join(sections)
+
+
+def _in_thread(func: Callable[..., Any], *args: Any) -> None:
+    threading.Thread(target=func, args=args, name="diagnostics", daemon=True).start()
+
+
+class DiagnosticsControl(ControlBase):
+    """Add SIGUSR1 (stack dump) and SIGUSR2 (log level toggle) diagnostics (--no-diagnostics to disable)."""
+
+    def __init__(
+        self,
+        logger_control: LoggerControl | None = None,
+        registry: MetricsRegistry = METRICS,
+        page: StatusPage = STATUS,
+    ) -> None:
+        """
+        :param logger_control: the logger control whose level SIGUSR2 toggles
+        :param registry: the metrics included in the SIGUSR1 dump
+        :param page: the status page included in the SIGUSR1 dump, when it is open
+        """
+        self.logger_control: LoggerControl | None = logger_control
+        self.registry: MetricsRegistry = registry
+        self.page: StatusPage = page
+        self.previous_handlers: dict[int, Any] = {}
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        diagnostics_group = parser.add_argument_group(title="Diagnostics Options", description="")
+
+        diagnostics_group.add_argument(
+            "--no-diagnostics",
+            dest="diagnostics",
+            action="store_false",
+            help="Do not install the SIGUSR1 (log thread stacks and metrics) and SIGUSR2 (toggle DEBUG logging) "
+            "handlers.",
+        )
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if not settings.diagnostics or settings.quick_exit:
+            return
+        # signal handlers can only be installed by the main thread
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self.previous_handlers = {
+            signal.SIGUSR1: signal.signal(signal.SIGUSR1, self._dump_handler),
+            signal.SIGUSR2: signal.signal(signal.SIGUSR2, self._toggle_handler),
+        }
+
+    def teardown(self) -> None:
+        for signum, handler in self.previous_handlers.items():
+            signal.signal(signum, handler)
+        self.previous_handlers = {}
+
+    # noinspection PyUnusedLocal
+    def _dump_handler(self, signum: int, frame: FrameType | None) -> None:  # noqa: ARG002
+        _in_thread(self.dump, format_thread_stacks())
+
+    # noinspection PyUnusedLocal
+    def _toggle_handler(self, signum: int, frame: FrameType | None) -> None:  # noqa: ARG002
+        _in_thread(self.toggle_level)
+
+    def dump(self, stacks: str | None = None) -> None:
+        """Log the thread stacks, the metrics and the status page."""
+        message = f"Diagnostics dump\n{stacks or format_thread_stacks()}"
+        if self.registry.metrics:
+            message += f"\nMetrics:\n{self.registry.to_prometheus()}"
+        # read back as a supervisor would see it, the page's path is None once it is closed
+        path = self.page.path
+        if path is not None:
+            try:
+                message += f"\nStatus:\n{read_status(path).format()}"
+            except (OSError, ValueError) as ex:
+                message += f"\nStatus: could not read the status file ({path}): {ex}"
+        logger.warning(message)
+
+    def toggle_level(self) -> None:
+        """Switch the logging between DEBUG and the level given by the command line arguments."""
+        if self.logger_control is None:
+            return
+        control = self.logger_control
+        # back from DEBUG to the command line level, or to INFO when that was DEBUG too
+        restored = control.level if control.level != "DEBUG" else "INFO"
+        level = "DEBUG" if control.current_level != "DEBUG" else restored
+        for error_message in control.set_level(level):
+            logger.error(error_message)
+        logger.warning(f"Log level is now {level}")
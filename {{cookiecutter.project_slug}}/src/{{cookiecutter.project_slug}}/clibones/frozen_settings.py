@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+The immutable, slotted settings object returned by the ApplicationSettings context manager.
+
+The argparse.Namespace is only used while parsing and setting up the controls.  When the settings context has
+been entered it is frozen into an instance of a class generated from the parsed argument names, with one slot
+per argument, so:
+
+* attribute access is a slot descriptor lookup instead of an instance dict lookup, which matters in hot loops,
+* an instance has no __dict__, so holding many settings snapshots (batch runs, reloads) is cheap,
+* the settings can not be changed by accident, use replace() to derive changed settings.
+
+The generated classes are cached by their argument names, so every run of an application shares one class.
+
+Usage::
+
+    with Settings() as settings:
+        logger.info(pformat(settings.as_dict()))
+        verbose = settings.replace(loglevel="DEBUG")
+"""
+
+from __future__ import annotations
+
+import functools
+import keyword
+from typing import TYPE_CHECKING, Any, Self
+
+if TYPE_CHECKING:
+    import argparse
+    from typing import TypeAlias
+
+
+class FrozenSettings:
+    """Base class of the generated settings classes, see frozen_settings()."""
+
+    __slots__: tuple[str, ...] = ()
+
+    def __init__(self, **values: Any) -> None:
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    if TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any: ...
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        errmsg = f"Cannot set {name}, the settings are frozen, use replace()"
+        raise AttributeError(errmsg)
+
+    def __delattr__(self, name: str) -> None:
+        errmsg = f"Cannot delete {name}, the settings are frozen"
+        raise AttributeError(errmsg)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__slots__
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenSettings):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+    def as_dict(self) -> dict[str, Any]:
+        """The settings as a new dictionary, in argument order."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes: Any) -> Self:
+        """A copy of the settings with the given values changed."""
+        unknown = set(changes) - set(self.__slots__)
+        if unknown:
+            errmsg = f"Unknown settings: {', '.join(sorted(unknown))}"
+            raise AttributeError(errmsg)
+        return type(self)(**{**self.as_dict(), **changes})
+
+
+AnySettings: TypeAlias = "argparse.Namespace | FrozenSettings"
+"""The settings a helper accepts, the controls' Namespace or the frozen settings from the context manager."""
+
+
+@functools.cache
+def frozen_settings_class(names: tuple[str, ...]) -> type[FrozenSettings]:
+    """The settings class with a slot for each of the given argument names."""
+    invalid = [name for name in names if not name.isidentifier() or keyword.iskeyword(name)]
+    if invalid:
+        errmsg = f"Settings names must be identifiers, use dest= for: {', '.join(invalid)}"
+        raise ValueError(errmsg)
+    # a slot would shadow the inherited attribute, e.g. a "replace" argument would hide replace()
+    reserved = [name for name in names if hasattr(FrozenSettings, name)]
+    if reserved:
+        errmsg = f"Settings names must not shadow FrozenSettings attributes, use dest= for: {', '.join(reserved)}"
+        raise ValueError(errmsg)
+    return type("FrozenSettings", (FrozenSettings,), {"__slots__": names})
+
+
+def frozen_settings(namespace: argparse.Namespace) -> FrozenSettings:
+    """Freeze the parsed namespace."""
+    values = vars(namespace)
+    return frozen_settings_class(tuple(values))(**values)
@@ -16,10 +16,13 @@ From:
 from __future__ import annotations
 
 import signal
+import threading
 from collections.abc import Callable
 from types import FrameType
 from typing import Any, Self
 
+from {{cookiecutter.project_slug}}.clibones.clock import CLOCK
+
 
 class GracefulInterruptHandler:
     """
@@ -48,6 +51,7 @@ class GracefulInterruptHandler:
         self.interrupted: bool = False
         self.released: bool = False
         self.original_handler: Callable[[int, FrameType | None], Any] | int | None = None
+        self._event = threading.Event()
 
     def __enter__(self) -> Self:
         return self.capture()
@@ -71,6 +75,7 @@ class GracefulInterruptHandler:
         """
         self.interrupted = False
         self.released = False
+        self._event.clear()
 
         self.original_handler = signal.getsignal(self.sig)
 
@@ -84,11 +89,21 @@ class GracefulInterruptHandler:
             """
             self.release()
             self.interrupted = True
+            self._event.set()
 
         signal.signal(self.sig, handler)
 
         return self
 
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Sleep for up to timeout seconds, waking as soon as the signal is received.
+
+        :return: the interrupted flag
+        """
+        CLOCK.wait(self._event, timeout)
+        return self.interrupted
+
     # noinspection PyUnusedLocal,PyShadowingBuiltins
     def __exit__(self, *exc: Any) -> None:
         self.release()
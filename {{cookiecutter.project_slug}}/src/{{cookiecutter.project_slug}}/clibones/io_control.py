@@ -0,0 +1,301 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Streaming record input/output for data processing CLIs.
+
+IOControl adds --input FILE and --output FILE ("-" is stdin/stdout) along with the buffer and batch sizes.
+Compressed input is detected from its magic number (gzip, zstd), compressed output is selected by the
+file extension (.gz, .zst) or --compress (see output_control.py).  zstd support requires the optional
+"zstandard" package.  An --output FILE is written atomically, so a failed run never leaves a partial output.
+
+Records are read with large buffered reads and split in C (bytes.split), and written in batches with a single
+write call per batch.  Everything is generator based and pull driven, so the reader only reads the next chunk
+when the consumer asks for more records: a multi-GB input is processed in constant memory.
+
+Usage::
+
+    with Settings() as settings, write_records(settings) as writer:
+        for batch in iter_batches(read_records(settings), settings.batch_size):
+            writer.write_batch(record.upper() for record in batch)
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import sys
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from itertools import chain, islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Self, TextIO, cast
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg, size_arg
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.output_control import (
+    AtomicOutput,
+    CompressedWriter,
+    compression_for,
+    import_zstandard,
+)
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+    from {{cookiecutter.project_slug}}.clibones.frozen_settings import AnySettings
+    from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+
+STDIO: str = "-"
+"""The --input/--output file name for stdin/stdout."""
+
+DEFAULT_BUFFER_SIZE: int = 1 << 20
+"""Default read size and file buffer size (1 MiB)."""
+
+DEFAULT_BATCH_SIZE: int = 4096
+"""Default number of records written per write call."""
+
+GZIP_MAGIC: bytes = b"\x1f\x8b"
+ZSTD_MAGIC: bytes = b"\x28\xb5\x2f\xfd"
+
+
+class IOControl(ControlBase):
+    """Add record input/output (--input, --output, --buffer-size, --batch-size) argument support."""
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        io_group = parser.add_argument_group(title="Input/Output Options", description="")
+
+        io_group.add_argument(
+            "--input",
+            dest="input",
+            metavar="FILE",
+            default=STDIO,
+            help='Read records from FILE, "-" for stdin.  gzip and zstd input is detected.  (default: "%(default)s")',
+        )
+        io_group.add_argument(
+            "--output",
+            dest="output",
+            metavar="FILE",
+            default=STDIO,
+            help='Write records to FILE, "-" for stdout.  Compressed when FILE ends with .gz or .zst.  '
+            '(default: "%(default)s")',
+        )
+        io_group.add_argument(
+            "--buffer-size",
+            dest="buffer_size",
+            metavar="SIZE",
+            type=size_arg,
+            default=DEFAULT_BUFFER_SIZE,
+            help="Read and write buffer size, for example 256K or 4M.  (default: %(default)s)",
+        )
+        io_group.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            metavar="N",
+            type=positive_int_arg,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of records per batch.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if settings.input != STDIO and not Path(settings.input).is_file():
+            return [f"--input file ({settings.input}) does not exist"]
+        return []
+
+
+def _stdio(stream: TextIO, mode: str, buffer_size: int) -> BinaryIO:
+    """Wrap the standard stream's file descriptor with a buffer of the given size, without taking ownership."""
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        # replaced stream (for example captured by pytest), so use it as is
+        return stream.buffer
+    raw = io.FileIO(fileno, mode, closefd=False)
+    if mode == "rb":
+        return cast(BinaryIO, io.BufferedReader(raw, buffer_size))
+    stream.flush()
+    return cast(BinaryIO, io.BufferedWriter(raw, buffer_size))
+
+
+@contextmanager
+def open_input(path: str | Path = STDIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[BinaryIO]:
+    """
+    Open the input for binary reading, transparently decompressing gzip and zstd.
+
+    :param path: the file to read, "-" for stdin
+    :param buffer_size: the size of the read buffer
+    """
+    with ExitStack() as stack:
+        if str(path) == STDIO:
+            fp = _stdio(sys.stdin, "rb", buffer_size)
+        else:
+            fp = stack.enter_context(Path(path).open("rb", buffering=buffer_size))
+
+        magic = fp.peek(len(ZSTD_MAGIC)) if hasattr(fp, "peek") else b""
+        if magic.startswith(GZIP_MAGIC):
+            fp = cast(BinaryIO, stack.enter_context(gzip.GzipFile(fileobj=fp, mode="rb")))
+        elif magic.startswith(ZSTD_MAGIC):
+            reader = import_zstandard().ZstdDecompressor().stream_reader(fp, read_size=buffer_size, closefd=False)
+            fp = cast(BinaryIO, stack.enter_context(reader))
+        yield fp
+
+
+@contextmanager
+def open_output(
+    path: str | Path = STDIO,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    compression: str | None = None,
+    level: int | None = None,
+    background: bool = False,
+    fsync: bool = False,
+    handler: GracefulInterruptHandler | None = None,
+) -> Iterator[BinaryIO]:
+    """
+    Open the output for binary writing, compressing when the file name ends with .gz or .zst.
+
+    A FILE is written atomically (see output_control.AtomicOutput): it is only replaced when the context exits
+    without an exception and without the handler being interrupted.
+
+    :param path: the file to write, "-" for stdout
+    :param buffer_size: the size of the write buffer
+    :param compression: one of output_control.COMPRESSIONS, None selects by the file extension
+    :param level: the compression level, None for the compressor's default
+    :param background: compress in a background thread
+    :param fsync: flush the file to disk before committing it
+    :param handler: when given and interrupted, the FILE is left unchanged
+    """
+    if str(path) != STDIO:
+        with AtomicOutput(
+            path, compression, level, buffer_size=buffer_size, background=background, fsync=fsync, handler=handler
+        ) as output:
+            yield cast(BinaryIO, output)
+        return
+
+    fp = _stdio(sys.stdout, "wb", buffer_size)
+    compression = compression_for(path, compression)
+    if compression == "none":
+        yield fp
+    else:
+        writer = CompressedWriter(fp, compression, level, buffer_size, background)
+        try:
+            yield cast(BinaryIO, writer)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+    fp.flush()
+
+
+def iter_record_blocks(
+    fp: BinaryIO, separator: bytes = b"\n", chunk_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[list[bytes]]:
+    """
+    Generate lists of the complete records (without the separator) in each chunk read from the binary stream.
+
+    Reads chunk_size bytes at a time, so memory use is bounded by the chunk size plus the longest record.
+    """
+    remainder = b""
+    while chunk := fp.read(chunk_size):
+        records = (remainder + chunk).split(separator) if remainder else chunk.split(separator)
+        remainder = records.pop()
+        if records:
+            yield records
+    if remainder:
+        yield [remainder]
+
+
+def iter_records(fp: BinaryIO, separator: bytes = b"\n", chunk_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[bytes]:
+    """Generate the records (without the separator) from the binary stream, see iter_record_blocks."""
+    # chain flattens the blocks in C, avoiding a generator resumption per record
+    return chain.from_iterable(iter_record_blocks(fp, separator, chunk_size))
+
+
+def iter_batches(records: Iterable[bytes], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[list[bytes]]:
+    """Group the records into lists of at most batch_size records, only pulling the next batch when asked."""
+    iterator = iter(records)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+class RecordWriter:
+    """
+    Batches records, writing each batch with a single write call.
+
+    Usage::
+
+        with open_output(path) as fp, RecordWriter(fp) as writer:
+            for record in records:
+                writer.write(record)
+    """
+
+    def __init__(self, fp: BinaryIO, separator: bytes = b"\n", batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.fp: BinaryIO = fp
+        self.separator: bytes = separator
+        self.batch_size: int = batch_size
+        self.records_written: int = 0
+        self._batch: list[bytes] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.flush()
+
+    def write(self, record: bytes) -> None:
+        """Add a record to the current batch, writing the batch when it is full."""
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_batch(self, records: Iterable[bytes]) -> None:
+        """Add several records to the current batch."""
+        self._batch.extend(records)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any batched records."""
+        if self._batch:
+            self.records_written += len(self._batch)
+            # the trailing empty record terminates the last record with the separator
+            self._batch.append(b"")
+            self.fp.write(self.separator.join(self._batch))
+            self._batch.clear()
+
+
+def read_records(settings: AnySettings, separator: bytes = b"\n") -> Iterator[bytes]:
+    """Generate the records from the --input file using the --buffer-size."""
+    with open_input(settings.input, settings.buffer_size) as fp:
+        for block in iter_record_blocks(fp, separator, settings.buffer_size):
+            yield from block
+
+
+@contextmanager
+def write_records(
+    settings: AnySettings, separator: bytes = b"\n", handler: GracefulInterruptHandler | None = None
+) -> Iterator[RecordWriter]:
+    """
+    Open the --output file, yielding a RecordWriter using the --buffer-size, --batch-size and output control
+    (--compress, --compress-level, --background-compression, --fsync) settings.  Without the OutputControl, the
+    compression is selected by the file extension and the output is neither compressed in the background nor
+    flushed to disk.
+
+    :param handler: when given and interrupted, the --output FILE is left unchanged
+    """
+    with (
+        open_output(
+            settings.output,
+            settings.buffer_size,
+            compression=getattr(settings, "compress", None),
+            level=getattr(settings, "compress_level", None),
+            background=getattr(settings, "background_compression", False),
+            fsync=getattr(settings, "fsync", False),
+            handler=handler,
+        ) as fp,
+        RecordWriter(fp, separator, settings.batch_size) as writer,
+    ):
+        yield writer
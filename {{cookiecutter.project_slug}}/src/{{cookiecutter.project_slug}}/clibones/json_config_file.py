@@ -5,10 +5,10 @@
 from __future__ import annotations
 
 import json
-import tempfile
 from pathlib import Path
 from typing import Any
 
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
 from {{cookiecutter.project_slug}}.clibones.config_file_base import ConfigFileBase
 
 
@@ -29,7 +29,5 @@ class JsonConfigFile(ConfigFileBase):
     @staticmethod
     def save(filepath: Path, config_dict: dict[str, Any]) -> None:
         # write to temporary file then atomically "switch" it with the original using rename.
-        with tempfile.NamedTemporaryFile("wt", dir=filepath.parent, delete=False) as tf:
+        with atomic_open(filepath, "wt") as tf:
             tf.write(json.dumps(config_dict))
-            temp_name = Path(tf.name)
-        temp_name.rename(filepath)
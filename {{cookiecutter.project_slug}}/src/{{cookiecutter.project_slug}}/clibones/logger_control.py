@@ -7,7 +7,7 @@ from __future__ import annotations
 import argparse
 import sys
 from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 from loguru import logger
 from pathvalidate.argparse import validate_filepath_arg
@@ -75,40 +75,60 @@ class LoggerControl:
             help='File to log messages enabled by "--loglevel" to.',
         )
 
-    @staticmethod
-    def setup(settings: argparse.Namespace) -> None:
+    def __init__(self) -> None:
+        self.level: str = "INFO"
+        """The level given by the command line arguments."""
+        self.current_level: str = "INFO"
+        """The level in use, see set_level()."""
+        self.logfile: str | None = None
+        self._handler_ids: list[int] = []
+
+    def setup(self, settings: argparse.Namespace) -> None:
         level = "INFO"
         error_messages = []
 
-        # convert settings to dictionary, so we can test if argument was passed
-        settings_dict: dict[str, Any] = vars(settings)
-
         # the order of the loglevel processing is important.
         # --quiet has the highest priority followed by --debug then --loglevel
-        if "loglevel" in settings_dict:
-            level = settings_dict["loglevel"]
+        if "loglevel" in settings:
+            level = settings.loglevel
             if level not in LoggerControl.VALID_LOG_LEVELS:
                 error_messages.append(
                     f"Invalid log level {level}, " f"should be one of the following: {LoggerControl.VALID_LOG_LEVELS}"
                 )
                 level = "INFO"
 
-        if settings_dict.get("debug"):
+        if getattr(settings, "debug", False):
             level = "DEBUG"
 
-        if settings_dict.get("quiet"):
+        if getattr(settings, "quiet", False):
             level = "ERROR"
 
         settings.loglevel = level
+        self.level = level
+        self.logfile = getattr(settings, "logfile", None)
         logger.remove(None)
-        logger.add(sys.stdout, level=settings.loglevel, format=LOGURU_SHORT_FORMAT)
-
-        if settings_dict.get("logfile"):
-            filename = settings_dict["logfile"]
-            try:
-                logger.add(filename, level=settings.loglevel)
-            except OSError as ex:
-                error_messages += [f"Could not open logfile ({filename}): {ex}"]
+        self._handler_ids = []
+        error_messages += self.set_level(level)
 
         for msg in error_messages:
             logger.error(msg)
+
+    def set_level(self, level: str) -> list[str]:
+        """
+        Replace the handlers added by setup() with handlers for the given level.
+
+        :param level: one of VALID_LOG_LEVELS
+        :return: a list of error messages or an empty list
+        """
+        error_messages = []
+        for handler_id in self._handler_ids:
+            logger.remove(handler_id)
+        self._handler_ids = [logger.add(sys.stdout, level=level, format=LOGURU_SHORT_FORMAT)]
+        self.current_level = level
+
+        if self.logfile:
+            try:
+                self._handler_ids.append(logger.add(self.logfile, level=level))
+            except OSError as ex:
+                error_messages += [f"Could not open logfile ({self.logfile}): {ex}"]
+        return error_messages
@@ -0,0 +1,218 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Memory budget enforcement (--max-memory SIZE) and peak usage reporting (--memory-report).
+
+--max-memory sets the soft resource limit (RLIMIT_DATA by default, or RLIMIT_AS with --memory-rlimit as) so an
+allocation beyond the budget raises MemoryError instead of growing until the host starts swapping or the OOM
+killer picks a victim.  RLIMIT_AS also counts file mappings, so use the default RLIMIT_DATA with --mmap.
+
+Before that hard stop, a watcher thread polls the memory the resource limit counts, the data segment and anonymous
+mappings (VmData) for RLIMIT_DATA or the whole address space (VmSize) for RLIMIT_AS, rather than the resident set
+size which may be far below either.  Once it passes --memory-soft-limit (a fraction of --max-memory), the watcher
+logs a warning and sends SIGINT to the process.  An application loop using a
+GracefulInterruptHandler then stops cleanly, exactly as if ^C had been pressed.
+
+--memory-report logs the peak resident set size at exit, plus the peak traced Python memory.  It starts
+tracemalloc (one frame per allocation, which still slows allocation heavy code) unless --profile memory is
+already tracing.
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import signal
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import size_arg
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+MEMORY_RLIMITS: dict[str, int] = {"data": resource.RLIMIT_DATA, "as": resource.RLIMIT_AS}
+"""The --memory-rlimit choices."""
+
+DEFAULT_SOFT_LIMIT: float = 0.9
+"""Default soft limit as a fraction of --max-memory."""
+
+MEMORY_USAGE_FIELDS: dict[str, bytes] = {"data": b"VmData:", "as": b"VmSize:"}
+"""The /proc/self/status field (in kB) of the memory counted by each --memory-rlimit."""
+
+MEMORY_POLL_INTERVAL: float = 0.25
+"""Seconds between the watcher's memory checks."""
+
+
+def current_rss() -> int:
+    """The current resident set size in bytes, falling back to the peak when /proc is not available."""
+    try:
+        with open("/proc/self/statm", "rb") as fp:  # noqa: PTH123
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def current_usage(memory_rlimit: str = "data") -> int:
+    """
+    The memory counted by the --memory-rlimit resource limit in bytes, falling back to the resident set size when
+    /proc is not available.
+    """
+    field = MEMORY_USAGE_FIELDS[memory_rlimit]
+    try:
+        with open("/proc/self/status", "rb") as fp:  # noqa: PTH123
+            for line in fp:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return current_rss()
+
+
+def peak_rss() -> int:
+    """The peak resident set size in bytes."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class MemoryWatcher:
+    """Sends SIGINT to this process, once, when the memory counted by the resource limit exceeds the soft limit."""
+
+    def __init__(self, soft_limit: int, memory_rlimit: str = "data", interval: float = MEMORY_POLL_INTERVAL) -> None:
+        """
+        :param soft_limit: the memory, in bytes, that triggers the SIGINT
+        :param memory_rlimit: the MEMORY_RLIMITS key of the resource limit, selects the memory measured
+        :param interval: seconds between the checks
+        """
+        self.soft_limit: int = soft_limit
+        self.memory_rlimit: str = memory_rlimit
+        self.interval: float = interval
+        self.triggered: bool = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="memory-watcher", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            usage = current_usage(self.memory_rlimit)
+            if usage > self.soft_limit:
+                self.triggered = True
+                logger.warning(
+                    f"Memory use ({usage / (1 << 20):,.1f} MiB) exceeds the soft limit "
+                    f"({self.soft_limit / (1 << 20):,.1f} MiB), interrupting"
+                )
+                os.kill(os.getpid(), signal.SIGINT)
+                return
+
+
+class MemoryControl(ControlBase):
+    """Add memory (--max-memory, --memory-rlimit, --memory-soft-limit, --memory-report) argument support."""
+
+    def __init__(self) -> None:
+        self.rlimit: int | None = None
+        self.previous_limits: tuple[int, int] | None = None
+        self.watcher: MemoryWatcher | None = None
+        self.report: bool = False
+        self._started_tracemalloc: bool = False
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        memory_group = parser.add_argument_group(title="Memory Options", description="")
+
+        memory_group.add_argument(
+            "--max-memory",
+            dest="max_memory",
+            metavar="SIZE",
+            type=size_arg,
+            default=None,
+            help="Limit the process memory, for example 4G, allocations beyond it raise MemoryError.",
+        )
+        memory_group.add_argument(
+            "--memory-rlimit",
+            dest="memory_rlimit",
+            choices=tuple(MEMORY_RLIMITS),
+            default="data",
+            help="The resource limit --max-memory sets, RLIMIT_DATA or RLIMIT_AS.  (default: %(default)s)",
+        )
+        memory_group.add_argument(
+            "--memory-soft-limit",
+            dest="memory_soft_limit",
+            metavar="FRACTION",
+            type=float,
+            default=DEFAULT_SOFT_LIMIT,
+            help="Interrupt (SIGINT) the application when its memory, as counted by --memory-rlimit, exceeds this "
+            "fraction of --max-memory.  (default: %(default)s)",
+        )
+        memory_group.add_argument(
+            "--memory-report",
+            dest="memory_report",
+            action="store_true",
+            help="Log the peak resident and traced Python memory at exit.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if not 0 < settings.memory_soft_limit <= 1:
+            return [f"--memory-soft-limit ({settings.memory_soft_limit}) must be greater than 0 and at most 1"]
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.quick_exit:
+            return
+        if settings.max_memory:
+            self._limit(settings.max_memory, MEMORY_RLIMITS[settings.memory_rlimit])
+            if settings.memory_soft_limit < 1:
+                self.watcher = MemoryWatcher(
+                    int(settings.max_memory * settings.memory_soft_limit), settings.memory_rlimit
+                )
+                self.watcher.start()
+        if settings.memory_report:
+            import tracemalloc
+
+            self.report = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(1)
+                self._started_tracemalloc = True
+
+    def _limit(self, max_memory: int, rlimit: int) -> None:
+        """Lower the soft limit, the hard limit is kept so the limit can be restored at teardown."""
+        soft, hard = resource.getrlimit(rlimit)
+        if hard != resource.RLIM_INFINITY and max_memory > hard:
+            logger.warning(f"--max-memory ({max_memory}) is above the hard limit ({hard}), using the hard limit")
+            max_memory = hard
+        resource.setrlimit(rlimit, (max_memory, hard))
+        self.rlimit = rlimit
+        self.previous_limits = (soft, hard)
+
+    def teardown(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self.report:
+            self.report = False
+            import tracemalloc
+
+            message = f"Peak resident memory: {peak_rss() / (1 << 20):,.1f} MiB"
+            if tracemalloc.is_tracing():
+                message += f", peak traced Python memory: {tracemalloc.get_traced_memory()[1] / (1 << 20):,.1f} MiB"
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+            logger.info(message)
+        if self.rlimit is not None and self.previous_limits is not None:
+            resource.setrlimit(self.rlimit, self.previous_limits)
+            self.rlimit = self.previous_limits = None
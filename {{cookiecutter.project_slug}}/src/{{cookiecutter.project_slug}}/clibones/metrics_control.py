@@ -0,0 +1,326 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+In-process counters, gauges and fixed-bucket histograms, exported to a file with --metrics-file FILE.
+
+Updates go to a per-thread cell (a list held in a threading.local), so the hot path takes no lock and threads
+never contend: Counter.inc() is one thread local lookup and one list item update.  Reading a metric sums the
+cells of every thread that has updated it.  The export is in Prometheus text format (for the node_exporter
+textfile collector) or JSON, written atomically at exit and, with --metrics-interval SECONDS, periodically by
+a background thread.
+
+Usage::
+
+    ITEMS = METRICS.counter("app_items_total", "Items processed")
+    LATENCY = METRICS.histogram("app_item_seconds", "Item processing time")
+
+    for item in items:
+        with LATENCY.time():
+            process(item)
+        ITEMS.inc()
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+METRICS_FORMATS: tuple[str, ...] = ("prometheus", "json")
+"""The --metrics-format choices."""
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""Default histogram bucket upper bounds in seconds, the +Inf bucket is implied."""
+
+
+class Metric:
+    """Base class of the metrics, each thread updates its own cell."""
+
+    kind: str = "untyped"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name: str = name
+        self.description: str = description
+        self._cells: list[list[Any]] = []
+        self._cells_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _new_cell(self) -> list[Any]:
+        """Create and register the calling thread's cell, only called on a thread's first update."""
+        cell = self._empty_cell()
+        with self._cells_lock:
+            self._cells.append(cell)
+        self._local.cell = cell
+        return cell
+
+    def _empty_cell(self) -> list[Any]:
+        return [0]
+
+    def _snapshot_cells(self) -> list[list[Any]]:
+        with self._cells_lock:
+            return [list(cell) for cell in self._cells]
+
+    def reset(self) -> None:
+        """Zero the metric, the threads keep updating their (now empty) cells."""
+        with self._cells_lock:
+            for cell in self._cells:
+                cell[:] = self._empty_cell()
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1) -> None:
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            self._new_cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        total: float = sum(cell[0] for cell in self._snapshot_cells())
+        return total
+
+
+class Gauge(Metric):
+    """A value that goes up and down, the last set() from any thread wins."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str) -> None:
+        super().__init__(name, description)
+        self.value: float = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def reset(self) -> None:
+        self.value = 0
+
+
+class Histogram(Metric):
+    """Counts of observations in fixed buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        super().__init__(name, description)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+
+    def _empty_cell(self) -> list[Any]:
+        # a count per bucket, the +Inf bucket, then the sum of the observations
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value: float) -> None:
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._new_cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the elapsed seconds of the with block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def totals(self) -> tuple[list[int], float, int]:
+        """The per bucket (non-cumulative, +Inf last) counts, the sum, and the count of the observations."""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for cell in self._snapshot_cells():
+            for index, count in enumerate(cell[:-1]):
+                counts[index] += count
+            total += cell[-1]
+        return counts, total, sum(counts)
+
+
+class MetricsRegistry:
+    """The named metrics of the application, see the module docstring."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self.start_time: float = time.time()
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric: Metric) -> Any:
+        with self._lock:
+            existing = self.metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric):
+            errmsg = f"Metric {metric.name} is already registered as a {existing.kind}"
+            raise ValueError(errmsg)
+        return existing
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        counter: Counter = self._get_or_create(Counter(name, description))
+        return counter
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        gauge: Gauge = self._get_or_create(Gauge(name, description))
+        return gauge
+
+    def histogram(
+        self, name: str, description: str = "", buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        histogram: Histogram = self._get_or_create(Histogram(name, description, buckets))
+        return histogram
+
+    def reset(self) -> None:
+        """Zero every metric and restart the uptime, the metrics stay registered."""
+        for metric in list(self.metrics.values()):
+            metric.reset()
+        self.start_time = time.time()
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"uptime_seconds": time.time() - self.start_time}
+        for name, metric in sorted(self.metrics.items()):
+            if isinstance(metric, Histogram):
+                counts, total, count = metric.totals()
+                buckets = {str(bound): bucket for bound, bucket in zip(metric.buckets, counts, strict=False)}
+                buckets["+Inf"] = counts[-1]
+                data[name] = {"type": metric.kind, "buckets": buckets, "sum": total, "count": count}
+            elif isinstance(metric, Counter | Gauge):
+                data[name] = {"type": metric.kind, "value": metric.value}
+        return data
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+        for name, metric in sorted(self.metrics.items()):
+            if metric.description:
+                lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            if isinstance(metric, Histogram):
+                counts, total, count = metric.totals()
+                cumulative = 0
+                for bound, bucket in zip((*map(str, metric.buckets), "+Inf"), counts, strict=True):
+                    cumulative += bucket
+                    label = "{" + f'le="{bound}"' + "}"
+                    lines.append(f"{name}_bucket{label} {cumulative}")
+                lines += [f"{name}_sum {total}", f"{name}_count {count}"]
+            elif isinstance(metric, Counter | Gauge):
+                lines.append(f"{name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path, metrics_format: str = "prometheus") -> None:
+        """Atomically write the metrics to path in the given format."""
+        text = json.dumps(self.to_dict(), indent=2) + "\n" if metrics_format == "json" else self.to_prometheus()
+        with atomic_open(path, "wt", encoding="utf-8") as fp:
+            fp.write(text)
+
+
+METRICS = MetricsRegistry()
+"""The application's metrics registry."""
+
+
+class MetricsControl(ControlBase):
+    """Add metrics export (--metrics-file, --metrics-format, --metrics-interval) argument support."""
+
+    def __init__(self, registry: MetricsRegistry = METRICS) -> None:
+        self.registry: MetricsRegistry = registry
+        self.path: Path | None = None
+        self.format: str = "prometheus"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        metrics_group = parser.add_argument_group(title="Metrics Options", description="")
+
+        metrics_group.add_argument(
+            "--metrics-file",
+            dest="metrics_file",
+            metavar="FILE",
+            default=None,
+            help="Write the application's metrics to FILE at exit.",
+        )
+        metrics_group.add_argument(
+            "--metrics-format",
+            dest="metrics_format",
+            choices=METRICS_FORMATS,
+            default=None,
+            help="The --metrics-file format.  (default: json for a .json FILE else prometheus)",
+        )
+        metrics_group.add_argument(
+            "--metrics-interval",
+            dest="metrics_interval",
+            metavar="SECONDS",
+            type=float,
+            default=0.0,
+            help="Also write the --metrics-file every SECONDS, 0 to only write at exit.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if settings.metrics_interval < 0:
+            return [f"--metrics-interval ({settings.metrics_interval}) must not be negative"]
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if not settings.metrics_file or settings.quick_exit:
+            return
+        self.path = Path(settings.metrics_file)
+        self.format = settings.metrics_format or ("json" if self.path.suffix == ".json" else "prometheus")
+        if settings.metrics_interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._export, args=(settings.metrics_interval,), name="metrics-export", daemon=True
+            )
+            self._thread.start()
+
+    def _export(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.write()
+
+    def write(self) -> None:
+        """Export the metrics to the --metrics-file."""
+        if self.path is None:
+            return
+        try:
+            self.registry.write(self.path, self.format)
+        except OSError as ex:
+            logger.error(f"Could not write the metrics file ({self.path}): {ex}")
+
+    def teardown(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+        self.path = None
@@ -0,0 +1,435 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Atomic, buffered output for application results.
+
+This generalizes the write to a temporary file then rename pattern used when saving config files:
+
+* atomic_open() (see atomic_file.py) is the minimal version used by the config file savers.
+* AtomicOutput adds a large write buffer, optional (background) compression, optional fsync, and only renames
+  the temporary file to the output file when the context exits cleanly.  An exception, or an interrupt seen by
+  the optional GracefulInterruptHandler, discards the temporary file so a partial output is never left behind.
+* ShardedOutput gives each parallel worker its own atomic shard, then concatenates the shards, in order, into
+  the output when committed.  Compressed shards concatenate into a valid gzip or zstd stream.
+
+The temporary files are created private (0600), so before the rename they are given the mode of the file they
+replace, or, for a new file, the mode open() would have given it (0666 less the umask).
+
+OutputControl adds the command line arguments (--compress, --compress-level, --background-compression,
+--shards, --fsync) that io_control.write_records() and output_from_settings() use.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import zlib
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Self, cast
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg
+from {{cookiecutter.project_slug}}.clibones.atomic_file import replacement_mode
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+    from {{cookiecutter.project_slug}}.clibones.frozen_settings import AnySettings
+    from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+
+COMPRESSIONS: tuple[str, ...] = ("none", "gzip", "zstd")
+"""The --compress choices."""
+
+COMPRESSION_EXTENSIONS: dict[str, str] = {".gz": "gzip", ".zst": "zstd"}
+"""Compression selected by the output file extension when --compress is not given."""
+
+DEFAULT_BUFFER_SIZE: int = 1 << 20
+"""Default write buffer size (1 MiB)."""
+
+BACKGROUND_QUEUE_SIZE: int = 4
+"""Buffers queued for the background compression thread before write() blocks."""
+
+
+class OutputControl(ControlBase):
+    """Add output (--compress, --compress-level, --background-compression, --shards, --fsync) argument support."""
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        output_group = parser.add_argument_group(title="Output Options", description="")
+
+        output_group.add_argument(
+            "--compress",
+            dest="compress",
+            choices=COMPRESSIONS,
+            default=None,
+            help="Compress the output.  (default: by the --output extension, .gz or .zst)",
+        )
+        output_group.add_argument(
+            "--compress-level",
+            dest="compress_level",
+            metavar="N",
+            type=int,
+            default=None,
+            help="Compression level.  (default: the compressor's default)",
+        )
+        output_group.add_argument(
+            "--background-compression",
+            dest="background_compression",
+            action="store_true",
+            help="Compress in a background thread.  (default: %(default)s)",
+        )
+        output_group.add_argument(
+            "--shards",
+            dest="shards",
+            metavar="N",
+            type=positive_int_arg,
+            default=1,
+            help="Number of output shards written by parallel workers then merged.  (default: %(default)s)",
+        )
+        output_group.add_argument(
+            "--fsync",
+            dest="fsync",
+            action="store_true",
+            help="Flush the output to disk before committing it.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        # --output is added by IOControl, which the application may not use
+        if settings.shards > 1 and getattr(settings, "output", "-") == "-":
+            return ["--shards requires an --output FILE"]
+        return []
+
+
+def compression_for(path: str | Path, compression: str | None = None) -> str:
+    """Resolve the compression, None selects it by the file extension."""
+    if compression is None:
+        return COMPRESSION_EXTENSIONS.get(Path(path).suffix, "none")
+    return compression
+
+
+def import_zstandard() -> Any:
+    """Import the optional zstandard package, used for zstd compression and decompression."""
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError as ex:
+        errmsg = 'zstd compression requires the "zstandard" package (pip install zstandard)'
+        raise ValueError(errmsg) from ex
+    return zstandard
+
+
+def _compressor(compression: str, level: int | None) -> Any:
+    """Return an object with compress(data) and flush() methods."""
+    if compression == "gzip":
+        # wbits=31 writes the gzip header and trailer
+        return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        return import_zstandard().ZstdCompressor(level=3 if level is None else level).compressobj()
+    errmsg = f"Unsupported compression: {compression}"
+    raise ValueError(errmsg)
+
+
+class CompressedWriter:
+    """
+    Buffers writes then compresses each full buffer, optionally in a background thread.
+
+    zlib (gzip) and zstandard release the GIL while compressing, so background compression overlaps with the
+    application producing the next buffer.  The queue between them is bounded, so a slow disk or compressor
+    applies backpressure to write() instead of growing memory.
+
+    close() finishes the compressed stream but does not close the underlying file.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        compression: str,
+        level: int | None = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        background: bool = False,
+    ) -> None:
+        self.fp: BinaryIO = fp
+        self.buffer_size: int = buffer_size
+        self._compressor: Any = _compressor(compression, level)
+        self._buffer = bytearray()
+        self._queue: queue.Queue[bytes | None] | None = None
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+        if background:
+            self._queue = queue.Queue(maxsize=BACKGROUND_QUEUE_SIZE)
+            self._thread = threading.Thread(target=self._compress_queue, name="output-compression", daemon=True)
+            self._thread.start()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self._flush_buffer()
+        return len(data)
+
+    def flush(self) -> None:
+        """Buffered data is only compressed when the buffer fills or on close()."""
+
+    def close(self) -> None:
+        """Compress any buffered data and write the end of the compressed stream."""
+        self._flush_buffer()
+        self._stop_thread()
+        self.fp.write(self._compressor.flush())
+
+    def abort(self) -> None:
+        """Stop the background thread, discarding any buffered data."""
+        self._buffer.clear()
+        with suppress(BaseException):
+            self._stop_thread()
+
+    def _flush_buffer(self) -> None:
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        if self._queue is None:
+            self.fp.write(self._compressor.compress(data))
+        else:
+            self._raise_background_error()
+            self._queue.put(data)
+
+    def _compress_queue(self) -> None:
+        assert self._queue is not None
+        try:
+            while (data := self._queue.get()) is not None:
+                self.fp.write(self._compressor.compress(data))
+        except BaseException as ex:
+            self._error = ex
+            # keep draining so the producer never blocks on a full queue
+            while self._queue.get() is not None:
+                pass
+
+    def _stop_thread(self) -> None:
+        if self._thread is not None and self._queue is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_background_error()
+
+    def _raise_background_error(self) -> None:
+        if self._error is not None:
+            errmsg = f"Output compression failed: {self._error}"
+            raise OSError(errmsg) from self._error
+
+
+class AtomicOutput:
+    """
+    Buffered, optionally compressed, binary output that is renamed into place on commit.
+
+    Usage::
+
+        with GracefulInterruptHandler() as handler, AtomicOutput(path, handler=handler) as out:
+            for item in items:
+                out.write(item)
+                if handler.interrupted:
+                    break
+        # path now has the complete output, or, if interrupted, is unchanged
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        compression: str | None = None,
+        level: int | None = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        background: bool = False,
+        fsync: bool = False,
+        handler: GracefulInterruptHandler | None = None,
+    ) -> None:
+        """
+        :param path: the output file
+        :param compression: one of COMPRESSIONS, None selects by the file extension
+        :param level: the compression level, None for the compressor's default
+        :param buffer_size: the write buffer size
+        :param background: compress in a background thread
+        :param fsync: flush the file to disk before renaming it
+        :param handler: when given and interrupted, the output is discarded instead of committed
+        """
+        self.path: Path = Path(path)
+        self.compression: str = compression_for(self.path, compression)
+        self.level: int | None = level
+        self.buffer_size: int = buffer_size
+        self.background: bool = background
+        self.fsync: bool = fsync
+        self.handler: GracefulInterruptHandler | None = handler
+        self.temp_path: Path | None = None
+        self._file: BinaryIO | None = None
+        self._writer: BinaryIO | CompressedWriter | None = None
+
+    def __enter__(self) -> Self:
+        return self.open()
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc: Any) -> None:
+        if exc_type is None and not (self.handler is not None and self.handler.interrupted):
+            self.commit()
+        else:
+            self.abort()
+
+    def open(self) -> Self:
+        """Create the temporary file."""
+        fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self.temp_path = Path(temp_name)
+        self._file = os.fdopen(fd, "wb", buffering=self.buffer_size)
+        if self.compression == "none":
+            self._writer = self._file
+        else:
+            self._writer = CompressedWriter(
+                self._file, self.compression, self.level, self.buffer_size, background=self.background
+            )
+        return self
+
+    def write(self, data: bytes) -> int:
+        if self._writer is None:
+            errmsg = f"Output {self.path} is not open"
+            raise ValueError(errmsg)
+        return self._writer.write(data)
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def commit(self) -> None:
+        """Finish writing, then rename the temporary file to the output file."""
+        if self._file is None or self.temp_path is None:
+            return
+        try:
+            if isinstance(self._writer, CompressedWriter):
+                self._writer.close()
+            self._file.flush()
+            os.fchmod(self._file.fileno(), replacement_mode(self.path))
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except BaseException:
+            self.abort()
+            raise
+        self._file.close()
+        self.temp_path.rename(self.path)
+        self._file = self._writer = self.temp_path = None
+
+    def abort(self) -> None:
+        """Discard the temporary file."""
+        if isinstance(self._writer, CompressedWriter):
+            self._writer.abort()
+        if self._file is not None:
+            with suppress(OSError):
+                self._file.close()
+        if self.temp_path is not None:
+            self.temp_path.unlink(missing_ok=True)
+        self._file = self._writer = self.temp_path = None
+
+
+@dataclass
+class ShardedOutput:
+    """
+    Output written as numbered shards by parallel workers, merged into the output file when committed.
+
+    ShardedOutput is picklable, so it may be passed to worker processes.
+
+    Usage::
+
+        def worker(sharded: ShardedOutput, index: int) -> None:
+            with sharded.open_shard(index) as out:
+                out.write(b"...")
+
+
+        with ShardedOutput(path, shards=4) as sharded, ProcessPoolExecutor(4) as executor:
+            list(executor.map(worker, [sharded] * 4, range(4)))
+    """
+
+    path: Path
+    shards: int
+    compression: str | None = None
+    level: int | None = None
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+    fsync: bool = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc: Any) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def shard_path(self, index: int) -> Path:
+        """The file the shard with the given index is committed to."""
+        return self.path.with_name(f".{self.path.name}.shard-{index:04d}")
+
+    def open_shard(self, index: int, handler: GracefulInterruptHandler | None = None) -> AtomicOutput:
+        """Return the atomic output for the shard with the given index (0 <= index < shards)."""
+        if not 0 <= index < self.shards:
+            errmsg = f"Shard index {index} is not in the range 0-{self.shards - 1}"
+            raise ValueError(errmsg)
+        return AtomicOutput(
+            self.shard_path(index),
+            compression=compression_for(self.path, self.compression),
+            level=self.level,
+            buffer_size=self.buffer_size,
+            handler=handler,
+        )
+
+    def commit(self) -> None:
+        """Concatenate the shards, in order, into the output file then remove the shards."""
+        missing = [index for index in range(self.shards) if not self.shard_path(index).exists()]
+        if missing:
+            self.abort()
+            errmsg = f"Output {self.path} is missing shards {missing}, no output written"
+            raise ValueError(errmsg)
+        # the shards are already compressed, so the merged output is copied as is
+        with AtomicOutput(self.path, compression="none", buffer_size=self.buffer_size, fsync=self.fsync) as out:
+            for index in range(self.shards):
+                with self.shard_path(index).open("rb") as shard:
+                    shutil.copyfileobj(shard, cast(BinaryIO, out), self.buffer_size)
+        self.abort()
+
+    def abort(self) -> None:
+        """Remove the shards."""
+        for index in range(self.shards):
+            self.shard_path(index).unlink(missing_ok=True)
+
+
+def _output_path(settings: AnySettings, caller: str) -> str:
+    """The --output FILE and --buffer-size are added by IOControl, which the application may not use."""
+    output = getattr(settings, "output", "-")
+    if output == "-":
+        errmsg = f"{caller}() requires an --output FILE (see IOControl)"
+        raise ValueError(errmsg)
+    return str(output)
+
+
+def output_from_settings(settings: AnySettings, handler: GracefulInterruptHandler | None = None) -> AtomicOutput:
+    """The AtomicOutput for the --output FILE using the output control settings."""
+    return AtomicOutput(
+        _output_path(settings, "output_from_settings"),
+        compression=settings.compress,
+        level=settings.compress_level,
+        buffer_size=getattr(settings, "buffer_size", DEFAULT_BUFFER_SIZE),
+        background=settings.background_compression,
+        fsync=settings.fsync,
+        handler=handler,
+    )
+
+
+def sharded_output_from_settings(settings: AnySettings) -> ShardedOutput:
+    """The ShardedOutput for the --output FILE and --shards N using the output control settings."""
+    return ShardedOutput(
+        Path(_output_path(settings, "sharded_output_from_settings")),
+        shards=settings.shards,
+        compression=settings.compress,
+        level=settings.compress_level,
+        buffer_size=getattr(settings, "buffer_size", DEFAULT_BUFFER_SIZE),
+        fsync=settings.fsync,
+    )
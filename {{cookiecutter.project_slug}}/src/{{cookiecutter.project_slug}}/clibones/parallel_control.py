@@ -0,0 +1,220 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Memory-mapped, chunk-parallel processing of a large local --input file.
+
+The input file is split on record boundaries into chunks of about --chunk-size bytes.  Only the (offset, length)
+of each chunk is sent to the worker processes, each of which memory maps the file once and hands a memoryview of
+its chunk to the application's function.  No record data is copied between processes, the workers read straight
+from the shared page cache.
+
+The function must be picklable (defined at module level) and must not keep a reference to the memoryview after
+returning.  Many C functions accept the memoryview directly (re, hashlib, struct, zlib), use view.tobytes() when
+bytes methods such as splitlines() are needed.
+
+Usage::
+
+    def count_words(view: memoryview) -> int:
+        return sum(len(line.split()) for line in view.tobytes().splitlines())
+
+
+    with Settings() as settings:
+        if settings.mmap:
+            total = sum(map_input_chunks(settings, count_words))
+
+To hand large in-memory payloads, rather than file chunks, to worker processes see shared_buffers.py.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import signal
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg, size_arg
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.io_control import GZIP_MAGIC, STDIO, ZSTD_MAGIC
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+    from {{cookiecutter.project_slug}}.clibones.frozen_settings import AnySettings
+
+R = TypeVar("R")
+
+DEFAULT_CHUNK_SIZE: int = 64 << 20
+"""Default chunk size (64 MiB)."""
+
+SUBMITTED_CHUNKS_PER_JOB: int = 2
+"""Chunks in flight per worker, enough to keep the workers busy while bounding the queued results."""
+
+
+def available_cpus() -> int:
+    """The number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1  # pragma: no cover
+
+
+class ParallelControl(ControlBase):
+    """Add memory-mapped parallel input (--mmap, --jobs, --chunk-size) argument support."""
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        parallel_group = parser.add_argument_group(title="Parallel Processing Options", description="")
+
+        parallel_group.add_argument(
+            "--mmap",
+            dest="mmap",
+            action="store_true",
+            help="Memory map the --input FILE and process its chunks in parallel.  (default: %(default)s)",
+        )
+        parallel_group.add_argument(
+            "--jobs",
+            dest="jobs",
+            metavar="N",
+            type=positive_int_arg,
+            default=None,
+            help="Number of worker processes.  (default: the number of available CPUs)",
+        )
+        parallel_group.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            metavar="SIZE",
+            type=size_arg,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Approximate size of the chunks handed to the workers, for example 16M.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if not settings.mmap:
+            return []
+        # --input is added by IOControl, which the application may not use
+        input_path = getattr(settings, "input", STDIO)
+        if input_path == STDIO:
+            return ["--mmap requires a regular --input FILE"]
+        path = Path(input_path)
+        if path.is_file():
+            with path.open("rb") as fp:
+                magic = fp.read(len(ZSTD_MAGIC))
+            if magic.startswith((GZIP_MAGIC, ZSTD_MAGIC)):
+                return [f"--mmap can not be used with the compressed --input file ({path})"]
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.jobs is None:
+            settings.jobs = available_cpus()
+
+
+def chunk_ranges(data: mmap.mmap | bytes, chunk_size: int, separator: bytes = b"\n") -> list[tuple[int, int]]:
+    """
+    Split data into (offset, length) ranges of about chunk_size bytes that end on a separator.
+
+    Only the bytes around each chunk boundary are touched, so this is cheap even for a multi-GB mapping.
+    """
+    ranges: list[tuple[int, int]] = []
+    size = len(data)
+    start = 0
+    while start < size:
+        end = start + chunk_size
+        if end >= size:
+            end = size
+        else:
+            found = data.find(separator, end - 1)
+            end = size if found == -1 else found + len(separator)
+        ranges.append((start, end - start))
+        start = end
+    return ranges
+
+
+_worker_mmap: mmap.mmap | None = None
+_worker_func: Callable[[memoryview], Any] | None = None
+
+
+def _init_worker(path: str, func: Callable[[memoryview], Any]) -> None:
+    """Map the file once per worker process.  The parent handles ^C and cancels the work."""
+    global _worker_mmap, _worker_func  # noqa: PLW0603
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    with Path(path).open("rb") as fp:
+        _worker_mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker_func = func
+
+
+def _process_chunk(offset: int, length: int) -> Any:
+    """Call the worker's function with a zero-copy view of the chunk."""
+    if _worker_mmap is None or _worker_func is None:  # pragma: no cover
+        errmsg = "worker process was not initialized"
+        raise RuntimeError(errmsg)
+    view = memoryview(_worker_mmap)
+    try:
+        with view[offset : offset + length] as chunk:
+            return _worker_func(chunk)
+    finally:
+        view.release()
+
+
+def map_chunks(
+    path: str | Path,
+    func: Callable[[memoryview], R],
+    jobs: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    separator: bytes = b"\n",
+) -> Iterator[R]:
+    """
+    Generate func(chunk) for each chunk of the memory-mapped file, in file order, using a process pool.
+
+    ^C (SIGINT) cancels the chunks that have not started and stops the generator after the running chunks finish.
+
+    :param path: the regular file to process
+    :param func: a picklable function called with a memoryview of each chunk
+    :param jobs: the number of worker processes, defaults to the number of available CPUs
+    :param chunk_size: the approximate chunk size in bytes
+    :param separator: the record separator, chunks always end with a complete record
+    """
+    path = Path(path)
+    if path.stat().st_size == 0:
+        return
+    with path.open("rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        ranges = deque(chunk_ranges(mapped, chunk_size, separator))
+    jobs = min(jobs or available_cpus(), len(ranges))
+    logger.debug(f"Processing {len(ranges)} chunks of {path} with {jobs} workers")
+
+    with (
+        GracefulInterruptHandler() as handler,
+        ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(str(path), func)) as executor,
+    ):
+        pending: deque[Future[R]] = deque()
+
+        def submit(count: int) -> None:
+            for _ in range(min(count, len(ranges))):
+                pending.append(executor.submit(_process_chunk, *ranges.popleft()))
+
+        submit(jobs * SUBMITTED_CHUNKS_PER_JOB)
+        while pending:
+            result = pending.popleft().result()
+            if handler.interrupted:
+                logger.warning(f"Interrupted, cancelling {len(pending) + len(ranges)} chunks")
+                executor.shutdown(wait=True, cancel_futures=True)
+                return
+            submit(1)
+            yield result
+
+
+def map_input_chunks(settings: AnySettings, func: Callable[[memoryview], R]) -> Iterator[R]:
+    """map_chunks() the --input file using the --jobs and --chunk-size settings."""
+    if getattr(settings, "input", STDIO) == STDIO:
+        errmsg = "map_input_chunks() requires a regular --input FILE (see IOControl)"
+        raise ValueError(errmsg)
+    return map_chunks(settings.input, func, jobs=settings.jobs, chunk_size=settings.chunk_size)
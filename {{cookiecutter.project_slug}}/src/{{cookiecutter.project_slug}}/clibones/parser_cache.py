@@ -0,0 +1,314 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+A cache of the application's argument parser specification, so a warm start can skip building the parser.
+
+ApplicationSettings builds the ArgumentParser on every run: the config file parent parser, the info, logger and
+control argument groups, and the application's add_arguments().  An application that opts in, by setting
+parser_cache_dir (for example to default_cache_dir(app_package)) in its ApplicationSettings, keeps a compact
+specification of the built parser (its options, defaults, types and choices) after the first run, and later
+runs parse the command line with ParserSpec.parse_known_args(), a small parser for the common case:
+
+* exact option strings, "--option value", "--option=value" and the flags,
+* store, store_const, store_true and store_false actions with optional (nargs="?") or single values,
+* types, choices, and string defaults converted by the type, exactly as argparse does.
+
+Anything else, an abbreviated or unknown option, --help, an option value starting with "-", a value argparse
+would reject, falls back to building the argparse parser, so the result, including every error message, is
+always argparse's.  A parser using anything the spec can not represent (positionals, append actions, mutually
+exclusive groups, ...) is recorded as not cacheable and always built.
+
+The spec is stored with marshal, which is several times faster to load than JSON and is safe to use as the cache
+key includes the Python version.  The key is a hash of the application package's imported modules (paths, sizes
+and modification times), the Python version and the config file defaults, so editing the code or the config file
+rebuilds the spec.  The arguments added must only depend on these.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
+
+PARSER_SPEC_VERSION: int = 1
+"""Incremented when the spec format changes."""
+
+_SCALARS: tuple[type, ...] = (type(None), bool, int, float, str)
+_CONST_ACTIONS: dict[type[argparse.Action], str] = {
+    argparse._StoreConstAction: "store_const",
+    argparse._StoreTrueAction: "store_const",
+    argparse._StoreFalseAction: "store_const",
+}
+_FALLBACK_ACTIONS: tuple[type[argparse.Action], ...] = (argparse._HelpAction, argparse._VersionAction)
+
+
+def default_cache_dir(app_package: str) -> Path:
+    """The parser cache directory, $XDG_CACHE_HOME/<app_package> or ~/.cache/<app_package>."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / app_package
+
+
+def package_signature(app_package: str) -> list[tuple[str, int, int]] | None:
+    """
+    The (path, size, mtime) of the imported modules of the package, including a __main__ run from the package,
+    or None when the package is not imported.
+    """
+    package = sys.modules.get(app_package)
+    if package is None or not getattr(package, "__file__", None):
+        return None
+    root = os.path.dirname(str(package.__file__)) + os.sep  # noqa: PTH120
+    prefix = f"{app_package}."
+    modules = [
+        module
+        for name, module in list(sys.modules.items())
+        if name in (app_package, "__main__") or name.startswith(prefix)
+    ]
+    paths = {getattr(module, "__file__", None) or "" for module in modules}
+    signature = []
+    for path in sorted(path for path in paths if path.startswith(root)):
+        stat = os.stat(path)  # noqa: PTH116
+        signature.append((path, stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def _type_name(func: Any) -> str | None:
+    """The importable "module:qualname" of a type function, or None."""
+    module, qualname = getattr(func, "__module__", None), getattr(func, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        return None
+    name = f"{module}:{qualname}"
+    try:
+        return name if _resolve(name) is func else None
+    except (ImportError, AttributeError, ValueError):
+        return None
+
+
+def _resolve(name: str) -> Any:
+    module_name, qualname = name.split(":")
+    value: Any = sys.modules.get(module_name) or importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        value = getattr(value, attribute)
+    return value
+
+
+def _is_value(arg: str) -> bool:
+    """An argument argparse would never take for an option, the fast parser does not handle negative numbers."""
+    return not arg.startswith("-") or arg == "-"
+
+
+class _Fallback(Exception):  # noqa: N818
+    """Raised when the arguments must be parsed, or the parser is only handled, by argparse."""
+
+
+def _plain(value: Any) -> Any:
+    """The value as its builtin scalar type (config file values may be subclasses), the spec holds only these."""
+    for kind in _SCALARS:
+        if isinstance(value, kind):
+            return value if type(value) is kind else kind(value)
+    raise _Fallback
+
+
+class ParserSpec:
+    """The options of an ArgumentParser, see the module docstring."""
+
+    def __init__(self, actions: list[dict[str, Any]] | None, defaults: dict[str, Any] | None = None) -> None:
+        """
+        :param actions: the options in parser order, None when the parser can not be cached
+        :param defaults: the parser level defaults (ArgumentParser.set_defaults())
+        """
+        self.actions: list[dict[str, Any]] | None = actions
+        self.defaults: dict[str, Any] = defaults or {}
+        self._options: dict[str, dict[str, Any]] = {}
+        self._types: dict[str, Any] = {}
+        for action in actions or []:
+            for option in action["options"]:
+                self._options[option] = action
+            if action.get("type"):
+                self._types[action["type"]] = _resolve(action["type"])
+
+    @property
+    def cacheable(self) -> bool:
+        return self.actions is not None
+
+    @classmethod
+    def from_parser(cls, parser: argparse.ArgumentParser) -> ParserSpec:
+        """The spec of the parser, not cacheable when it uses anything parse_known_args() does not handle."""
+        if parser.prefix_chars != "-" or parser.fromfile_prefix_chars or parser._mutually_exclusive_groups:
+            return cls(None)
+        try:
+            actions = [cls._action_spec(action) for action in parser._actions]
+            defaults = {dest: _plain(value) for dest, value in parser._defaults.items()}
+        except _Fallback:
+            return cls(None)
+        return cls(actions, defaults)
+
+    @staticmethod
+    def _action_spec(action: argparse.Action) -> dict[str, Any]:
+        if not action.option_strings:
+            raise _Fallback
+        spec: dict[str, Any] = {"options": list(action.option_strings), "dest": action.dest}
+        if isinstance(action, _FALLBACK_ACTIONS):
+            return {**spec, "kind": "fallback", "default": _plain(action.default)}
+        kind = "store" if type(action) is argparse._StoreAction else _CONST_ACTIONS.get(type(action))
+        if kind is None or (kind == "store" and action.nargs not in (None, "?")):
+            raise _Fallback
+        type_name = None
+        if action.type is not None:
+            type_name = _type_name(action.type)
+            if type_name is None:
+                raise _Fallback
+        choices = action.choices
+        if choices is not None:
+            if not isinstance(choices, list | tuple):
+                raise _Fallback
+            choices = [_plain(choice) for choice in choices]
+        return {
+            **spec,
+            "kind": kind,
+            "nargs": action.nargs,
+            "const": _plain(action.const),
+            "default": _plain(action.default),
+            "type": type_name,
+            "choices": choices,
+            "required": action.required,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"version": PARSER_SPEC_VERSION, "actions": self.actions, "defaults": self.defaults}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ParserSpec | None:
+        if data.get("version") != PARSER_SPEC_VERSION:
+            return None
+        return cls(data["actions"], data["defaults"])
+
+    def _value(self, action: dict[str, Any], arg: str) -> Any:
+        """The converted and checked value of an option, argparse reports the errors."""
+        value: Any = arg
+        if action["type"]:
+            try:
+                value = self._types[action["type"]](arg)
+            except (argparse.ArgumentTypeError, TypeError, ValueError) as ex:
+                raise _Fallback from ex
+        if action["choices"] is not None and value not in action["choices"]:
+            raise _Fallback
+        return value
+
+    def _option(self, args: list[str], index: int) -> tuple[dict[str, Any], Any, int]:
+        """The action and value of the option at args[index], and the index of the next argument."""
+        arg = args[index]
+        option, explicit = arg, None
+        if arg not in self._options and arg.startswith("--") and "=" in arg:
+            option, explicit = arg.split("=", 1)
+        action = self._options.get(option)
+        if action is None or action["kind"] == "fallback":
+            raise _Fallback
+        if action["kind"] == "store_const":
+            if explicit is not None:
+                raise _Fallback
+            return action, action["const"], index + 1
+        if explicit is not None:
+            return action, self._value(action, explicit), index + 1
+        if index + 1 < len(args) and _is_value(args[index + 1]):
+            return action, self._value(action, args[index + 1]), index + 2
+        if action["nargs"] == "?":
+            const = action["const"]
+            return action, self._value(action, const) if isinstance(const, str) else const, index + 1
+        raise _Fallback
+
+    def _namespace(self, values: dict[str, Any], seen: set[int]) -> argparse.Namespace:
+        """The namespace of the parsed values, with the defaults set in argparse's order."""
+        namespace = argparse.Namespace()
+        for action in self.actions or []:
+            if action.get("required") and id(action) not in seen:
+                raise _Fallback
+            if not hasattr(namespace, action["dest"]) and action["default"] != argparse.SUPPRESS:
+                setattr(namespace, action["dest"], action["default"])
+        for dest, default in self.defaults.items():
+            if not hasattr(namespace, dest):
+                setattr(namespace, dest, default)
+        for dest, value in values.items():
+            setattr(namespace, dest, value)
+        # argparse converts the string defaults of the options that were not given
+        for action in self.actions or []:
+            if (
+                action["kind"] == "store"
+                and action["type"]
+                and isinstance(action["default"], str)
+                and action["dest"] not in values
+                and getattr(namespace, action["dest"], None) == action["default"]
+            ):
+                try:
+                    setattr(namespace, action["dest"], self._types[action["type"]](action["default"]))
+                except (argparse.ArgumentTypeError, TypeError, ValueError) as ex:
+                    raise _Fallback from ex
+        return namespace
+
+    def parse_known_args(self, args: list[str]) -> tuple[argparse.Namespace, list[str]] | None:
+        """The result of ArgumentParser.parse_known_args(args), or None when argparse must be used."""
+        if self.actions is None:
+            return None
+        values: dict[str, Any] = {}
+        seen: set[int] = set()
+        extras: list[str] = []
+        index = 0
+        try:
+            while index < len(args):
+                if _is_value(args[index]):
+                    extras.append(args[index])
+                    index += 1
+                    continue
+                action, value, index = self._option(args, index)
+                values[action["dest"]] = value
+                seen.add(id(action))
+            return self._namespace(values, seen), extras
+        except _Fallback:
+            return None
+
+
+class ParserCache:
+    """The parser specs of an application, one file per cache key."""
+
+    def __init__(self, directory: Path, app_package: str) -> None:
+        self.directory: Path = directory
+        self.app_package: str = app_package
+
+    def key(self, defaults: dict[str, Any], *extra: str) -> str | None:
+        """The cache key of the parser built with the given config file defaults, None when not cacheable."""
+        signature = package_signature(self.app_package)
+        if signature is None:
+            return None
+        digest = hashlib.sha256(repr((sys.version, signature, extra)).encode())
+        digest.update(json.dumps(defaults, sort_keys=True, default=repr).encode())
+        return digest.hexdigest()[:32]
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"parser-{key}.spec"
+
+    def load(self, key: str) -> ParserSpec | None:
+        try:
+            return ParserSpec.from_dict(marshal.loads(self.path(key).read_bytes()))
+        except (OSError, EOFError, ValueError, KeyError, TypeError, AttributeError, ImportError):
+            return None
+
+    def store(self, key: str, spec: ParserSpec) -> None:
+        """Save the spec, replacing the specs of older code or config files."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for stale in self.directory.glob("parser-*.spec"):
+                stale.unlink(missing_ok=True)
+            with atomic_open(self.path(key), "wb") as fp:
+                fp.write(marshal.dumps(spec.to_dict()))
+        except OSError:
+            # the cache is only an optimization, a read-only home directory just means cold starts
+            pass
@@ -0,0 +1,225 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Profile the application with --profile {cpu,memory}.
+
+The profiler is started when the settings context is entered and stopped when it exits, so it covers the
+application without any change to main().  Nothing is imported or installed unless --profile is given.
+
+--profile cpu (cProfile) writes:
+
+* FILE, the pstats file (python3 -m pstats FILE, snakeviz FILE).
+* FILE.collapsed, collapsed stacks in microseconds for flamegraph.pl, speedscope or inferno.  cProfile only
+  records caller/callee pairs, so the stacks are reconstructed by splitting each function's time between its
+  callers in proportion to their cumulative time.
+
+--profile memory (tracemalloc) writes:
+
+* FILE, a report of the --profile-top N allocation sites still allocated at exit plus the peak traced memory.
+* FILE.collapsed, collapsed allocation stacks in bytes.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    import cProfile
+    import pstats
+    import tracemalloc
+    from argparse import ArgumentParser
+
+PROFILE_MODES: tuple[str, ...] = ("cpu", "memory")
+"""The --profile choices."""
+
+DEFAULT_PROFILE_OUT: dict[str, str] = {"cpu": "profile.pstats", "memory": "profile.memory.txt"}
+"""The --profile-out FILE for each mode when not given."""
+
+DEFAULT_PROFILE_TOP: int = 25
+"""Default number of allocation sites in the memory report."""
+
+TRACEMALLOC_FRAMES: int = 32
+"""Frames kept per allocation by tracemalloc."""
+
+MAX_STACK_DEPTH: int = 128
+"""Deepest reconstructed cpu stack."""
+
+MIN_STACK_SECONDS: float = 1e-6
+"""Reconstructed cpu stacks with less time than this are dropped."""
+
+
+class ProfilerControl(ControlBase):
+    """Add profiling (--profile, --profile-out, --profile-top) argument support."""
+
+    def __init__(self) -> None:
+        self.mode: str | None = None
+        self.out: Path | None = None
+        self.top: int = DEFAULT_PROFILE_TOP
+        self._profiler: cProfile.Profile | None = None
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        profile_group = parser.add_argument_group(title="Profiling Options", description="")
+
+        profile_group.add_argument(
+            "--profile",
+            dest="profile",
+            choices=PROFILE_MODES,
+            default=None,
+            help="Profile the application's cpu time (cProfile) or memory allocations (tracemalloc).",
+        )
+        profile_group.add_argument(
+            "--profile-out",
+            dest="profile_out",
+            metavar="FILE",
+            default=None,
+            help=f"The profile report, a FILE.collapsed stack file is also written.  (default: {DEFAULT_PROFILE_OUT})",
+        )
+        profile_group.add_argument(
+            "--profile-top",
+            dest="profile_top",
+            metavar="N",
+            type=positive_int_arg,
+            default=DEFAULT_PROFILE_TOP,
+            help="Number of allocation sites in the memory report.  (default: %(default)s)",
+        )
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if not settings.profile or settings.quick_exit:
+            return
+        self.mode = settings.profile
+        self.out = Path(settings.profile_out or DEFAULT_PROFILE_OUT[settings.profile])
+        self.top = settings.profile_top
+        if self.mode == "cpu":
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            import tracemalloc
+
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def teardown(self) -> None:
+        if self.mode is None or self.out is None:
+            return
+        mode, out = self.mode, self.out
+        self.mode = None
+        if mode == "cpu" and self._profiler is not None:
+            self._profiler.disable()
+            write_cpu_profile(self._profiler, out)
+            self._profiler = None
+        elif mode == "memory":
+            import tracemalloc
+
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            write_memory_profile(snapshot, peak, out, self.top)
+        logger.info(f"Wrote the {mode} profile to {out} and {collapsed_path(out)}")
+
+
+def collapsed_path(path: Path) -> Path:
+    """The collapsed stack file written next to the profile report."""
+    return path.with_name(f"{path.name}.collapsed")
+
+
+def write_collapsed(stacks: dict[str, float], path: Path) -> None:
+    """Write "frame;frame;frame count" lines, heaviest first, dropping stacks that round to zero."""
+    with atomic_open(path, "wt", encoding="utf-8") as fp:
+        for stack, count in sorted(stacks.items(), key=lambda item: -item[1]):
+            if round(count) > 0:
+                fp.write(f"{stack} {round(count)}\n")
+
+
+def _frame_label(func: tuple[str, int, str]) -> str:
+    """pstats function key (file, line, name) as a flamegraph frame, which must not contain ";"."""
+    filename, line, name = func
+    label = name if filename == "~" else f"{name} ({Path(filename).name}:{line})"
+    return label.replace(";", ":")
+
+
+def collapsed_cpu_stacks(stats: pstats.Stats) -> dict[str, float]:
+    """
+    Reconstruct collapsed stacks, weighted in microseconds, from the pstats caller graph.
+
+    :param stats: the profile statistics
+    :return: "frame;frame;frame" -> self time in microseconds
+    """
+    raw: dict[Any, Any] = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Any, list[tuple[Any, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    stacks: dict[str, float] = defaultdict(float)
+
+    def walk(func: Any, path: tuple[str, ...], on_path: frozenset[Any], share: float) -> None:
+        self_time = raw[func][2]
+        frames = (*path, _frame_label(func))
+        stacks[";".join(frames)] += self_time * share * 1e6
+        if len(frames) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, []):
+            callee_time = raw[callee][3]
+            # recursion is folded into the first occurrence of the function on the stack
+            if callee in on_path or callee_time <= 0 or edge_time * share < MIN_STACK_SECONDS:
+                continue
+            walk(callee, frames, on_path | {callee}, share * edge_time / callee_time)
+
+    for func, value in raw.items():
+        if not value[4]:
+            walk(func, (), frozenset({func}), 1.0)
+    return stacks
+
+
+def write_cpu_profile(profiler: cProfile.Profile, path: Path) -> None:
+    """Write the pstats file and its collapsed stacks."""
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(path)
+    write_collapsed(collapsed_cpu_stacks(stats), collapsed_path(path))
+
+
+def write_memory_profile(snapshot: tracemalloc.Snapshot, peak: int, path: Path, top: int) -> None:
+    """Write the top allocation sites report and the collapsed allocation stacks."""
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+            tracemalloc.Filter(inclusive=False, filename_pattern="<frozen importlib._bootstrap*>"),
+        )
+    )
+    statistics = snapshot.statistics("lineno")
+    total = sum(statistic.size for statistic in statistics)
+    with atomic_open(path, "wt", encoding="utf-8") as fp:
+        fp.write(f"Peak traced memory: {peak / 1024:,.1f} KiB\n")
+        fp.write(f"Allocated at exit: {total / 1024:,.1f} KiB in {len(statistics)} sites\n\n")
+        fp.write(f"Top {top} allocation sites:\n")
+        for index, statistic in enumerate(statistics[:top], 1):
+            frame = statistic.traceback[0]
+            fp.write(
+                f"{index:>4}. {frame.filename}:{frame.lineno}: "
+                f"{statistic.size / 1024:,.1f} KiB in {statistic.count} blocks\n"
+            )
+
+    stacks: dict[str, float] = defaultdict(float)
+    for statistic in snapshot.statistics("traceback"):
+        # tracemalloc tracebacks are ordered from the oldest frame to the most recent
+        frames = (f"{Path(frame.filename).name}:{frame.lineno}" for frame in statistic.traceback)
+        stacks[";".join(frames)] += statistic.size
+    write_collapsed(stacks, collapsed_path(path))
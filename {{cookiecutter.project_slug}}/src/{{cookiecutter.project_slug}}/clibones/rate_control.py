@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Rate limiting of the application loop (--rate OPS, --burst N).
+
+RATE is a token bucket: operations are admitted at --rate per second on average, with up to --burst admitted
+back to back after an idle period, so an application saturates, but never exceeds, a downstream service's
+capacity.  It is implemented as the generic cell rate algorithm: the bucket only keeps the theoretical arrival
+time of the next operation, which advances by exactly 1/rate per operation.  The deadlines are computed from the
+monotonic clock rather than by sleeping a fixed interval, so neither the work done between operations nor a late
+wake up accumulates drift.  acquire() reserves a slot under a lock before waiting, so threads sharing the bucket
+are admitted in order, and split() divides the rate between worker processes.
+
+fixed_rate() generates ticks on a fixed grid (start + n * interval), with optional jitter that spreads the ticks
+of many clients without shifting the grid.  A late iteration does not delay the later ticks, the missed ticks are
+skipped instead of being run back to back.
+
+Both wait with GracefulInterruptHandler.wait() when given a handler, so ^C ends the wait immediately.  They read
+and sleep on CLOCK (clock.py), so a VirtualClock runs them at full speed.
+
+Usage::
+
+    with Settings() as settings, GracefulInterruptHandler() as handler:
+        for request in requests:
+            if not RATE.acquire(handler=handler):
+                break
+            send(request)
+
+        for tick in fixed_rate(60.0, jitter=0.1, handler=handler):
+            poll()
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+from typing import TYPE_CHECKING
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg
+from {{cookiecutter.project_slug}}.clibones.clock import CLOCK
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+    from collections.abc import Callable, Iterator
+
+    from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+
+
+def interruptible_sleep(seconds: float, handler: GracefulInterruptHandler | None = None) -> bool:
+    """
+    Sleep, waking early when the handler is interrupted.
+
+    :return: True unless the handler was interrupted
+    """
+    if handler is None:
+        CLOCK.sleep(seconds)
+        return True
+    if seconds > 0:
+        return not handler.wait(seconds)
+    return not handler.interrupted
+
+
+class TokenBucket:
+    """Admits operations at rate per second with bursts of up to burst operations, see the module docstring."""
+
+    def __init__(self, rate: float = 0.0, burst: int = 1, clock: Callable[[], float] = CLOCK.monotonic) -> None:
+        """
+        :param rate: operations per second, 0 for unlimited
+        :param burst: the operations admitted back to back after an idle period
+        :param clock: the monotonic clock, in seconds
+        """
+        self.clock: Callable[[], float] = clock
+        self._lock = threading.Lock()
+        self.rate: float = 0.0
+        self.burst: int = 1
+        self.configure(rate, burst)
+
+    def configure(self, rate: float, burst: int = 1) -> None:
+        """Set the rate and burst, starting with a full bucket."""
+        if rate < 0 or burst < 1:
+            errmsg = f"The rate ({rate}) must not be negative and the burst ({burst}) must be at least 1"
+            raise ValueError(errmsg)
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self.interval: float = 1.0 / rate if rate else 0.0
+            # the theoretical arrival time of the next operation
+            self._tat: float = -math.inf
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate == 0
+
+    def split(self, parts: int) -> TokenBucket:
+        """A bucket with the rate and burst divided between parts workers."""
+        return TokenBucket(self.rate / parts, max(1, self.burst // parts), self.clock)
+
+    def _reserve(self, tokens: int, now: float) -> float:
+        """The seconds until tokens may be taken, the caller must hold the lock."""
+        tat = max(self._tat, now)
+        return max(0.0, tat + (tokens - self.burst) * self.interval - now)
+
+    def delay(self, tokens: int = 1) -> float:
+        """The seconds until tokens could be taken, without taking them."""
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            return self._reserve(tokens, self.clock())
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take the tokens when that does not require waiting."""
+        if self.unlimited:
+            return True
+        with self._lock:
+            now = self.clock()
+            if self._reserve(tokens, now) > 0:
+                return False
+            self._tat = max(self._tat, now) + tokens * self.interval
+            return True
+
+    def acquire(self, tokens: int = 1, handler: GracefulInterruptHandler | None = None) -> bool:
+        """
+        Take the tokens, waiting for them as needed.
+
+        :param tokens: the number of operations, at most burst
+        :param handler: wake and return False when it is interrupted
+        :return: True unless the handler was interrupted
+        """
+        if self.unlimited:
+            return handler is None or not handler.interrupted
+        with self._lock:
+            now = self.clock()
+            wait = self._reserve(tokens, now)
+            self._tat = max(self._tat, now) + tokens * self.interval
+        return interruptible_sleep(wait, handler)
+
+
+def fixed_rate(
+    interval: float,
+    jitter: float = 0.0,
+    handler: GracefulInterruptHandler | None = None,
+    clock: Callable[[], float] = CLOCK.monotonic,
+) -> Iterator[int]:
+    """
+    Generate the tick numbers at a fixed rate, the first immediately, until the handler is interrupted.
+
+    :param interval: seconds between the ticks
+    :param jitter: each tick is delayed by a random fraction, up to jitter, of the interval
+    :param handler: stop when it is interrupted
+    :param clock: the monotonic clock, in seconds
+    """
+    if interval <= 0 or not 0 <= jitter < 1:
+        errmsg = f"The interval ({interval}) must be positive and the jitter ({jitter}) in [0, 1)"
+        raise ValueError(errmsg)
+    start = clock()
+    tick = 0
+    while True:
+        deadline = start + (tick + random.uniform(0, jitter)) * interval
+        if not interruptible_sleep(deadline - clock(), handler):
+            return
+        yield tick
+        # the next tick on the grid that is still ahead
+        tick = max(tick + 1, math.ceil((clock() - start) / interval))
+
+
+RATE = TokenBucket()
+"""The application's rate limit, configured by --rate and --burst."""
+
+
+class RateControl(ControlBase):
+    """Add rate limiting (--rate, --burst) argument support."""
+
+    def __init__(self, bucket: TokenBucket = RATE) -> None:
+        self.bucket: TokenBucket = bucket
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        rate_group = parser.add_argument_group(title="Rate Limit Options", description="")
+
+        rate_group.add_argument(
+            "--rate",
+            dest="rate",
+            metavar="OPS",
+            type=float,
+            default=0.0,
+            help="Limit the application to OPS operations per second, 0 for unlimited.  (default: %(default)s)",
+        )
+        rate_group.add_argument(
+            "--burst",
+            dest="burst",
+            metavar="N",
+            type=positive_int_arg,
+            default=1,
+            help="Operations allowed back to back, within the --rate, after an idle period.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if settings.rate < 0:
+            return [f"--rate ({settings.rate}) must not be negative"]
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.quick_exit or settings.rate < 0:
+            return
+        self.bucket.configure(settings.rate, settings.burst)
+
+    def teardown(self) -> None:
+        self.bucket.configure(0.0)
@@ -0,0 +1,191 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Resource placement on shared hosts: CPU affinity (--cpus LIST), niceness (--nice N) and native thread pools
+(--native-threads N).
+
+ResourceControl is set up before the other controls, so the placement applies to everything the application
+does after the settings context is entered:
+
+* --cpus pins the process to the CPUs (taskset format, "0-3,8"), which worker processes inherit.  The default
+  --jobs (see parallel_control.py) is the number of these CPUs, and pinned_workers() partitions them between the
+  workers of a process pool so each worker stays on its own cores.
+* --nice lowers the process priority by N, as nice -n N does.  It can not be raised again without privileges.
+* --native-threads sets the thread pool size variables read by OpenMP, OpenBLAS, MKL, Accelerate, BLIS and
+  numexpr, so numeric libraries do not each start a thread per core.  The libraries read them when they are
+  loaded, so import them after the settings context is entered.  Worker processes inherit the variables.
+
+The applied placement is logged.  The affinity and the variables are restored when the settings context exits.
+
+Usage::
+
+    with Settings() as settings:
+        import numpy  # sized by --native-threads
+
+        with ProcessPoolExecutor(settings.jobs, **pinned_workers(settings.jobs)) as executor:
+            ...
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import cpu_list_arg, positive_int_arg
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+    from collections.abc import Iterable
+    from multiprocessing.context import BaseContext
+    from multiprocessing.sharedctypes import Synchronized
+
+NATIVE_THREAD_VARIABLES: tuple[str, ...] = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+"""The environment variables that size the native thread pools of the numeric libraries."""
+
+MIN_NICE: int = 0
+MAX_NICE: int = 19
+
+
+def format_cpu_list(cpus: Iterable[int]) -> str:
+    """The CPUs in the taskset format, "0-3,8"."""
+    ranges: list[list[int]] = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def partition_cpus(cpus: Iterable[int], parts: int) -> list[tuple[int, ...]]:
+    """Split the CPUs into parts contiguous groups of (nearly) equal size, sharing CPUs when there are fewer."""
+    ordered = sorted(cpus)
+    if parts >= len(ordered):
+        return [(ordered[index % len(ordered)],) for index in range(parts)]
+    size, extra = divmod(len(ordered), parts)
+    partitions = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < extra else 0)
+        partitions.append(tuple(ordered[start:end]))
+        start = end
+    return partitions
+
+
+def _pin_worker(partitions: list[tuple[int, ...]], counter: Synchronized[int]) -> None:
+    """Pin the starting worker process to the next partition."""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    os.sched_setaffinity(0, partitions[index % len(partitions)])
+
+
+def pinned_workers(jobs: int, context: BaseContext | None = None) -> dict[str, Any]:
+    """
+    The ProcessPoolExecutor (or multiprocessing.Pool) initializer arguments that pin each of the jobs workers to its
+    own partition of this process's CPUs, empty when the platform does not support affinity.
+
+    :param jobs: the number of workers
+    :param context: the pool's multiprocessing context, None for the default
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return {}
+    partitions = partition_cpus(os.sched_getaffinity(0), jobs)
+    counter = (context or multiprocessing.get_context()).Value("i", 0)
+    return {"initializer": _pin_worker, "initargs": (partitions, counter)}
+
+
+class ResourceControl(ControlBase):
+    """Add resource placement (--cpus, --nice, --native-threads) argument support."""
+
+    def __init__(self) -> None:
+        self._affinity: set[int] | None = None
+        self._environ: dict[str, str | None] = {}
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        resource_group = parser.add_argument_group(title="Resource Options", description="")
+
+        resource_group.add_argument(
+            "--cpus",
+            dest="cpus",
+            metavar="LIST",
+            type=cpu_list_arg,
+            default=None,
+            help='Run on the CPUs in LIST, for example "0-3,8".  Worker processes inherit them.  (default: all)',
+        )
+        resource_group.add_argument(
+            "--nice",
+            dest="nice",
+            metavar="N",
+            type=int,
+            default=0,
+            help=f"Lower the priority by N ({MIN_NICE}-{MAX_NICE}), as nice -n N does.  (default: %(default)s)",
+        )
+        resource_group.add_argument(
+            "--native-threads",
+            dest="native_threads",
+            metavar="N",
+            type=positive_int_arg,
+            default=None,
+            help="Threads per native (OpenMP, BLAS, numexpr) thread pool.  (default: the library's choice)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        errors = []
+        if settings.cpus is not None:
+            if not hasattr(os, "sched_setaffinity"):
+                errors.append("--cpus is not supported on this platform")
+            else:
+                unavailable = set(settings.cpus) - os.sched_getaffinity(0)
+                if unavailable:
+                    errors.append(f"--cpus ({format_cpu_list(unavailable)}) are not available to this process")
+        if not MIN_NICE <= settings.nice <= MAX_NICE:
+            errors.append(f"--nice ({settings.nice}) must be in {MIN_NICE}-{MAX_NICE}")
+        return errors
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.quick_exit:
+            return
+        placement = []
+        if settings.cpus is not None and hasattr(os, "sched_setaffinity"):
+            cpus = set(settings.cpus) & os.sched_getaffinity(0)
+            if cpus:
+                self._affinity = os.sched_getaffinity(0)
+                os.sched_setaffinity(0, cpus)
+                placement.append(f"cpus {format_cpu_list(cpus)}")
+        if MIN_NICE < settings.nice <= MAX_NICE:
+            placement.append(f"nice {os.nice(settings.nice)}")
+        if settings.native_threads is not None:
+            for name in NATIVE_THREAD_VARIABLES:
+                self._environ[name] = os.environ.get(name)
+                os.environ[name] = str(settings.native_threads)
+            placement.append(f"native threads {settings.native_threads}")
+        if placement:
+            logger.info(f"Resource placement: {', '.join(placement)}")
+
+    def teardown(self) -> None:
+        if self._affinity is not None:
+            os.sched_setaffinity(0, self._affinity)
+            self._affinity = None
+        for name, value in self._environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self._environ.clear()
@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Thin client for an application started with "--serve SOCKET".
+
+The client hands its stdin, stdout and stderr file descriptors plus its argv, current directory and environment
+to the prewarmed server, then waits for the exit code of the forked request.
+
+This module intentionally only uses the standard library so it may be run directly, without importing the
+application package, for the fastest possible startup::
+
+    python3 -I -S path/to/server_client.py /tmp/app.sock --count 3
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import sys
+from collections.abc import Sequence
+
+HEADER = struct.Struct("!I")
+"""Length prefix of the request payload."""
+
+EXIT_CODE = struct.Struct("!i")
+"""The exit code returned by the server."""
+
+CONNECTION_LOST_EXIT_CODE = 255
+"""Exit code used when the server closes the connection without returning an exit code."""
+
+
+def run(socket_path: str, argv: Sequence[str], fds: Sequence[int] = (0, 1, 2)) -> int:
+    """
+    Run the application in the server listening on socket_path.
+
+    :param socket_path: the server's unix socket
+    :param argv: the command line arguments for the application's main()
+    :param fds: the stdin, stdout, and stderr file descriptors for the request
+    :return: the application's exit code
+    """
+    # os.getcwd() avoids importing pathlib, keeping the client's startup minimal
+    cwd = os.getcwd()  # noqa: PTH109
+    payload = json.dumps({"argv": list(argv), "cwd": cwd, "env": dict(os.environ)}).encode("utf-8")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        socket.send_fds(sock, [HEADER.pack(len(payload)), payload], list(fds))
+        data = b""
+        while len(data) < EXIT_CODE.size:
+            chunk = sock.recv(EXIT_CODE.size - len(data))
+            if not chunk:
+                return CONNECTION_LOST_EXIT_CODE
+            data += chunk
+    exit_code: int = EXIT_CODE.unpack(data)[0]
+    return exit_code
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """usage: server_client SOCKET [ARGS...]"""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        sys.stderr.write("usage: server_client SOCKET [ARGS...]\n")
+        return 2
+    try:
+        return run(args[0], args[1:])
+    except OSError as ex:
+        sys.stderr.write(f"Could not connect to server at {args[0]}: {ex}\n")
+        return CONNECTION_LOST_EXIT_CODE
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Prewarmed server mode.
+
+Python startup (interpreter, imports, config file parsing) dominates short CLI invocations.  With "--serve SOCKET"
+the application stays resident with everything imported and the config file already parsed, listening on a unix
+socket.  Each request from the thin client (server_client.py) is handled in a forked child that inherits the
+warm interpreter, takes over the client's stdin/stdout/stderr, runs main(argv) and returns the exit code.
+
+Usage::
+
+    python3 -m {{cookiecutter.project_slug}} --serve /tmp/{{cookiecutter.project_slug}}.sock &
+    python3 -I -S src/{{cookiecutter.project_slug}}/clibones/server_client.py /tmp/{{cookiecutter.project_slug}}.sock --count 2
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.config_file import ConfigFile, enable_load_cache
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.server_client import EXIT_CODE, HEADER
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+
+class ServerControl(ControlBase):
+    """Add prewarmed server (--serve SOCKET) argument support to a CLI application."""
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        server_group = parser.add_argument_group(title="Server Options", description="")
+
+        server_group.add_argument(
+            "--serve",
+            dest="serve",
+            metavar="SOCKET",
+            help="Run as a prewarmed server listening on the unix SOCKET.  "
+            "Use clibones/server_client.py to run requests.",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        if settings.serve and not hasattr(socket, "AF_UNIX"):  # pragma: no cover
+            return ["--serve requires unix domain socket support"]
+        return []
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        """Keep the parsed config file for the requests, see config_file.enable_load_cache()."""
+        if settings.quick_exit or not settings.serve:
+            return
+        enable_load_cache()
+        # the default config file is optional
+        if settings.config_file is not None and Path(settings.config_file).is_file():
+            ConfigFile().load(Path(settings.config_file))
+
+
+class ApplicationServer:
+    """
+    Fork-per-request server for an application entry point.
+
+    Usage::
+
+        with Settings(args=args) as settings:
+            if settings.serve:
+                return ApplicationServer(settings.serve, main).serve_forever()
+    """
+
+    ACCEPT_TIMEOUT: float = 0.5
+    """Seconds between checks for an interrupt (^C) while waiting for a connection."""
+
+    def __init__(self, socket_path: str | Path, entry_point: Callable[[list[str]], int]) -> None:
+        """
+        :param socket_path: the unix socket to listen on
+        :param entry_point: the application's main(args) function, invoked in the forked child
+        """
+        self.socket_path: Path = Path(socket_path)
+        self.entry_point: Callable[[list[str]], int] = entry_point
+        self.children: set[int] = set()
+
+    def serve_forever(self) -> int:
+        """
+        Accept requests until interrupted (^C or SIGTERM).
+
+        :return: exit code for the server process
+        """
+        self.socket_path.unlink(missing_ok=True)
+        # bound and listening under a temporary name, then renamed, so a client waiting for the socket to appear
+        # never connects before the server accepts connections
+        bind_path = self.socket_path.with_name(f".{self.socket_path.name}.{os.getpid()}")
+        bind_path.unlink(missing_ok=True)
+        old_umask = os.umask(0o077)
+        try:
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(str(bind_path))
+        finally:
+            os.umask(old_umask)
+        listener.listen()
+        bind_path.rename(self.socket_path)
+        listener.settimeout(self.ACCEPT_TIMEOUT)
+        logger.info(f"Serving on {self.socket_path}")
+
+        with (
+            listener,
+            GracefulInterruptHandler() as interrupt_handler,
+            GracefulInterruptHandler(signal.SIGTERM) as terminate_handler,
+        ):
+            while not (interrupt_handler.interrupted or terminate_handler.interrupted):
+                self.reap_children()
+                try:
+                    connection, _ = listener.accept()
+                except TimeoutError:
+                    continue
+                except InterruptedError:  # pragma: no cover
+                    continue
+                self.fork_request(connection, listener)
+
+        self.socket_path.unlink(missing_ok=True)
+        self.reap_children()
+        logger.info(f"Stopped serving on {self.socket_path}")
+        return 0
+
+    def reap_children(self) -> None:
+        """Collect the exit status of any finished request handlers."""
+        for pid in list(self.children):
+            try:
+                finished, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished = pid
+            if finished:
+                self.children.discard(pid)
+
+    def fork_request(self, connection: socket.socket, listener: socket.socket) -> None:
+        """Fork a child to handle the request on the given connection."""
+        # anything still buffered would otherwise be written by both parent and child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid:
+            connection.close()
+            self.children.add(pid)
+            return
+
+        # in the child
+        exit_code = 1
+        try:
+            listener.close()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            exit_code = self.handle_request(connection)
+        finally:
+            os._exit(exit_code)
+
+    def handle_request(self, connection: socket.socket) -> int:
+        """
+        Run the entry point with the client's file descriptors, argv, current directory and environment.
+
+        :return: the exit code for the child process
+        """
+        message, fds, _, _ = socket.recv_fds(connection, HEADER.size, 3)
+        if len(fds) != 3 or len(message) != HEADER.size:
+            return 1
+        payload = self._receive(connection, HEADER.unpack(message)[0])
+        request: dict[str, Any] = json.loads(payload)
+
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        argv: list[str] = request["argv"]
+        sys.argv = [sys.argv[0], *argv]
+
+        exit_code = self.run_entry_point(argv)
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        connection.sendall(EXIT_CODE.pack(exit_code))
+        connection.close()
+        return 0
+
+    def run_entry_point(self, argv: list[str]) -> int:
+        """Run the entry point, converting SystemExit and exceptions to an exit code like the interpreter does."""
+        try:
+            return self.entry_point(argv)
+        except SystemExit as ex:
+            if ex.code is None:
+                return 0
+            if isinstance(ex.code, int):
+                return ex.code
+            sys.stderr.write(f"{ex.code}\n")
+            return 1
+        except BaseException:
+            traceback.print_exc()
+            return 1
+
+    @staticmethod
+    def _receive(connection: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                errmsg = "Connection closed while receiving the request"
+                raise ConnectionError(errmsg)
+            data += chunk
+        return bytes(data)
@@ -0,0 +1,152 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Zero-copy handoff of large payloads from the parent process to worker processes.
+
+Passing a large buffer to a ProcessPoolExecutor task pickles it, writes it through a pipe and unpickles it in the
+worker: three copies plus the pipe throughput.  Instead, the parent places the payload in a
+multiprocessing.shared_memory block and the task only receives its SharedBuffer handle (a name and a size, a few
+dozen bytes pickled).  The worker attaches to the block and gets a memoryview of the payload, reading the parent's
+pages directly.
+
+The blocks are owned by SHARED_BUFFERS, which unlinks every block still allocated when the application exits (an
+atexit hook), including when the application stops on ^C or an exception.  Blocks leaked by a killed process are
+unlinked by multiprocessing's resource tracker.
+
+A worker must not keep a reference to the memoryview after the attach() context exits.  Wrap the view for typed
+access, for example numpy.frombuffer(view, dtype=numpy.float64) or view.cast("d").
+
+Usage::
+
+    def checksum(handle: SharedBuffer) -> int:
+        with attach(handle) as view:
+            return zlib.crc32(view)
+
+
+    with Settings(), ProcessPoolExecutor() as executor:
+        handle = SHARED_BUFFERS.put(payload)
+        try:
+            crc = executor.submit(checksum, handle).result()
+        finally:
+            SHARED_BUFFERS.release(handle)
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import os
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Self, cast
+
+if TYPE_CHECKING:
+    from typing_extensions import Buffer
+
+
+@dataclass(frozen=True)
+class SharedBuffer:
+    """The picklable handle of a shared memory block: its name and the size of the payload."""
+
+    name: str
+    nbytes: int
+
+
+def _payload(block: SharedMemory, nbytes: int) -> memoryview:
+    """A memoryview of the payload, the block's size may be rounded up to a multiple of the page size."""
+    return cast("memoryview", block.buf)[:nbytes]
+
+
+@contextmanager
+def attach(handle: SharedBuffer) -> Iterator[memoryview]:
+    """
+    Attach to the block, yielding a memoryview of the payload, released and detached on exit.
+
+    The worker does not track the block, the parent unlinks it.  Before Python 3.13 attaching always registers the
+    block with the worker's resource tracker, which is harmless when the worker shares the parent's tracker, as
+    every worker started after a SharedBuffers was created does.
+    """
+    if sys.version_info >= (3, 13):
+        block = SharedMemory(handle.name, track=False)
+    else:
+        block = SharedMemory(handle.name)
+    try:
+        with _payload(block, handle.nbytes) as view:
+            yield view
+    finally:
+        block.close()
+
+
+class SharedBuffers:
+    """The shared memory blocks created by this process, see the module docstring."""
+
+    def __init__(self) -> None:
+        self._blocks: dict[str, SharedMemory] = {}
+        self._pid: int = os.getpid()
+        if sys.version_info < (3, 13):
+            # before Python 3.13 a worker attaching to a block registers it with its resource tracker.  A worker
+            # forked before this process has a tracker would start its own, which unlinks the block when the worker
+            # exits, so the tracker is started now for the workers to inherit
+            resource_tracker.ensure_running()
+        atexit.register(self._release_at_exit)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release_all()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def create(self, nbytes: int) -> SharedBuffer:
+        """Allocate a block for a payload of nbytes, fill it in place using view()."""
+        if nbytes <= 0:
+            errmsg = f"A shared buffer must not be empty (nbytes={nbytes})"
+            raise ValueError(errmsg)
+        block = SharedMemory(create=True, size=nbytes)
+        self._blocks[block.name] = block
+        return SharedBuffer(block.name, nbytes)
+
+    def put(self, data: Buffer) -> SharedBuffer:
+        """Copy the bytes-like data (bytes, bytearray, memoryview, numpy array, ...) into a new block."""
+        with memoryview(data) as source, source.cast("B") as source_bytes:
+            handle = self.create(source_bytes.nbytes)
+            with _payload(self._blocks[handle.name], handle.nbytes) as target:
+                target[:] = source_bytes
+        return handle
+
+    def view(self, handle: SharedBuffer) -> memoryview:
+        """The parent's memoryview of a block it created, release it before release()."""
+        return _payload(self._blocks[handle.name], handle.nbytes)
+
+    def release(self, handle: SharedBuffer) -> None:
+        """Close and unlink the block, the workers must be done with it."""
+        block = self._blocks.pop(handle.name, None)
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    def release_all(self) -> None:
+        """Close and unlink every block still allocated."""
+        for block in self._blocks.values():
+            # with a view still exported the mapping goes when the process exits, the name goes now
+            with contextlib.suppress(BufferError):
+                block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def _release_at_exit(self) -> None:
+        # a forked child inherits the dictionary of blocks, but only the process that created them unlinks them
+        if os.getpid() == self._pid:
+            self.release_all()
+
+
+SHARED_BUFFERS = SharedBuffers()
+"""The application's shared memory blocks, released when the application exits."""
@@ -0,0 +1,38 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+The status subcommand: show the status file of a running application (see status_control.py).
+
+This module is only imported when the subcommand is selected (see subcommands.py).  An application declares it
+with STATUS_SUBCOMMAND::
+
+    class Settings(ApplicationSettings):
+        def add_subcommands(self) -> list[Subcommand]:
+            return [STATUS_SUBCOMMAND, ...]
+
+    $ python3 -m app status /run/app.status
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from {{cookiecutter.project_slug}}.clibones.status_control import show_status
+
+if TYPE_CHECKING:
+    import argparse
+
+    from {{cookiecutter.project_slug}}.clibones.frozen_settings import FrozenSettings
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the status subcommand's arguments."""
+    parser.add_argument("status_path", metavar="PATH", help="The status file of the running application.")
+
+
+def main(settings: FrozenSettings) -> int:
+    """Show the status file, the exit code is 1 when it could not be read."""
+    return 0 if show_status(Path(settings.status_path)) else 1
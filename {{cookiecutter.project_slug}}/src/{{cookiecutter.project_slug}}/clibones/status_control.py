@@ -0,0 +1,273 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+A memory-mapped status page for external monitoring with --status-file PATH.
+
+The status file is a small fixed layout record (see STATUS_LAYOUT) that the application updates in place: the
+process id, start time, heartbeat timestamp, iteration count, throughput (iterations per second since the
+start), the interrupted flag of its GracefulInterruptHandler and the current phase.  An update is a handful of
+writes into the mapping, no system call and no log I/O, so it can be done every iteration.
+
+Updates are guarded by a sequence lock: the writer makes the sequence number odd, writes the fields, then makes
+it even again.  A reader never blocks the writer, it simply retries when the sequence number was odd or changed
+while it was reading.  A supervisor can tell a hung application by a heartbeat that stops advancing.
+
+Usage::
+
+    with GracefulInterruptHandler() as handler:
+        for iteration, item in enumerate(items, start=1):
+            process(item)
+            STATUS.update(iteration, interrupted=handler.interrupted)
+
+    $ python3 -m app --status-file /run/app.status &
+    $ python3 -m app --show-status /run/app.status
+
+An application with subcommands may instead declare STATUS_SUBCOMMAND in its add_subcommands(), for
+"python3 -m app status /run/app.status" (see status_command.py).
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.clock import CLOCK
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.subcommands import Subcommand
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+STATUS_MAGIC: bytes = b"CLBS"
+"""The first bytes of a status file."""
+
+STATUS_VERSION: int = 1
+"""The layout version, incremented when STATUS_LAYOUT changes."""
+
+STATUS_HEADER: struct.Struct = struct.Struct("<4sIQ")
+"""magic, version, sequence number."""
+
+STATUS_SEQUENCE_OFFSET: int = 8
+"""Offset of the sequence number in the header."""
+
+STATUS_LAYOUT: struct.Struct = struct.Struct("<IdddQ?32s")
+"""pid, start time, heartbeat time, throughput, iteration, interrupted, phase (UTF-8, NUL padded)."""
+
+STATUS_SIZE: int = STATUS_HEADER.size + STATUS_LAYOUT.size
+"""The size of a status file in bytes."""
+
+STATUS_READ_RETRIES: int = 1000
+"""Reads attempted before returning an inconsistent status, for example of a writer that died mid-update."""
+
+_SEQUENCE: struct.Struct = struct.Struct("<Q")
+
+
+@dataclass(frozen=True)
+class Status:
+    """A snapshot of a status file."""
+
+    pid: int
+    start_time: float
+    heartbeat: float
+    throughput: float
+    iteration: int
+    interrupted: bool
+    phase: str
+    consistent: bool = True
+
+    def format(self, now: float | None = None) -> str:
+        now = CLOCK.time() if now is None else now
+        lines = [
+            f"pid:         {self.pid}",
+            f"phase:       {self.phase}",
+            f"iteration:   {self.iteration}",
+            f"throughput:  {self.throughput:,.3f}/s",
+            f"heartbeat:   {now - self.heartbeat:,.3f}s ago",
+            f"uptime:      {self.heartbeat - self.start_time:,.3f}s",
+            f"interrupted: {self.interrupted}",
+        ]
+        if not self.consistent:
+            lines.append("warning:     the status was being updated, the fields may be inconsistent")
+        return "\n".join(lines)
+
+
+def read_status(path: Path) -> Status:
+    """Read a status file without locking, retrying while the writer is updating it."""
+    with path.open("rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as page:
+        if len(page) < STATUS_SIZE or page[:4] != STATUS_MAGIC:
+            errmsg = f"{path} is not a status file"
+            raise ValueError(errmsg)
+        version = STATUS_HEADER.unpack_from(page)[1]
+        if version != STATUS_VERSION:
+            errmsg = f"{path} is a version {version} status file, expected version {STATUS_VERSION}"
+            raise ValueError(errmsg)
+        consistent = False
+        for _ in range(STATUS_READ_RETRIES):
+            before = _SEQUENCE.unpack_from(page, STATUS_SEQUENCE_OFFSET)[0]
+            fields = STATUS_LAYOUT.unpack_from(page, STATUS_HEADER.size)
+            after = _SEQUENCE.unpack_from(page, STATUS_SEQUENCE_OFFSET)[0]
+            if before == after and not before & 1:
+                consistent = True
+                break
+            time.sleep(0)
+    pid, start_time, heartbeat, throughput, iteration, interrupted, phase = fields
+    return Status(
+        pid=pid,
+        start_time=start_time,
+        heartbeat=heartbeat,
+        throughput=throughput,
+        iteration=iteration,
+        interrupted=interrupted,
+        phase=phase.rstrip(b"\0").decode("utf-8", errors="replace"),
+        consistent=consistent,
+    )
+
+
+class StatusPage:
+    """The writer of a status file, updates do nothing until open() is called."""
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.iteration: int = 0
+        self.interrupted: bool = False
+        self.phase: str = ""
+        self.start_time: float = 0.0
+        self._page: mmap.mmap | None = None
+        self._sequence: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._page is not None
+
+    def open(self, path: Path, phase: str = "running") -> None:
+        """Create (or reuse) the status file at path and map it."""
+        self.close()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, STATUS_SIZE)
+            self._page = mmap.mmap(fd, STATUS_SIZE, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        self.path = path
+        self.iteration = 0
+        self.interrupted = False
+        self.start_time = CLOCK.time()
+        self._sequence = 0
+        STATUS_HEADER.pack_into(self._page, 0, STATUS_MAGIC, STATUS_VERSION, self._sequence)
+        self.update(phase=phase)
+
+    def close(self, phase: str | None = None) -> None:
+        """Write the final phase, if given, and unmap the status file, the file is left for the supervisor."""
+        if self._page is None:
+            return
+        if phase is not None:
+            self.update(phase=phase)
+        self._page.close()
+        self._page = None
+        self.path = None
+
+    def update(self, iteration: int | None = None, interrupted: bool | None = None, phase: str | None = None) -> None:
+        """Update the heartbeat and the given fields."""
+        page = self._page
+        if page is None:
+            return
+        if iteration is not None:
+            self.iteration = iteration
+        if interrupted is not None:
+            self.interrupted = interrupted
+        if phase is not None:
+            self.phase = phase
+        now = CLOCK.time()
+        elapsed = now - self.start_time
+        throughput = self.iteration / elapsed if elapsed > 0 else 0.0
+        # odd while the fields are being written, see read_status()
+        self._sequence += 1
+        _SEQUENCE.pack_into(page, STATUS_SEQUENCE_OFFSET, self._sequence)
+        STATUS_LAYOUT.pack_into(
+            page,
+            STATUS_HEADER.size,
+            os.getpid(),
+            self.start_time,
+            now,
+            throughput,
+            self.iteration,
+            self.interrupted,
+            self.phase.encode("utf-8")[:32],
+        )
+        self._sequence += 1
+        _SEQUENCE.pack_into(page, STATUS_SEQUENCE_OFFSET, self._sequence)
+
+
+STATUS = StatusPage()
+"""The application's status page, opened by --status-file."""
+
+STATUS_SUBCOMMAND = Subcommand(
+    "status", "{{cookiecutter.project_slug}}.clibones.status_command", "Show the status file of a running application"
+)
+"""The status subcommand, see status_command.py."""
+
+
+def show_status(path: Path) -> bool:
+    """Log the status file of a running application, False when it could not be read."""
+    try:
+        logger.info(read_status(path).format())
+    except (OSError, ValueError) as ex:
+        logger.error(f"Could not read the status file ({path}): {ex}")
+        return False
+    return True
+
+
+class StatusControl(ControlBase):
+    """Add status page (--status-file, --show-status) argument support."""
+
+    def __init__(self, page: StatusPage = STATUS) -> None:
+        """:param page: the status page to open"""
+        self.page: StatusPage = page
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        status_group = parser.add_argument_group(title="Status Options", description="")
+
+        status_group.add_argument(
+            "--status-file",
+            dest="status_file",
+            metavar="PATH",
+            default=None,
+            help="Keep the application's heartbeat, iteration, throughput and phase in the memory-mapped PATH.",
+        )
+        status_group.add_argument(
+            "--show-status",
+            dest="show_status",
+            metavar="PATH",
+            default=None,
+            help="Show the status file PATH of a running application and exit.",
+        )
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.show_status and not settings.quick_exit:
+            settings.quick_exit = True
+            if not show_status(Path(settings.show_status)):
+                # a failure, so scripts polling the status see it, and like an argument error the settings context
+                # is not entered
+                raise SystemExit(1)
+            return
+        if not settings.status_file or settings.quick_exit:
+            return
+        try:
+            self.page.open(Path(settings.status_file))
+        except OSError as ex:
+            logger.error(f"Could not create the status file ({settings.status_file}): {ex}")
+
+    def teardown(self) -> None:
+        self.page.close(phase="exited")
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Lazily loaded subcommands.
+
+A subcommand is declared by its name, the module implementing it and a help line, by overriding
+ApplicationSettings.add_subcommands().  Only the module of the subcommand given on the command line is imported,
+and only its arguments are added and validated, so a tool with many subcommands starts as fast as one with a
+single subcommand.  The help lists every subcommand from the declarations alone.
+
+A subcommand module provides::
+
+    def add_arguments(parser: argparse.ArgumentParser) -> None: ...
+
+
+    def validate_arguments(settings: argparse.Namespace) -> list[str]:  # optional
+        return []
+
+
+    def main(settings: FrozenSettings) -> int: ...
+
+Usage::
+
+    class Settings(ApplicationSettings):
+        def add_subcommands(self) -> list[Subcommand]:
+            return [
+                Subcommand("build", "app.commands.build", "Build the project"),
+                Subcommand("clean", "app.commands.clean", "Remove the build files"),
+            ]
+
+
+    application_settings = Settings()
+    with application_settings as settings:
+        if application_settings.subcommand is not None:
+            return application_settings.run_subcommand(settings)
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    _SubParsersAction = argparse._SubParsersAction[argparse.ArgumentParser]
+else:
+    _SubParsersAction = argparse._SubParsersAction
+
+
+@dataclass(frozen=True)
+class Subcommand:
+    """A subcommand's name, the module implementing it, and its help line."""
+
+    name: str
+    module: str
+    help: str = ""
+
+    def load(self) -> Any:
+        """Import the subcommand's module."""
+        return importlib.import_module(self.module)
+
+
+class LazySubcommandsAction(_SubParsersAction):
+    """A subparsers action whose subcommand parsers are only built, importing their module, when selected."""
+
+    def declare(
+        self, subcommands: Sequence[Subcommand], build: Callable[[Subcommand, argparse.ArgumentParser], None]
+    ) -> None:
+        """
+        :param subcommands: the subcommands, listed in the help in this order
+        :param build: adds the arguments of the selected subcommand to its parser
+        """
+        self.subcommands: dict[str, Subcommand] = {subcommand.name: subcommand for subcommand in subcommands}
+        self.build: Callable[[Subcommand, argparse.ArgumentParser], None] = build
+        # argparse checks the selected name against, and its usage lists, the choices
+        self.choices = self.subcommands  # type: ignore[assignment]
+        for subcommand in subcommands:
+            self._choices_actions.append(self._ChoicesPseudoAction(subcommand.name, (), subcommand.help))
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: str | Sequence[Any] | None,
+        option_string: str | None = None,
+    ) -> None:
+        name = values[0] if isinstance(values, list) else None
+        if name in self.subcommands and name not in self._name_parser_map:
+            subcommand = self.subcommands[name]
+            subparser = self.add_parser(name, description=subcommand.help or None)
+            self.build(subcommand, subparser)
+        super().__call__(parser, namespace, values, option_string)
@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Startup phase timing with --timings [{table,json}].
+
+ApplicationSettings always records a perf_counter_ns() timestamp at the end of each startup phase (a handful of
+clock reads, so it is effectively free) and --timings writes the breakdown to stderr when the settings context
+has been entered:
+
+    $ python3 -m app --count 0 --timings
+    phase                          ms      %
+    import                     41.273   62.1
+    ...
+
+The import phase starts when the application package is imported (see IMPORT_START_NS in its __init__.py),
+interpreter startup and anything imported before it is not included (use python3 -X importtime for those).  It is
+only reported by the first settings context of the process, a later one, or a forked request of the prewarmed
+server (see server_control.py), did not import anything, so its timing starts when it is created.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Any, TextIO
+
+from {{cookiecutter.project_slug}} import IMPORT_PID, IMPORT_START_NS
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+TIMINGS_FORMATS: tuple[str, ...] = ("table", "json")
+"""The --timings choices."""
+
+_import_timed: bool = False
+"""Whether a TimingControl of this process has the import phase."""
+
+
+def _claim_import_start() -> int | None:
+    """IMPORT_START_NS for the first call in the process that imported the application package, else None."""
+    global _import_timed  # noqa: PLW0603
+    if _import_timed or os.getpid() != IMPORT_PID:
+        return None
+    _import_timed = True
+    return IMPORT_START_NS
+
+
+class PhaseTimer:
+    """
+    Records the duration of consecutive phases.
+
+    Usage::
+
+        timer = PhaseTimer()
+        load()
+        timer.mark("load")
+        parse()
+        timer.mark("parse")
+        print(timer.format_table())
+    """
+
+    def __init__(self, start_ns: int | None = None) -> None:
+        """:param start_ns: the perf_counter_ns() the first phase started at, defaults to now"""
+        self.start_ns: int = time.perf_counter_ns() if start_ns is None else start_ns
+        self.phases: list[tuple[str, int]] = []
+        self._last_ns: int = self.start_ns
+
+    def mark(self, phase: str) -> None:
+        """End the current phase, naming it, and start the next one."""
+        now = time.perf_counter_ns()
+        self.phases.append((phase, now - self._last_ns))
+        self._last_ns = now
+
+    @property
+    def total_ns(self) -> int:
+        return self._last_ns - self.start_ns
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "phases": [{"phase": phase, "ms": elapsed / 1e6} for phase, elapsed in self.phases],
+            "total_ms": self.total_ns / 1e6,
+        }
+
+    def format_table(self) -> str:
+        total = self.total_ns or 1
+        lines = [f"{'phase':<28} {'ms':>10} {'%':>6}"]
+        lines += [
+            f"{phase:<28} {elapsed / 1e6:>10.3f} {elapsed * 100 / total:>6.1f}" for phase, elapsed in self.phases
+        ]
+        lines.append(f"{'total':<28} {self.total_ns / 1e6:>10.3f} {100:>6.1f}")
+        return "\n".join(lines) + "\n"
+
+
+class TimingControl(ControlBase):
+    """Add startup phase timing (--timings) argument support."""
+
+    def __init__(self) -> None:
+        # only the first timing of the importing process has an import phase, the others start now
+        import_start_ns = _claim_import_start()
+        self.timer: PhaseTimer = PhaseTimer(import_start_ns)
+        if import_start_ns is not None:
+            self.timer.mark("import")
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        timing_group = parser.add_argument_group(title="Timing Options", description="")
+
+        timing_group.add_argument(
+            "--timings",
+            dest="timings",
+            nargs="?",
+            const="table",
+            default=None,
+            choices=TIMINGS_FORMATS,
+            help="Write the startup phase timings to stderr as a table (the default) or as json.",
+        )
+
+    def report(self, settings: argparse.Namespace, file: TextIO | None = None) -> None:
+        """Write the timings in the --timings format, if given."""
+        if not settings.timings:
+            return
+        out = file or sys.stderr
+        if settings.timings == "json":
+            out.write(json.dumps(self.timer.as_dict()) + "\n")
+        else:
+            out.write(self.timer.format_table())
@@ -4,12 +4,12 @@
 
 from __future__ import annotations
 
-import tempfile
 from pathlib import Path
 from typing import Any
 
 import tomlkit
 
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
 from {{cookiecutter.project_slug}}.clibones.config_file_base import ConfigFileBase
 
 
@@ -28,7 +28,5 @@ class TomlConfigFile(ConfigFileBase):
     @staticmethod
     def save(filepath: Path, config_dict: dict[str, Any]) -> None:
         # write to temporary file then atomically "switch" it with the original using rename.
-        with tempfile.NamedTemporaryFile("wt", dir=filepath.parent, delete=False) as tf:
+        with atomic_open(filepath, "wt") as tf:
             tf.write(tomlkit.dumps(config_dict))
-            temp_name = Path(tf.name)
-        temp_name.rename(filepath)
@@ -0,0 +1,286 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Span tracing of the application to a Chrome trace-event file with --trace FILE.
+
+Spans nest per thread (each records its parent) and completed spans are stored in a preallocated ring buffer of
+--trace-buffer N spans, so tracing a long run uses constant memory and keeps the most recent spans.  The file
+loads in chrome://tracing, https://ui.perfetto.dev and speedscope.
+
+Without --trace, span() returns a shared no-op context manager and @traced calls the function directly.
+
+The startup phases recorded by the timing control (see timing_control.py) are added as spans under
+"ApplicationSettings.__enter__" and "ApplicationSettings.parse", and the application itself, from entering to
+exiting the settings context, is the "application" span.
+
+Usage::
+
+    @traced
+    def load(path: Path) -> Data: ...
+
+
+    for path in paths:
+        with span("process"):
+            process(load(path))
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ParamSpec, Self, TypeVar
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+    from contextlib import AbstractContextManager
+
+    from {{cookiecutter.project_slug}}.clibones.timing_control import PhaseTimer
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+DEFAULT_TRACE_BUFFER: int = 65536
+"""Default number of spans kept."""
+
+PARSE_PHASES: frozenset[str] = frozenset(
+    {"config pre-parse", "config load", "parser construction", "parse_known_args", "save_config_file"}
+)
+"""The timing phases that are part of ApplicationSettings.parse."""
+
+_NO_SPAN: AbstractContextManager[None] = nullcontext()
+
+
+class Span:
+    """A timed, named block, use Tracer.span() to create one."""
+
+    __slots__ = ("tracer", "name", "span_id", "parent_id", "start_ns")
+
+    def __init__(self, tracer: Tracer, name: str) -> None:
+        self.tracer: Tracer = tracer
+        self.name: str = name
+        self.span_id: int = 0
+        self.parent_id: int = 0
+        self.start_ns: int = 0
+
+    def __enter__(self) -> Self:
+        stack = self.tracer.open_spans()
+        self.span_id = next(self.tracer.span_ids)
+        self.parent_id = stack[-1] if stack else 0
+        stack.append(self.span_id)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        end_ns = time.perf_counter_ns()
+        self.tracer.open_spans().pop()
+        self.tracer.record(self.name, self.start_ns, end_ns - self.start_ns, self.span_id, self.parent_id)
+
+
+class Tracer:
+    """Records completed spans in a ring buffer of preallocated arrays."""
+
+    def __init__(self, capacity: int = DEFAULT_TRACE_BUFFER) -> None:
+        self.enabled: bool = False
+        self.allocate(capacity)
+
+    def allocate(self, capacity: int) -> None:
+        """(Re)allocate an empty ring buffer with room for capacity spans."""
+        self.capacity: int = capacity
+        self.names: list[str] = [""] * capacity
+        self.starts: array[int] = array("q", bytes(8 * capacity))
+        self.durations: array[int] = array("q", bytes(8 * capacity))
+        self.threads: array[int] = array("q", bytes(8 * capacity))
+        self.span_id_slots: array[int] = array("q", bytes(8 * capacity))
+        self.parent_id_slots: array[int] = array("q", bytes(8 * capacity))
+        self.span_ids: itertools.count[int] = itertools.count(1)
+        self.recorded: int = 0
+        self.start_ns: int = time.perf_counter_ns()
+        self._slots: itertools.count[int] = itertools.count()
+        self._local = threading.local()
+
+    def open_spans(self) -> list[int]:
+        """The calling thread's stack of open span ids."""
+        try:
+            stack: list[int] = self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str) -> AbstractContextManager[Any]:
+        """A context manager that records a span when tracing is enabled."""
+        return Span(self, name) if self.enabled else _NO_SPAN
+
+    def record(self, name: str, start_ns: int, duration_ns: int, span_id: int = 0, parent_id: int = 0) -> int:
+        """Record a completed span, returning its id."""
+        if not span_id:
+            span_id = next(self.span_ids)
+        # next() on an itertools.count is atomic, so threads never share a slot
+        slot = next(self._slots) % self.capacity
+        self.names[slot] = name
+        self.starts[slot] = start_ns
+        self.durations[slot] = duration_ns
+        self.threads[slot] = threading.get_native_id()
+        self.span_id_slots[slot] = span_id
+        self.parent_id_slots[slot] = parent_id
+        self.recorded += 1
+        return span_id
+
+    @property
+    def dropped(self) -> int:
+        """Spans overwritten by newer spans."""
+        return max(0, self.recorded - self.capacity)
+
+    def events(self) -> list[dict[str, Any]]:
+        """The spans as Chrome trace "complete" events, oldest first."""
+        count = min(self.recorded, self.capacity)
+        first = self.recorded - count
+        pid = os.getpid()
+        events = []
+        for index in range(first, first + count):
+            slot = index % self.capacity
+            events.append(
+                {
+                    "name": self.names[slot],
+                    "ph": "X",
+                    "ts": (self.starts[slot] - self.start_ns) / 1000,
+                    "dur": self.durations[slot] / 1000,
+                    "pid": pid,
+                    "tid": self.threads[slot],
+                    "args": {"id": self.span_id_slots[slot], "parent": self.parent_id_slots[slot]},
+                }
+            )
+        return sorted(events, key=lambda event: event["ts"])
+
+    def write(self, path: Path) -> None:
+        """Atomically write the spans to path in the Chrome trace-event JSON format."""
+        trace = {
+            "traceEvents": self.events(),
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": self.dropped},
+        }
+        with atomic_open(path, "wt", encoding="utf-8") as fp:
+            json.dump(trace, fp)
+
+
+TRACER = Tracer(capacity=0)
+"""The application's tracer, allocated by --trace."""
+
+
+def span(name: str) -> AbstractContextManager[Any]:
+    """A context manager that records a span named name when --trace is given."""
+    return TRACER.span(name)
+
+
+def traced(func: Callable[P, R]) -> Callable[P, R]:
+    """Decorator recording a span, named by the function's qualified name, for each call when --trace is given."""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if not TRACER.enabled:
+            return func(*args, **kwargs)
+        with Span(TRACER, name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class TraceControl(ControlBase):
+    """Add span tracing (--trace, --trace-buffer) argument support."""
+
+    def __init__(self, timer: PhaseTimer | None = None, tracer: Tracer = TRACER) -> None:
+        """
+        :param timer: the startup phase timer whose phases are added to the trace
+        :param tracer: the tracer to enable
+        """
+        self.timer: PhaseTimer | None = timer
+        self.tracer: Tracer = tracer
+        self.path: Path | None = None
+        self._application: Span | None = None
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        trace_group = parser.add_argument_group(title="Tracing Options", description="")
+
+        trace_group.add_argument(
+            "--trace",
+            dest="trace",
+            metavar="FILE",
+            default=None,
+            help="Write the application's spans to FILE in the Chrome trace-event JSON format.",
+        )
+        trace_group.add_argument(
+            "--trace-buffer",
+            dest="trace_buffer",
+            metavar="N",
+            type=positive_int_arg,
+            default=DEFAULT_TRACE_BUFFER,
+            help="Number of most recent spans kept.  (default: %(default)s)",
+        )
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if not settings.trace or settings.quick_exit:
+            return
+        self.path = Path(settings.trace)
+        self.tracer.allocate(settings.trace_buffer)
+        self.tracer.enabled = True
+
+    def begin_application(self) -> None:
+        """Open the "application" span, called when the settings context has been entered."""
+        if self.tracer.enabled and self._application is None:
+            self._application = Span(self.tracer, "application").__enter__()
+
+    def teardown(self) -> None:
+        if self.path is None:
+            return
+        if self._application is not None:
+            self._application.__exit__(None, None, None)
+            self._application = None
+        self.tracer.enabled = False
+        if self.timer is not None:
+            self._record_startup(self.timer)
+        self.tracer.write(self.path)
+        logger.debug(f"Wrote {self.tracer.recorded - self.tracer.dropped} spans to {self.path}")
+        # free the buffer, so the spans of this run are not counted by the next
+        self.tracer.allocate(0)
+        self.path = None
+
+    def _record_startup(self, timer: PhaseTimer) -> None:
+        """Add the startup phases, in the parse and __enter__ spans, to the trace."""
+        starts = list(itertools.accumulate((elapsed for _, elapsed in timer.phases), initial=timer.start_ns))
+        phases = [(phase, start, elapsed) for (phase, elapsed), start in zip(timer.phases, starts, strict=False)]
+        enter = [phase for phase in phases if phase[0] not in {"import", "settings init"}]
+        parse = [phase for phase in enter if phase[0] in PARSE_PHASES]
+        if not enter:
+            return
+        # the trace starts when the application package was imported, or the timing started
+        self.tracer.start_ns = min(self.tracer.start_ns, timer.start_ns)
+        for phase, start, elapsed in phases[: len(phases) - len(enter)]:
+            self.tracer.record(phase, start, elapsed)
+        enter_id = self.tracer.record("ApplicationSettings.__enter__", enter[0][1], starts[-1] - enter[0][1])
+        parse_id = enter_id
+        if parse:
+            parse_start, parse_end = parse[0][1], parse[-1][1] + parse[-1][2]
+            parse_id = self.tracer.record(
+                "ApplicationSettings.parse", parse_start, parse_end - parse_start, 0, enter_id
+            )
+        for phase, start, elapsed in enter:
+            self.tracer.record(phase, start, elapsed, 0, parse_id if phase in PARSE_PHASES else enter_id)
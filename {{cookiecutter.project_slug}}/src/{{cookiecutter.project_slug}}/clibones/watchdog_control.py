@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Watchdog timeouts for the whole run (--timeout SECONDS) and for each iteration (--iteration-timeout SECONDS).
+
+A watchdog thread checks the deadlines against the monotonic CLOCK (clock.py).  When one passes it logs a
+warning and sends SIGINT to the process, so an application loop using a GracefulInterruptHandler stops cleanly,
+exactly as if ^C had been pressed.  If the application is still running --timeout-grace SECONDS later, it is
+stuck: the watchdog logs the stack of every thread and exits the process with WATCHDOG_EXIT_CODE (124, as
+timeout(1) does).
+
+The iteration deadline is --iteration-timeout after the last WATCHDOG.kick(), which only stores a timestamp, so
+kick once per iteration:
+
+    with GracefulInterruptHandler() as handler:
+        for item in items:
+            process(item)
+            WATCHDOG.kick()
+            if handler.interrupted:
+                break
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.clock import CLOCK
+from {{cookiecutter.project_slug}}.clibones.control_base import ControlBase
+from {{cookiecutter.project_slug}}.clibones.diagnostics_control import format_thread_stacks
+
+if TYPE_CHECKING:
+    import argparse
+    from argparse import ArgumentParser
+
+WATCHDOG_EXIT_CODE: int = 124
+"""The exit code of an application the watchdog had to kill."""
+
+DEFAULT_TIMEOUT_GRACE: float = 10.0
+"""Default seconds between the interrupt and the forced exit."""
+
+MAX_POLL_INTERVAL: float = 1.0
+"""Most seconds between the watchdog's deadline checks."""
+
+
+class Watchdog:
+    """Interrupts, then kills, the process when the run or an iteration exceeds its timeout."""
+
+    def __init__(self, exit_func: Callable[[int], Any] = os._exit) -> None:
+        """:param exit_func: called with WATCHDOG_EXIT_CODE when the grace period has passed"""
+        self.exit_func: Callable[[int], Any] = exit_func
+        self.timeout: float = 0.0
+        self.iteration_timeout: float = 0.0
+        self.grace: float = DEFAULT_TIMEOUT_GRACE
+        self.start_time: float = CLOCK.monotonic()
+        self.last_kick: float = self.start_time
+        self.interrupted_at: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def kick(self) -> None:
+        """Restart the iteration timeout."""
+        self.last_kick = CLOCK.monotonic()
+
+    def start(self, timeout: float, iteration_timeout: float, grace: float = DEFAULT_TIMEOUT_GRACE) -> None:
+        """
+        :param timeout: seconds the run may take, 0 for no limit
+        :param iteration_timeout: seconds allowed between kicks, 0 for no limit
+        :param grace: seconds between the interrupt and the forced exit
+        """
+        self.stop()
+        self.timeout = timeout
+        self.iteration_timeout = iteration_timeout
+        self.grace = grace
+        self.start_time = self.last_kick = CLOCK.monotonic()
+        self.interrupted_at = None
+        limits = [limit for limit in (timeout, iteration_timeout) if limit > 0]
+        if not limits:
+            return
+        interval = min(MAX_POLL_INTERVAL, min(limits) / 10)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name="watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def expired(self, now: float) -> str | None:
+        """The reason a deadline has passed, or None."""
+        if self.timeout > 0 and now - self.start_time > self.timeout:
+            return f"the run exceeded --timeout ({self.timeout}s)"
+        if self.iteration_timeout > 0 and now - self.last_kick > self.iteration_timeout:
+            return f"an iteration exceeded --iteration-timeout ({self.iteration_timeout}s)"
+        return None
+
+    def _watch(self, interval: float) -> None:
+        while not CLOCK.wait(self._stop, interval):
+            now = CLOCK.monotonic()
+            if self.interrupted_at is None:
+                reason = self.expired(now)
+                if reason is not None:
+                    self.interrupted_at = now
+                    logger.warning(f"Watchdog: {reason}, interrupting")
+                    os.kill(os.getpid(), signal.SIGINT)
+            elif now - self.interrupted_at > self.grace:
+                logger.error(
+                    f"Watchdog: still running {self.grace}s after the interrupt, exiting\n{format_thread_stacks()}"
+                )
+                logger.complete()
+                self.exit_func(WATCHDOG_EXIT_CODE)
+                return
+
+
+WATCHDOG = Watchdog()
+"""The application's watchdog, started by --timeout or --iteration-timeout."""
+
+
+class WatchdogControl(ControlBase):
+    """Add watchdog (--timeout, --iteration-timeout, --timeout-grace) argument support."""
+
+    def __init__(self, watchdog: Watchdog = WATCHDOG) -> None:
+        """:param watchdog: the watchdog to start"""
+        self.watchdog: Watchdog = watchdog
+
+    # noinspection PyMethodMayBeStatic
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Use argparse commands to add arguments to the given parser."""
+        watchdog_group = parser.add_argument_group(title="Watchdog Options", description="")
+
+        watchdog_group.add_argument(
+            "--timeout",
+            dest="timeout",
+            metavar="SECONDS",
+            type=float,
+            default=0.0,
+            help="Interrupt the application after SECONDS, 0 for no limit.  (default: %(default)s)",
+        )
+        watchdog_group.add_argument(
+            "--iteration-timeout",
+            dest="iteration_timeout",
+            metavar="SECONDS",
+            type=float,
+            default=0.0,
+            help="Interrupt the application when an iteration takes longer than SECONDS, 0 for no limit.  "
+            "(default: %(default)s)",
+        )
+        watchdog_group.add_argument(
+            "--timeout-grace",
+            dest="timeout_grace",
+            metavar="SECONDS",
+            type=float,
+            default=DEFAULT_TIMEOUT_GRACE,
+            help="Log the thread stacks and exit when the application is still running SECONDS after a timeout "
+            f"interrupted it.  The exit code is {WATCHDOG_EXIT_CODE}.  (default: %(default)s)",
+        )
+
+    def validate_arguments(self, settings: argparse.Namespace) -> list[str]:
+        return [
+            f"--{option.replace('_', '-')} ({getattr(settings, option)}) must not be negative"
+            for option in ("timeout", "iteration_timeout", "timeout_grace")
+            if getattr(settings, option) < 0
+        ]
+
+    def setup(self, settings: argparse.Namespace) -> None:
+        if settings.quick_exit or (settings.timeout <= 0 and settings.iteration_timeout <= 0):
+            return
+        self.watchdog.start(settings.timeout, settings.iteration_timeout, settings.timeout_grace)
+
+    def teardown(self) -> None:
+        self.watchdog.stop()
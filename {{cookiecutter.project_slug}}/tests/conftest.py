@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""Fixtures shared by the tests."""
+
+from __future__ import annotations
+
+import signal
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones import config_file
+from {{cookiecutter.project_slug}}.clibones.application_settings import ApplicationSettings
+from {{cookiecutter.project_slug}}.clibones.cache_control import CACHE
+from {{cookiecutter.project_slug}}.clibones.clock import CLOCK, Clock, VirtualClock
+from {{cookiecutter.project_slug}}.clibones.metrics_control import METRICS
+from {{cookiecutter.project_slug}}.clibones.rate_control import RATE
+from {{cookiecutter.project_slug}}.clibones.shared_buffers import SHARED_BUFFERS
+from {{cookiecutter.project_slug}}.clibones.status_control import STATUS
+from {{cookiecutter.project_slug}}.clibones.trace_control import TRACER
+from {{cookiecutter.project_slug}}.clibones.watchdog_control import WATCHDOG
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+HANDLED_SIGNALS: tuple[signal.Signals, ...] = (
+    signal.SIGINT,
+    signal.SIGTERM,
+    signal.SIGUSR1,
+    signal.SIGUSR2,
+    signal.SIGPROF,
+)
+"""The signals the controls and GracefulInterruptHandler install handlers for."""
+
+
+def _stderr_sink(message: str) -> None:
+    # the current sys.stderr, which pytest replaces while capturing
+    sys.stderr.write(message)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_global_state(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[None]:
+    """
+    Restore the process wide state a test may leave behind, so the tests are independent of their order and of
+    the pytest-xdist worker they run in: the signal handlers, the application's singletons, the config file load
+    cache, and the loguru handlers LoggerControl added for the test's (possibly captured and since closed) stdout.
+
+    The caches (XDG_CACHE_HOME) are in the test's temporary directory instead of the developer's ~/.cache.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+    handlers = {signum: signal.getsignal(signum) for signum in HANDLED_SIGNALS}
+    yield
+    WATCHDOG.stop()
+    STATUS.close()
+    CACHE.close()
+    SHARED_BUFFERS.release_all()
+    RATE.configure(0.0)
+    TRACER.enabled = False
+    TRACER.allocate(0)
+    METRICS.reset()
+    CLOCK.clock = Clock()
+    config_file._load_cache = None
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+    logger.remove()
+    logger.add(_stderr_sink)
+
+
+@pytest.fixture()
+def _all_controls(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Add every optional control (see ApplicationSettings.all_controls()) to the example application's Settings."""
+    monkeypatch.setattr(Settings, "add_controls", ApplicationSettings.all_controls)
+
+
+@pytest.fixture()
+def virtual_clock() -> Iterator[VirtualClock]:
+    """Run the test on a VirtualClock, so sleeping, rate limits and timeouts take no real time."""
+    with CLOCK.use(VirtualClock()) as clock:
+        yield clock
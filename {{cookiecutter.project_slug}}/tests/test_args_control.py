@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the streaming argument files."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.args_control import ArgItems, args_file
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _settings(args: list[str]) -> Settings:
+    return Settings(args=args)
+
+
+def test_args_file() -> None:
+    assert args_file("@paths.txt") == "paths.txt"
+    assert args_file("@") is None
+    assert args_file("paths.txt") is None
+
+
+def test_arg_items(tmp_path: Path) -> None:
+    lines = tmp_path / "lines.txt"
+    lines.write_text("a b\n\nc\n")
+    nul = tmp_path / "nul.bin.gz"
+    nul.write_bytes(gzip.compress(b"x\ny\0z\0"))
+
+    assert list(ArgItems(("one", f"@{lines}", "two"))) == ["one", "a b", "c", "two"]
+    items = ArgItems((f"@{nul}",), args_from=str(nul), null=True)
+    assert items.files == [str(nul), str(nul)]
+    # re-read each time it is iterated
+    assert list(items) == ["x\ny", "z", "x\ny", "z"]
+    assert list(items) == ["x\ny", "z", "x\ny", "z"]
+
+
+def test_items_are_streamed(tmp_path: Path) -> None:
+    paths = tmp_path / "paths.txt"
+    paths.write_text("".join(f"path{index}\n" for index in range(100_000)))
+    iterator = iter(ArgItems(args_from=str(paths)))
+    assert next(iterator) == "path0"
+    assert sum(1 for _ in iterator) == 99_999
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_settings_arg_items(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    paths = tmp_path / "paths.txt"
+    paths.write_bytes(b"b\0c\0")
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"d\0")))
+    with _settings(["a", f"@{paths}", "--null", "--args-from", "-"]) as settings:
+        assert list(settings.arg_items) == ["a", "b", "c", "d"]
+
+    with _settings(["--count", "1"]) as settings:
+        assert list(settings.arg_items) == []
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_missing_args_file(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exc_info, _settings([f"@{tmp_path / 'missing.txt'}"]):
+        pass
+    assert exc_info.value.code == 2
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_args_from_pipes(tmp_path: Path) -> None:
+    # a process substitution, --args-from <(find . -print0), is a /dev/fd path of a pipe
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"a\0b\0")
+    os.close(write_fd)
+    try:
+        with _settings(["--null", "--args-from", f"/dev/fd/{read_fd}"]) as settings:
+            assert list(settings.arg_items) == ["a", "b"]
+    finally:
+        os.close(read_fd)
+
+    fifo = tmp_path / "paths.fifo"
+    os.mkfifo(fifo)
+    writer = threading.Thread(target=fifo.write_bytes, args=(b"c\nd\n",))
+    writer.start()
+    with _settings(["--args-from", str(fifo)]) as settings:
+        assert list(settings.arg_items) == ["c", "d"]
+    writer.join()
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_args_file_is_a_directory(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exc_info, _settings(["--args-from", str(tmp_path)]):
+        pass
+    assert exc_info.value.code == 2
+
+
+def test_without_args_control(tmp_path: Path) -> None:
+    # the example application does not add the ArgsControl, so @FILE is just a positional item
+    paths = tmp_path / "paths.txt"
+    paths.write_text("b\n")
+    with _settings(["a", f"@{paths}"]) as settings:
+        assert "args_from" not in settings
+        assert list(settings.arg_items) == ["a", f"@{paths}"]
@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the atomic file writes."""
+
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.clibones.atomic_file import atomic_open
+
+
+def test_atomic_open_keeps_original_on_error() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "config.json"
+        filepath.write_text("original")
+
+        def write_partial() -> None:
+            with atomic_open(filepath) as tf:
+                tf.write("partial")
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            write_partial()
+        assert filepath.read_text() == "original"
+        assert list(Path(tmp).iterdir()) == [filepath]
+
+
+def test_committed_file_mode(tmp_path: Path) -> None:
+    created = tmp_path / "created.json"
+    config = tmp_path / "config.json"
+    config.write_text("original")
+    config.chmod(0o640)
+
+    mask = os.umask(0o027)
+    try:
+        for path in (created, config):
+            with atomic_open(path) as tf:
+                tf.write("saved")
+    finally:
+        os.umask(mask)
+    # a new file as open() would create it, a replaced file keeps its mode, rather than the temporary file's 0600
+    assert stat.S_IMODE(created.stat().st_mode) == 0o640
+    assert stat.S_IMODE(config.stat().st_mode) == 0o640
+    assert config.read_text() == "saved"
@@ -0,0 +1,185 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the disk-backed memoization cache."""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.cache_control import CACHE, CACHE_ENTRY_SUFFIX, DiskCache
+
+
+def _double(value: int) -> int:
+    return value * 2
+
+
+def _blob(index: int) -> bytes:
+    return bytes(1000) + index.to_bytes(2, "big")
+
+
+def _entries(directory: Path) -> list[Path]:
+    return sorted(directory.glob(f"*{CACHE_ENTRY_SUFFIX}"))
+
+
+def test_memoize(tmp_path: Path) -> None:
+    cache = DiskCache()
+    calls: list[tuple[object, ...]] = []
+
+    @cache.memoize("scale")
+    def compute(value: int, options: dict[str, set[str]] | None = None) -> int:
+        calls.append((value, options))
+        return value * 2
+
+    # not cached before the cache is opened
+    assert compute(1) == 2
+    assert compute(1) == 2
+    assert len(calls) == 2
+
+    calls.clear()
+    cache.open(tmp_path, settings=argparse.Namespace(scale=1))
+    assert compute(1) == 2
+    assert compute(1) == 2
+    assert compute(2) == 4
+    assert compute(1, {"a": {"x", "y", "z"}, "b": set()}) == 2
+    assert compute(1, {"b": set(), "a": {"z", "y", "x"}}) == 2
+    assert len(calls) == 3
+    assert (cache.hits, cache.misses, cache.stores) == (2, 3, 3)
+
+    # another run, and other settings, use other entries
+    cache.open(tmp_path, settings=argparse.Namespace(scale=2))
+    assert compute(1) == 2
+    assert len(calls) == 4
+    cache.open(tmp_path, settings=argparse.Namespace(scale=1))
+    assert compute(1) == 2
+    assert len(calls) == 4
+    assert len(_entries(tmp_path)) == 4
+
+    # unpicklable arguments run uncached
+    lock = threading.Lock()
+    assert cache.memoize()(lambda value: value)(lock) is lock
+
+
+def test_key_follows_code_edits() -> None:
+    cache = DiskCache()
+    namespace: dict[str, Any] = {}
+    keys = set()
+    for source in (
+        "def f(x): return x * 2",
+        "def f(x): return x * 3",
+        "def f(x): return abs(x)",
+        "def f(x): return len(x)",
+        "def f(x):\n    def g(y): return y + 1\n    return g(x)",
+        "def f(x):\n    def g(y): return y + 2\n    return g(x)",
+    ):
+        exec(source, namespace)
+        keys.add(cache.key(namespace["f"], (1,), {}, ()))
+    assert len(keys) == 6
+
+
+def test_directory_created_by_the_first_store(tmp_path: Path) -> None:
+    cache = DiskCache()
+    double = cache.memoize()(_double)
+    directory = tmp_path / "results"
+    # a run that stores nothing leaves no directory behind
+    cache.open(directory)
+    cache.close()
+    assert not directory.exists()
+
+    cache.open(directory)
+    assert double(3) == 6
+    assert double(3) == 6
+    cache.close()
+    assert cache.hits == 1
+    assert len(_entries(directory)) == 1
+
+
+def test_close_logs_statistics(tmp_path: Path) -> None:
+    cache = DiskCache()
+    square = cache.memoize()(pow)
+    cache.open(tmp_path)
+    square(3, 2)
+    square(3, 2)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        cache.close()
+    finally:
+        logger.remove(handler_id)
+    assert messages == [f"Cache: 1 hits, 1 misses, 1 stored, 0 evicted ({tmp_path})\n"]
+    assert not cache.enabled
+
+
+def test_corrupt_entry(tmp_path: Path) -> None:
+    cache = DiskCache()
+    double = cache.memoize()(_double)
+    cache.open(tmp_path)
+    assert double(4) == 8
+    (entry,) = _entries(tmp_path)
+    entry.write_bytes(b"not a pickle")
+    assert double(4) == 8
+    assert cache.hits == 0
+    assert double(4) == 8
+    assert cache.hits == 1
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    cache = DiskCache()
+    blob = cache.memoize()(_blob)
+    cache.open(tmp_path, max_size=5000)
+    for index in range(4):
+        blob(index)
+        os.utime(cache.path(cache.key(_blob, (index,), {}, ()) or ""), (index, index))
+    # reading entry 0 makes entry 1 the least recently used
+    blob(0)
+    for index in range(4, 6):
+        blob(index)
+    assert cache.evictions
+    assert sum(entry.stat().st_size for entry in _entries(tmp_path)) <= 5000
+    hits = cache.hits
+    blob(0)
+    assert cache.hits == hits + 1
+    blob(1)
+    assert cache.hits == hits + 1
+
+
+def _store(directory: str, start: int) -> None:
+    cache = DiskCache()
+    blob = cache.memoize()(_blob)
+    cache.open(Path(directory), max_size=20_000)
+    for index in range(start, start + 50):
+        blob(index)
+    cache.close()
+
+
+def test_concurrent_processes(tmp_path: Path) -> None:
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_store, args=(str(tmp_path), start)) for start in (0, 25, 50, 75)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert sum(entry.stat().st_size for entry in _entries(tmp_path)) <= 20_000
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_settings(tmp_path: Path) -> None:
+    with Settings(args=["--cache-dir", str(tmp_path / "cache"), "--cache-max-size", "1M"]) as settings:
+        assert settings.cache_max_size == 1 << 20
+        assert CACHE.directory == tmp_path / "cache"
+    assert not CACHE.enabled
+
+    with Settings(args=["--no-cache"]):
+        assert not CACHE.enabled
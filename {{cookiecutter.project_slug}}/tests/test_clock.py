@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the substitutable application clock."""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones.clock import CLOCK, Clock, VirtualClock
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.status_control import StatusPage, read_status
+from {{cookiecutter.project_slug}}.clibones.watchdog_control import WATCHDOG_EXIT_CODE, Watchdog, WatchdogControl
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_virtual_clock() -> None:
+    clock = VirtualClock(start=10.0, epoch=1000.0)
+    clock.sleep(2.5)
+    clock.sleep(-1.0)
+    assert (clock.monotonic(), clock.time()) == (12.5, 1002.5)
+    event = threading.Event()
+    assert not clock.wait(event, 1.5)
+    assert clock.monotonic() == 14.0
+    event.set()
+    assert clock.wait(event, 1.5)
+    assert clock.monotonic() == 14.0
+
+
+def test_use_restores_the_clock() -> None:
+    real = CLOCK.clock
+    with CLOCK.use(VirtualClock()) as clock:
+        assert CLOCK.clock is clock
+        assert CLOCK.monotonic() == clock.start
+    assert CLOCK.clock is real
+    assert isinstance(real, Clock)
+    assert abs(CLOCK.time() - time.time()) < 1.0
+
+
+def test_handler_wait(virtual_clock: VirtualClock) -> None:
+    with GracefulInterruptHandler() as handler:
+        assert not handler.wait(60.0)
+    assert virtual_clock.monotonic() - virtual_clock.start == 60.0
+
+
+def test_example_application(virtual_clock: VirtualClock) -> None:
+    # ten iterations at the example's one per second
+    start = time.monotonic()
+    assert main(["--count", "10"]) == 0
+    assert virtual_clock.monotonic() - virtual_clock.start == pytest.approx(9.0)
+    assert time.monotonic() - start < 5.0
+
+
+def test_status_throughput(virtual_clock: VirtualClock, tmp_path: Path) -> None:
+    path = tmp_path / "app.status"
+    page = StatusPage()
+    page.open(path)
+    try:
+        virtual_clock.sleep(4.0)
+        page.update(2)
+        status = read_status(path)
+        assert status.heartbeat - status.start_time == pytest.approx(4.0)
+        assert status.throughput == pytest.approx(0.5)
+    finally:
+        page.close()
+
+
+def test_watchdog_timeout(virtual_clock: VirtualClock) -> None:
+    exit_codes: list[int] = []
+    control = WatchdogControl(watchdog=Watchdog(exit_func=exit_codes.append))
+    settings = argparse.Namespace(timeout=600.0, iteration_timeout=0.0, timeout_grace=30.0, quick_exit=False)
+    with GracefulInterruptHandler() as handler:
+        control.setup(settings)
+        try:
+            # ten virtual minutes, then the grace period, in well under the real deadline
+            deadline = time.monotonic() + 5
+            while not exit_codes and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert handler.interrupted
+            assert exit_codes == [WATCHDOG_EXIT_CODE]
+            assert virtual_clock.monotonic() - virtual_clock.start >= 630.0
+        finally:
+            control.teardown()
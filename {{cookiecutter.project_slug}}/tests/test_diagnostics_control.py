@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the SIGUSR1/SIGUSR2 diagnostics."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.clibones.diagnostics_control import DiagnosticsControl, format_thread_stacks
+from {{cookiecutter.project_slug}}.clibones.logger_control import LoggerControl
+from {{cookiecutter.project_slug}}.clibones.metrics_control import MetricsRegistry
+from {{cookiecutter.project_slug}}.clibones.status_control import StatusPage
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from _pytest.capture import CaptureFixture
+
+
+def _wait_for_diagnostics() -> None:
+    deadline = time.monotonic() + 5
+    while any(thread.name == "diagnostics" for thread in threading.enumerate()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_format_thread_stacks() -> None:
+    stacks = format_thread_stacks()
+    assert 'Thread "MainThread"' in stacks
+    assert "test_format_thread_stacks" in stacks
+
+
+def test_signals(capsys: CaptureFixture[Any]) -> None:
+    settings = argparse.Namespace(loglevel="INFO", debug=False, quiet=False, logfile=None)
+    logger_control = LoggerControl()
+    logger_control.setup(settings)
+    registry = MetricsRegistry()
+    registry.counter("items_total").inc(5)
+    control = DiagnosticsControl(logger_control=logger_control, registry=registry)
+    previous = signal.getsignal(signal.SIGUSR1)
+    control.setup(argparse.Namespace(diagnostics=True, quick_exit=False))
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        _wait_for_diagnostics()
+        out = capsys.readouterr().out
+        assert "Diagnostics dump" in out
+        assert "test_signals" in out
+        assert "items_total 5" in out
+
+        os.kill(os.getpid(), signal.SIGUSR2)
+        _wait_for_diagnostics()
+        assert logger_control.current_level == "DEBUG"
+        os.kill(os.getpid(), signal.SIGUSR2)
+        _wait_for_diagnostics()
+        assert logger_control.current_level == "INFO"
+    finally:
+        control.teardown()
+    assert signal.getsignal(signal.SIGUSR1) == previous
+
+
+def test_dump_includes_the_status_page(tmp_path: Path) -> None:
+    page = StatusPage()
+    control = DiagnosticsControl(registry=MetricsRegistry(), page=page)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        control.dump("stacks")
+        assert "Status:" not in messages[-1]
+        page.open(tmp_path / "app.status")
+        page.update(7)
+        control.dump("stacks")
+        assert "Status:\n" in messages[-1]
+        assert "iteration:   7" in messages[-1]
+    finally:
+        logger.remove(handler_id)
+        page.close()
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the frozen, slotted settings."""
+
+from __future__ import annotations
+
+import argparse
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.frozen_settings import (
+    FrozenSettings,
+    frozen_settings,
+    frozen_settings_class,
+)
+
+
+def test_frozen_settings() -> None:
+    settings = frozen_settings(argparse.Namespace(count=3, loglevel="INFO"))
+    assert settings.count == 3
+    assert "loglevel" in settings
+    assert "parser" not in settings
+    assert settings.as_dict() == {"count": 3, "loglevel": "INFO"}
+    assert not hasattr(settings, "__dict__")
+    assert repr(settings) == "FrozenSettings(count=3, loglevel='INFO')"
+
+
+def test_frozen_settings_are_immutable() -> None:
+    settings = frozen_settings(argparse.Namespace(count=3))
+    with pytest.raises(AttributeError, match="frozen"):
+        settings.count = 4
+    with pytest.raises(AttributeError, match="frozen"):
+        del settings.count
+
+
+def test_replace() -> None:
+    settings = frozen_settings(argparse.Namespace(count=3, loglevel="INFO"))
+    changed = settings.replace(loglevel="DEBUG")
+    assert changed.loglevel == "DEBUG"
+    assert settings.loglevel == "INFO"
+    assert changed != settings
+    assert changed.replace(loglevel="INFO") == settings
+    with pytest.raises(AttributeError, match="Unknown settings: colour"):
+        settings.replace(colour="red")
+
+
+def test_frozen_settings_class() -> None:
+    assert frozen_settings_class(("a", "b")) is frozen_settings_class(("a", "b"))
+    with pytest.raises(ValueError, match="must be identifiers"):
+        frozen_settings_class(("a-b",))
+    with pytest.raises(ValueError, match="must not shadow FrozenSettings attributes, use dest= for: replace, as_dict"):
+        frozen_settings_class(("count", "replace", "as_dict"))
+
+
+def test_application_settings() -> None:
+    application_settings = Settings(args=["--count", "2"])
+    assert application_settings.parser is None
+    with application_settings as settings:
+        assert isinstance(settings, FrozenSettings)
+        assert settings.count == 2
+        assert "parser" not in settings
+        assert application_settings.parser is not None
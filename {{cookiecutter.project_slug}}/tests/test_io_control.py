@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the streaming record input/output."""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.argument_types import size_arg
+from {{cookiecutter.project_slug}}.clibones.io_control import (
+    IOControl,
+    RecordWriter,
+    iter_batches,
+    iter_records,
+    open_input,
+    read_records,
+    write_records,
+)
+
+records = [f"record {index} {'x' * (index % 17)}".encode() for index in range(1000)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_iter_records_chunk_boundaries(chunk_size: int) -> None:
+    data = b"\n".join(records) + b"\n"
+    assert list(iter_records(io.BytesIO(data), chunk_size=chunk_size)) == records
+
+
+def test_iter_records_without_trailing_separator() -> None:
+    assert list(iter_records(io.BytesIO(b"a\0b\0c"), separator=b"\0", chunk_size=2)) == [b"a", b"b", b"c"]
+
+
+def test_iter_batches() -> None:
+    batches = list(iter_batches(records, 300))
+    assert [len(batch) for batch in batches] == [300, 300, 300, 100]
+    assert [record for batch in batches for record in batch] == records
+
+
+def test_record_writer_batches_writes() -> None:
+    fp = io.BytesIO()
+    with RecordWriter(fp, batch_size=100) as writer:
+        for record in records[:250]:
+            writer.write(record)
+        assert writer.records_written == 200
+    assert writer.records_written == 250
+    assert fp.getvalue() == b"\n".join(records[:250]) + b"\n"
+
+
+@pytest.mark.parametrize("extension", [".txt", ".gz"])
+def test_round_trip(extension: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / f"records{extension}"
+        settings = argparse.Namespace(
+            input="-",
+            output=str(output),
+            buffer_size=4096,
+            batch_size=64,
+            compress=None,
+            compress_level=None,
+            background_compression=False,
+            fsync=False,
+        )
+        with write_records(settings) as writer:
+            writer.write_batch(records)
+
+        if extension == ".gz":
+            assert gzip.decompress(output.read_bytes()).startswith(records[0])
+        settings.input = str(output)
+        assert list(read_records(settings)) == records
+
+
+def test_without_output_control(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # an application adding IOControl, but not OutputControl, has no --compress, --fsync, ...
+    monkeypatch.setattr(Settings, "add_controls", lambda _: [IOControl()])
+    output = tmp_path / "records.gz"
+    with Settings(args=["--count", "0", "--output", str(output)]) as settings, write_records(settings) as writer:
+        writer.write_batch(records)
+    # compressed as selected by the file extension
+    assert gzip.decompress(output.read_bytes()) == b"\n".join(records) + b"\n"
+
+
+def test_open_input_detects_gzip() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        # the magic number, not the extension, selects decompression
+        filepath = Path(tmp) / "compressed.dat"
+        filepath.write_bytes(gzip.compress(b"one\ntwo\n"))
+        with open_input(filepath) as fp:
+            assert fp.read() == b"one\ntwo\n"
+
+
+def test_size_arg() -> None:
+    assert size_arg("4096") == 4096
+    assert size_arg("64K") == 64 * 1024
+    assert size_arg("1.5m") == 3 * 512 * 1024
+    assert size_arg("2GiB") == 2 << 30
+    with pytest.raises(argparse.ArgumentTypeError):
+        size_arg("lots")
+    with pytest.raises(argparse.ArgumentTypeError, match="at least one byte"):
+        size_arg("0")
+    with pytest.raises(argparse.ArgumentTypeError, match="at least one byte"):
+        size_arg("0.5")
@@ -4,8 +4,11 @@
 
 from __future__ import annotations
 
+import resource
 import shutil
+import signal
 import tempfile
+import threading
 from importlib.metadata import version
 from pathlib import Path
 from typing import Any
@@ -23,6 +26,20 @@ def test_main_pyproject() -> None:
     assert main(["--count", "0"]) == 0
 
 
+@pytest.mark.usefixtures("_all_controls")
+def test_failed_validation_tears_down_controls() -> None:
+    threads = set(threading.enumerate())
+    handler = signal.getsignal(signal.SIGUSR1)
+    limits = resource.getrlimit(resource.RLIMIT_DATA)
+    # --count 11 fails the validation, after the watchdog, memory and diagnostics controls are set up
+    with pytest.raises(SystemExit) as e:
+        main(["--count", "11", "--timeout", "0.5", "--max-memory", "64G"])
+    assert e.value.code == 2
+    assert set(threading.enumerate()) <= threads
+    assert signal.getsignal(signal.SIGUSR1) is handler
+    assert resource.getrlimit(resource.RLIMIT_DATA) == limits
+
+
 def test_main_version(capsys: CaptureFixture[Any]) -> None:
     assert main(["--version"]) == 0
     captured = capsys.readouterr()
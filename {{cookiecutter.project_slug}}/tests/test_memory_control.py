@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the --max-memory budget and --memory-report."""
+
+from __future__ import annotations
+
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.memory_control import MemoryWatcher, current_rss, current_usage, peak_rss
+
+
+def test_rss() -> None:
+    assert current_rss() > 0
+    assert peak_rss() > 0
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="reads /proc/self/status")
+def test_usage_is_what_the_rlimit_counts() -> None:
+    before = current_usage("data")
+    # the allocation counts against RLIMIT_DATA and RLIMIT_AS whether or not its pages are resident
+    buffer = bytearray(256 << 20)
+    assert current_usage("data") - before >= 256 << 20
+    assert current_usage("as") >= current_usage("data")
+    del buffer
+
+
+def test_soft_limit_interrupts_gracefully() -> None:
+    with GracefulInterruptHandler() as handler:
+        watcher = MemoryWatcher(soft_limit=1, memory_rlimit="as", interval=0.01)
+        watcher.start()
+        deadline = time.monotonic() + 5
+        while not handler.interrupted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        watcher.stop()
+    assert watcher.triggered
+    assert handler.interrupted
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_max_memory_is_restored() -> None:
+    limits = resource.getrlimit(resource.RLIMIT_DATA)
+    assert main(["--count", "0", "--max-memory", "64G", "--memory-report"]) == 0
+    assert resource.getrlimit(resource.RLIMIT_DATA) == limits
+
+
+def test_max_memory_raises_memory_error() -> None:
+    code = (
+        "import resource\n"
+        "from {{cookiecutter.project_slug}}.clibones.memory_control import MemoryControl\n"
+        "MemoryControl()._limit(256 << 20, resource.RLIMIT_DATA)\n"
+        "bytearray(1 << 30)\n"
+    )
+    # the child imports the application from this test run's sys.path, it may not be installed
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=False, env=env)
+    assert result.returncode != 0
+    assert "MemoryError" in result.stderr
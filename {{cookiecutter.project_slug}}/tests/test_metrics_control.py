@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the metrics registry and --metrics-file export."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones.metrics_control import MetricsRegistry
+
+
+def test_counter_threads() -> None:
+    counter = MetricsRegistry().counter("items_total")
+
+    def work() -> None:
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 40000
+
+
+def test_histogram_buckets() -> None:
+    histogram = MetricsRegistry().histogram("latency_seconds", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    counts, total, count = histogram.totals()
+    assert counts == [2, 1, 1]
+    assert total == pytest.approx(2.65)
+    assert count == 4
+
+
+def test_prometheus_format() -> None:
+    registry = MetricsRegistry()
+    registry.counter("items_total", "Items").inc(3)
+    registry.gauge("queue_depth").set(7)
+    registry.histogram("latency_seconds", buckets=(0.1, 1.0)).observe(0.5)
+    text = registry.to_prometheus()
+    assert "# HELP items_total Items\n# TYPE items_total counter\nitems_total 3\n" in text
+    assert "queue_depth 7\n" in text
+    assert 'latency_seconds_bucket{le="0.1"} 0\nlatency_seconds_bucket{le="1.0"} 1\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1\nlatency_seconds_sum 0.5\nlatency_seconds_count 1\n' in text
+
+
+def test_registry_type_conflict() -> None:
+    registry = MetricsRegistry()
+    assert registry.counter("items_total") is registry.counter("items_total")
+    with pytest.raises(ValueError, match="already registered as a counter"):
+        registry.gauge("items_total")
+
+
+def test_registry_reset() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("items_total")
+    histogram = registry.histogram("latency_seconds", buckets=(0.1,))
+    counter.inc(3)
+    histogram.observe(0.5)
+    registry.gauge("queue_depth").set(7)
+    registry.reset()
+    assert counter.value == 0
+    assert histogram.totals() == ([0, 0], 0.0, 0)
+    assert registry.gauge("queue_depth").value == 0
+    # the metrics stay registered and usable
+    counter.inc()
+    assert registry.counter("items_total").value == 1
+
+
+def test_metrics_file() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_file = Path(tmp) / "metrics.json"
+        assert main(["--count", "0", "--metrics-file", str(metrics_file)]) == 0
+        data = json.loads(metrics_file.read_text())
+        assert data["example_iterations_total"]["type"] == "counter"
+        assert data["example_iteration_seconds"]["type"] == "histogram"
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the atomic, buffered output."""
+
+from __future__ import annotations
+
+import gzip
+import os
+import stat
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.output_control import (
+    AtomicOutput,
+    OutputControl,
+    ShardedOutput,
+    output_from_settings,
+    sharded_output_from_settings,
+)
+
+data = b"".join(f"line {index}\n".encode() for index in range(20000))
+
+
+def test_committed_file_mode(tmp_path: Path) -> None:
+    created = tmp_path / "created.txt"
+    replaced = tmp_path / "replaced.txt"
+    replaced.write_bytes(b"original")
+    replaced.chmod(0o604)
+
+    mask = os.umask(0o027)
+    try:
+        for path in (created, replaced):
+            with AtomicOutput(path) as out:
+                out.write(data)
+    finally:
+        os.umask(mask)
+    # a new file as open() would create it, replaced files keep their mode, rather than the temporary file's 0600
+    assert stat.S_IMODE(created.stat().st_mode) == 0o640
+    assert stat.S_IMODE(replaced.stat().st_mode) == 0o604
+
+
+@pytest.mark.parametrize("background", [False, True])
+@pytest.mark.parametrize("extension", [".txt", ".gz"])
+def test_atomic_output_commit(extension: str, background: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / f"output{extension}"
+        with AtomicOutput(filepath, buffer_size=1000, background=background) as out:
+            for start in range(0, len(data), 777):
+                out.write(data[start : start + 777])
+            assert not filepath.exists()
+        written = filepath.read_bytes()
+        assert (gzip.decompress(written) if extension == ".gz" else written) == data
+        assert list(Path(tmp).iterdir()) == [filepath]
+
+
+def test_atomic_output_discarded_on_error() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "output.gz"
+
+        def write_partial() -> None:
+            with AtomicOutput(filepath, background=True) as out:
+                out.write(data)
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            write_partial()
+        assert list(Path(tmp).iterdir()) == []
+
+
+def test_atomic_output_discarded_when_interrupted() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "output.txt"
+        filepath.write_bytes(b"previous run")
+        with GracefulInterruptHandler() as handler, AtomicOutput(filepath, handler=handler) as out:
+            out.write(data)
+            handler.interrupted = True
+        assert filepath.read_bytes() == b"previous run"
+
+
+def _write_shard(sharded: ShardedOutput, index: int) -> None:
+    with sharded.open_shard(index) as out:
+        out.write(f"shard {index}\n".encode() * 100)
+
+
+@pytest.mark.parametrize("extension", [".txt", ".gz"])
+def test_sharded_output_merges_in_order(extension: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / f"output{extension}"
+        with ShardedOutput(filepath, shards=3) as sharded, ProcessPoolExecutor(2) as executor:
+            list(executor.map(_write_shard, [sharded] * 3, [2, 0, 1]))
+        written = filepath.read_bytes()
+        expected = b"".join(f"shard {index}\n".encode() * 100 for index in range(3))
+        assert (gzip.decompress(written) if extension == ".gz" else written) == expected
+        assert list(Path(tmp).iterdir()) == [filepath]
+
+
+def test_sharded_output_missing_shard() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "output.txt"
+        with pytest.raises(ValueError, match="missing shards"), ShardedOutput(filepath, shards=2) as sharded:
+            _write_shard(sharded, 0)
+        assert list(Path(tmp).iterdir()) == []
+
+
+def test_without_io_control(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    # an application adding OutputControl, but not IOControl, has no --output
+    monkeypatch.setattr(Settings, "add_controls", lambda _: [OutputControl()])
+    with Settings(args=["--count", "0", "--compress", "gzip"]) as settings:
+        assert settings.compress == "gzip"
+        with pytest.raises(ValueError, match="requires an --output FILE"):
+            output_from_settings(settings)
+        with pytest.raises(ValueError, match="requires an --output FILE"):
+            sharded_output_from_settings(settings)
+    with pytest.raises(SystemExit) as exc_info, Settings(args=["--count", "0", "--shards", "2"]):
+        pass
+    assert exc_info.value.code == 2
+    assert "--shards requires an --output FILE" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the memory-mapped, chunk-parallel input processing."""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings, main
+from {{cookiecutter.project_slug}}.clibones.parallel_control import (
+    ParallelControl,
+    chunk_ranges,
+    map_chunks,
+    map_input_chunks,
+)
+
+data = b"".join(f"line {index} {'y' * (index % 23)}\n".encode() for index in range(5000))
+
+
+def count_lines(view: memoryview) -> int:
+    """worker function, must be at module level so it can be pickled."""
+    return view.tobytes().count(b"\n")
+
+
+def first_line(view: memoryview) -> bytes:
+    return view.tobytes().split(b"\n", 1)[0]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 4096, len(data) * 2])
+def test_chunk_ranges(chunk_size: int) -> None:
+    ranges = chunk_ranges(data, chunk_size)
+    assert b"".join(data[offset : offset + length] for offset, length in ranges) == data
+    for offset, length in ranges:
+        assert data[offset + length - 1 : offset + length] == b"\n"
+
+
+def test_chunk_ranges_without_trailing_separator() -> None:
+    assert chunk_ranges(b"a\nbb\nccc", 2) == [(0, 2), (2, 3), (5, 3)]
+
+
+def test_map_chunks() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "input.txt"
+        filepath.write_bytes(data)
+        assert sum(map_chunks(filepath, count_lines, jobs=2, chunk_size=4096)) == 5000
+        # results are returned in file order
+        firsts = list(map_chunks(filepath, first_line, jobs=2, chunk_size=4096))
+        assert firsts[0] == b"line 0 "
+        assert [int(line.split()[1]) for line in firsts] == sorted(int(line.split()[1]) for line in firsts)
+
+
+def test_map_chunks_empty_file() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "empty.txt"
+        filepath.touch()
+        assert list(map_chunks(filepath, count_lines)) == []
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_mmap_requires_input_file() -> None:
+    with pytest.raises(SystemExit):
+        main(["--count", "0", "--mmap"])
+
+
+def test_without_io_control(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    # an application adding ParallelControl, but not IOControl, has no --input
+    monkeypatch.setattr(Settings, "add_controls", lambda _: [ParallelControl()])
+    with Settings(args=["--count", "0", "--jobs", "2"]) as settings:
+        assert settings.jobs == 2
+        with pytest.raises(ValueError, match="requires a regular --input FILE"):
+            map_input_chunks(settings, count_lines)
+    with pytest.raises(SystemExit) as exc_info, Settings(args=["--count", "0", "--mmap"]):
+        pass
+    assert exc_info.value.code == 2
+    assert "--mmap requires a regular --input FILE" in capsys.readouterr().err
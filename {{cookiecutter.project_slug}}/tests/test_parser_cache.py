@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the parser spec cache, the cached fast path must parse exactly as argparse does."""
+
+from __future__ import annotations
+
+import argparse
+import marshal
+from typing import TYPE_CHECKING
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.argument_types import positive_int_arg
+from {{cookiecutter.project_slug}}.clibones.parser_cache import ParserCache, ParserSpec
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# arguments the fast path parses
+FAST_ARGS: list[list[str]] = [
+    [],
+    ["--count", "3"],
+    ["--count=3", "--count", "4"],
+    ["--input", "-", "--output", "out.txt", "--jobs", "2"],
+    ["--buffer-size", "1M", "--compress", "gzip", "--compress-level", "6"],
+    ["--timings"],
+    ["--timings", "json", "--loglevel", "DEBUG"],
+    ["--quiet", "--no-diagnostics", "--fsync", "--version"],
+    ["leftover", "--count", "2", "another"],
+    ["--timeout", "1.5", "--iteration-timeout=0.25", ""],
+    ["--metrics-file", "metrics.prom", "--trace", "trace.json", "--trace-buffer", "16"],
+]
+
+# arguments the fast path leaves to argparse
+FALLBACK_ARGS: list[list[str]] = [
+    ["--help"],
+    ["-h"],
+    ["--cou", "3"],
+    ["--unknown"],
+    ["--count"],
+    ["--count", "-1"],
+    ["--count", "x"],
+    ["--compress", "bzip2"],
+    ["--quiet=yes"],
+    ["--", "--count", "3"],
+    ["--jobs", "0"],
+]
+
+
+def _settings_parser() -> argparse.ArgumentParser:
+    application_settings = Settings(args=["--count", "0"])
+    parser, _, _ = application_settings.parse(["--count", "0"])
+    return parser
+
+
+def _round_trip(spec: ParserSpec) -> ParserSpec:
+    loaded = ParserSpec.from_dict(marshal.loads(marshal.dumps(spec.to_dict())))
+    assert loaded is not None
+    return loaded
+
+
+@pytest.fixture()
+def settings_parser(_all_controls: None) -> argparse.ArgumentParser:
+    return _settings_parser()
+
+
+@pytest.mark.parametrize("args", FAST_ARGS)
+def test_fast_path_matches_argparse(settings_parser: argparse.ArgumentParser, args: list[str]) -> None:
+    spec = _round_trip(ParserSpec.from_parser(settings_parser))
+    parsed = spec.parse_known_args(args)
+    assert parsed is not None
+    namespace, extras = parsed
+    expected_namespace, expected_extras = settings_parser.parse_known_args(args)
+    assert list(vars(namespace).items()) == list(vars(expected_namespace).items())
+    assert extras == expected_extras
+
+
+@pytest.mark.parametrize("args", FALLBACK_ARGS)
+def test_fallback(settings_parser: argparse.ArgumentParser, args: list[str]) -> None:
+    spec = _round_trip(ParserSpec.from_parser(settings_parser))
+    assert spec.parse_known_args(args) is None
+
+
+def test_argparse_details() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=positive_int_arg, default="8")
+    parser.add_argument("--mode", nargs="?", const="fast", default="slow", choices=["fast", "slow"])
+    parser.add_argument("--on", dest="switch", action="store_const", const="on")
+    parser.add_argument("--off", dest="switch", action="store_const", const="off")
+    parser.set_defaults(extra=1, size="16")
+    spec = _round_trip(ParserSpec.from_parser(parser))
+    for args in ([], ["--size", "2"], ["--mode"], ["--mode", "fast", "x"], ["--off"], ["--on", "--off", "--on"]):
+        parsed = spec.parse_known_args(args)
+        assert parsed is not None
+        assert list(vars(parsed[0]).items()) == list(vars(parser.parse_known_args(args)[0]).items())
+        assert parsed[1] == parser.parse_known_args(args)[1]
+
+
+def test_not_cacheable() -> None:
+    positional = argparse.ArgumentParser()
+    positional.add_argument("path")
+    assert not ParserSpec.from_parser(positional).cacheable
+
+    append = argparse.ArgumentParser()
+    append.add_argument("--tag", action="append")
+    assert not ParserSpec.from_parser(append).cacheable
+
+    local_type = argparse.ArgumentParser()
+    local_type.add_argument("--value", type=lambda value: value)
+    spec = _round_trip(ParserSpec.from_parser(local_type))
+    assert spec.parse_known_args(["--value", "1"]) is None
+
+
+def test_parser_cache(tmp_path: Path) -> None:
+    cache = ParserCache(tmp_path, "{{cookiecutter.project_slug}}")
+    key = cache.key({"count": 3})
+    assert key is not None
+    assert key == cache.key({"count": 3})
+    assert key != cache.key({"count": 4})
+    assert ParserCache(tmp_path, "not_imported").key({}) is None
+
+    assert cache.load(key) is None
+    cache.store(key, ParserSpec.from_parser(_settings_parser()))
+    loaded = cache.load(key)
+    assert loaded is not None
+    assert loaded.cacheable
+    other_key = cache.key({})
+    assert other_key is not None
+    cache.store(other_key, ParserSpec(None))
+    # a new spec replaces the old ones
+    assert cache.load(key) is None
+
+
+def test_warm_start(tmp_path: Path) -> None:
+    cold = Settings(args=["--count", "2"])
+    cold.parser_cache_dir = tmp_path
+    with cold as cold_settings:
+        assert cold._parser is not None
+    assert list(tmp_path.glob("parser-*.spec"))
+
+    warm = Settings(args=["--count", "2"])
+    warm.parser_cache_dir = tmp_path
+    with warm as warm_settings:
+        # parsed from the cached spec, the parser is only built when asked for
+        assert warm._parser is None
+        assert warm_settings == cold_settings
+        assert warm.parser is not None
+
+
+def test_cache_is_opt_in(tmp_path: Path) -> None:
+    application_settings = Settings(args=["--count", "2"])
+    assert application_settings.parser_cache_dir is None
+    with application_settings:
+        assert application_settings._parser is not None
+    assert not list(tmp_path.rglob("parser-*.spec"))
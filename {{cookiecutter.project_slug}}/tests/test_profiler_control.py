@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the --profile control."""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones.profiler_control import collapsed_cpu_stacks
+
+COLLAPSED_LINE = re.compile(r"^\S.* \d+$")
+
+
+def _fib(n: int) -> int:
+    return n if n < 2 else _fib(n - 1) + _fib(n - 2)
+
+
+def _outer() -> int:
+    return sum(_fib(18) for _ in range(3))
+
+
+def test_collapsed_cpu_stacks() -> None:
+    profiler = cProfile.Profile()
+    profiler.runcall(_outer)
+    stacks = collapsed_cpu_stacks(pstats.Stats(profiler))
+    fib_stacks = [stack for stack in stacks if stack.split(";")[-1].startswith("_fib ")]
+    assert fib_stacks
+    # recursion is folded, so _fib appears once below _outer
+    assert all(stack.count("_fib ") == 1 and "_outer " in stack for stack in fib_stacks)
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_profile_cpu() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "run.pstats"
+        assert main(["--count", "0", "--profile", "cpu", "--profile-out", str(out)]) == 0
+        assert sys.getprofile() is None
+        assert pstats.Stats(str(out)).total_calls > 0  # type: ignore[attr-defined]
+        lines = Path(f"{out}.collapsed").read_text().splitlines()
+        assert lines
+        assert all(COLLAPSED_LINE.match(line) for line in lines)
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_profile_memory() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "run.txt"
+        assert main(["--count", "0", "--profile", "memory", "--profile-out", str(out), "--profile-top", "3"]) == 0
+        report = out.read_text()
+        assert "Peak traced memory" in report
+        assert len(re.findall(r"^ +\d+\. ", report, re.MULTILINE)) <= 3
+        assert Path(f"{out}.collapsed").exists()
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_no_profile_by_default() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        assert main(["--count", "0", "--profile-out", str(Path(tmp) / "unused")]) == 0
+        assert list(Path(tmp).iterdir()) == []
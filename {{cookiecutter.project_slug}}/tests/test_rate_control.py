@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the rate limiting token bucket and fixed rate scheduler."""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings, main
+from {{cookiecutter.project_slug}}.clibones.clock import VirtualClock
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.rate_control import RATE, TokenBucket, fixed_rate
+
+
+def test_token_bucket_burst(virtual_clock: VirtualClock) -> None:
+    bucket = TokenBucket(rate=10.0, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.delay() == pytest.approx(0.1)
+    virtual_clock.advance(0.1)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    # an idle period refills the bucket, but only up to the burst
+    virtual_clock.advance(10.0)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_token_bucket_configure() -> None:
+    bucket = TokenBucket()
+    assert bucket.unlimited
+    assert all(bucket.try_acquire() for _ in range(1000))
+    assert bucket.delay() == 0
+    with pytest.raises(ValueError, match="must not be negative"):
+        bucket.configure(-1.0)
+    with pytest.raises(ValueError, match="at least 1"):
+        bucket.configure(1.0, 0)
+    split = TokenBucket(rate=8.0, burst=4).split(4)
+    assert (split.rate, split.burst) == (2.0, 1)
+
+
+def test_acquire_paces_without_drift(virtual_clock: VirtualClock) -> None:
+    bucket = TokenBucket(rate=100.0)
+    start = virtual_clock.monotonic()
+    for _ in range(21):
+        assert bucket.acquire()
+        # the work between operations does not add to the interval, which would take 0.3 seconds
+        virtual_clock.advance(0.005)
+    assert virtual_clock.monotonic() - start == pytest.approx(0.205)
+
+
+def test_acquire_interrupted() -> None:
+    bucket = TokenBucket(rate=0.1)
+    assert bucket.try_acquire()
+    with GracefulInterruptHandler() as handler:
+        threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGINT)).start()
+        start = time.monotonic()
+        assert not bucket.acquire(handler=handler)
+        assert time.monotonic() - start < 1.0
+        assert handler.interrupted
+
+
+def test_fixed_rate(virtual_clock: VirtualClock) -> None:
+    start = virtual_clock.monotonic()
+    ticks = []
+    for tick in fixed_rate(10.0, jitter=0.2):
+        assert tick * 10.0 <= virtual_clock.monotonic() - start < (tick + 0.2) * 10.0
+        ticks.append(tick)
+        if tick == 2:
+            # a slow iteration skips the missed ticks
+            virtual_clock.advance(35.0)
+        if len(ticks) == 6:
+            break
+    assert ticks == [0, 1, 2, 6, 7, 8]
+    with pytest.raises(ValueError, match="jitter"):
+        next(fixed_rate(1.0, jitter=1.0))
+
+
+def test_fixed_rate_interrupted() -> None:
+    with GracefulInterruptHandler() as handler:
+        threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGINT)).start()
+        assert list(fixed_rate(10.0, handler=handler)) == [0]
+
+
+def test_rate_settings() -> None:
+    application_settings = Settings(args=["--rate", "50", "--burst", "5"])
+    with application_settings as settings:
+        assert (settings.rate, settings.burst) == (50.0, 5)
+        assert (RATE.rate, RATE.burst) == (50.0, 5)
+    assert RATE.unlimited
+    with pytest.raises(SystemExit):
+        main(["--rate", "-1"])
+
+
+def test_example_rate(virtual_clock: VirtualClock) -> None:
+    start = virtual_clock.monotonic()
+    assert main(["--count", "3", "--rate", "100"]) == 0
+    assert virtual_clock.monotonic() - start == pytest.approx(0.02)
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the resource placement control."""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings, main
+from {{cookiecutter.project_slug}}.clibones.argument_types import cpu_list_arg
+from {{cookiecutter.project_slug}}.clibones.resource_control import (
+    NATIVE_THREAD_VARIABLES,
+    format_cpu_list,
+    partition_cpus,
+    pinned_workers,
+)
+
+
+def _settings(args: list[str]) -> Settings:
+    return Settings(args=args)
+
+
+def _affinity() -> list[int]:
+    return sorted(os.sched_getaffinity(0))
+
+
+def _niceness(args: list[str]) -> None:
+    with _settings(args):
+        os._exit(os.nice(0))
+
+
+def test_cpu_list_arg() -> None:
+    assert cpu_list_arg("0-3,8, 10-11,2") == (0, 1, 2, 3, 8, 10, 11)
+    assert format_cpu_list(cpu_list_arg("0-3,8,10-11")) == "0-3,8,10-11"
+    for value in ("", "a", "3-1", "-1", "1-"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            cpu_list_arg(value)
+
+
+def test_partition_cpus() -> None:
+    assert partition_cpus(range(8), 3) == [(0, 1, 2), (3, 4, 5), (6, 7)]
+    assert partition_cpus([4, 5], 3) == [(4,), (5,), (4,)]
+
+
+def test_pinned_workers() -> None:
+    cpus = _affinity()
+    jobs = min(2, len(cpus))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(jobs, mp_context=context, **pinned_workers(jobs, context)) as executor:
+        affinities = {tuple(affinity) for affinity in executor.map(_affinity_of, range(jobs * 4))}
+    assert affinities <= {tuple(partition) for partition in partition_cpus(cpus, jobs)}
+
+
+def _affinity_of(_: int) -> list[int]:
+    return _affinity()
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_placement(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    before = _affinity()
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    monkeypatch.setenv("MKL_NUM_THREADS", "8")
+    with _settings(["--cpus", str(before[0]), "--native-threads", "2"]) as settings:
+        assert _affinity() == [before[0]]
+        assert settings.jobs == 1
+        assert all(os.environ[name] == "2" for name in NATIVE_THREAD_VARIABLES)
+    assert f"Resource placement: cpus {before[0]}, native threads 2" in capsys.readouterr().out
+    assert _affinity() == before
+    assert "OMP_NUM_THREADS" not in os.environ
+    assert os.environ["MKL_NUM_THREADS"] == "8"
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_nice() -> None:
+    process = multiprocessing.get_context("fork").Process(target=_niceness, args=(["--nice", "3"],))
+    process.start()
+    process.join()
+    assert process.exitcode == os.nice(0) + 3
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_validation() -> None:
+    for args in (["--nice", "20"], ["--nice", "-1"], ["--cpus", "100000"]):
+        with pytest.raises(SystemExit):
+            main(args)
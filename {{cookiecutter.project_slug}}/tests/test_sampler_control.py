@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the --sample-profile sampling profiler."""
+
+from __future__ import annotations
+
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones.sampler_control import DROPPED_STACK, StackSampler
+
+
+def _busy(seconds: float) -> int:
+    total = 0
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        total += sum(range(1000))
+    return total
+
+
+def test_stack_sampler() -> None:
+    previous = signal.getsignal(signal.SIGPROF)
+    sampler = StackSampler(rate=500)
+    sampler.start()
+    try:
+        _busy(0.3)
+    finally:
+        sampler.stop()
+    assert signal.getsignal(signal.SIGPROF) == previous
+    assert sampler.samples > 0
+    stacks = sampler.collapsed()
+    assert sum(stacks.values()) == sampler.samples
+    assert any("_busy (test_sampler_control.py:" in stack for stack in stacks)
+
+
+def test_stack_sampler_bounded() -> None:
+    sampler = StackSampler(max_stacks=1)
+    sampler._sample(signal.SIGPROF, None)
+    sampler._sample(signal.SIGPROF, None)
+    # a new distinct stack beyond max_stacks is only counted as dropped
+    sampler._sample(signal.SIGPROF, sys._getframe())
+    assert sampler.counts == {(): 2}
+    assert sampler.collapsed() == {"": 2, DROPPED_STACK: 1}
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_sample_profile_from_config_file() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "samples.collapsed"
+        config = Path(tmp) / "config.toml"
+        config.write_text(f'[{{cookiecutter.project_slug}}]\nsample_profile = "{out}"\nsample_rate = 250\n')
+        assert main(["--count", "0", "--config", str(config)]) == 0
+        assert out.exists()
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the prewarmed server mode (--serve SOCKET) and its thin client."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Generator
+from importlib.metadata import version
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.clibones import config_file, server_client
+from {{cookiecutter.project_slug}}.clibones.config_file import ConfigFile
+from {{cookiecutter.project_slug}}.clibones.server_control import ServerControl
+
+SERVER_START_TIMEOUT = 20.0
+
+
+@pytest.fixture()
+def server_socket() -> Generator[Path, None, None]:
+    """Start the application as a server, yielding its socket path."""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = Path(tmp) / "server.sock"
+        process = subprocess.Popen(
+            [sys.executable, "-m", "{{cookiecutter.project_slug}}", "--serve", str(socket_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # the child imports the application from this test run's sys.path, it may not be installed
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        try:
+            deadline = time.monotonic() + SERVER_START_TIMEOUT
+            while not socket_path.exists():
+                assert process.poll() is None, "server exited early"
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.05)
+            yield socket_path
+        finally:
+            process.send_signal(signal.SIGINT)
+            assert process.wait(timeout=SERVER_START_TIMEOUT) == 0
+        assert not socket_path.exists()
+
+
+def run_client(socket_path: Path, argv: list[str]) -> tuple[int, str, str]:
+    """Run a request with the client, returning the exit code, stdout, and stderr."""
+    with tempfile.TemporaryFile() as out_fp, tempfile.TemporaryFile() as err_fp, Path("/dev/null").open() as in_fp:
+        exit_code = server_client.run(str(socket_path), argv, fds=(in_fp.fileno(), out_fp.fileno(), err_fp.fileno()))
+        out_fp.seek(0)
+        err_fp.seek(0)
+        return exit_code, out_fp.read().decode(), err_fp.read().decode()
+
+
+def test_server_version(server_socket: Path) -> None:
+    exit_code, out, _ = run_client(server_socket, ["--version"])
+    assert exit_code == 0
+    assert version("{{cookiecutter.project_slug}}") in out
+
+
+def test_server_repeated_requests(server_socket: Path) -> None:
+    for _ in range(3):
+        exit_code, out, _ = run_client(server_socket, ["--count", "0"])
+        assert exit_code == 0
+        assert "'count': 0" in out
+
+
+def test_server_argument_error(server_socket: Path) -> None:
+    exit_code, _, err = run_client(server_socket, ["--loglevel", "1"])
+    assert exit_code == 2
+    assert "error: argument --loglevel:" in err
+
+
+def test_client_without_server() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        exit_code = server_client.main([str(Path(tmp) / "missing.sock"), "--version"])
+        assert exit_code == server_client.CONNECTION_LOST_EXIT_CODE
+
+
+def _config_file(tmp_path: Path) -> Path:
+    path = tmp_path / "config.toml"
+    path.write_text("[{{cookiecutter.project_slug}}]\ncount = 2\n")
+    return path
+
+
+def test_config_file_not_cached(tmp_path: Path) -> None:
+    path = _config_file(tmp_path)
+    ServerControl().setup(argparse.Namespace(serve=None, config_file=path, quick_exit=False))
+    assert ConfigFile().load(path) == {"{{cookiecutter.project_slug}}": {"count": 2}}
+    assert config_file._load_cache is None
+
+
+def test_config_file_cached_when_serving(tmp_path: Path) -> None:
+    path = _config_file(tmp_path)
+    ServerControl().setup(argparse.Namespace(serve=str(tmp_path / "server.sock"), config_file=path, quick_exit=False))
+    assert path in (config_file._load_cache or {})
+    # the requests get a copy of the parsed data
+    data = ConfigFile().load(path)
+    data["{{cookiecutter.project_slug}}"]["count"] = 3
+    assert ConfigFile().load(path) == {"{{cookiecutter.project_slug}}": {"count": 2}}
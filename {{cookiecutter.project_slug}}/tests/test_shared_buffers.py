@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the shared memory payload handoff."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from {{cookiecutter.project_slug}}.clibones.shared_buffers import SharedBuffer, SharedBuffers, attach
+
+
+def _checksum(handle: SharedBuffer) -> tuple[int, int]:
+    with attach(handle) as view:
+        return len(view), zlib.crc32(view)
+
+
+def _exists(handle: SharedBuffer) -> bool:
+    try:
+        SharedMemory(handle.name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_put_and_attach() -> None:
+    payload = bytes(range(256)) * 4099
+    with SharedBuffers() as buffers:
+        handle = buffers.put(payload)
+        assert handle.nbytes == len(payload)
+        assert len(pickle.dumps(handle)) < 200
+        with ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn")) as executor:
+            assert executor.submit(_checksum, handle).result() == (len(payload), zlib.crc32(payload))
+        assert len(buffers) == 1
+    assert len(buffers) == 0
+    assert not _exists(handle)
+
+
+def test_create_in_place() -> None:
+    with SharedBuffers() as buffers:
+        handle = buffers.create(8)
+        with buffers.view(handle) as view:
+            view[:] = b"abcdefgh"
+        with attach(handle) as view:
+            assert bytes(view) == b"abcdefgh"
+        buffers.release(handle)
+        assert not _exists(handle)
+        # releasing twice is harmless
+        buffers.release(handle)
+        with pytest.raises(ValueError, match="must not be empty"):
+            buffers.create(0)
+
+
+def test_put_typed_buffer() -> None:
+    with SharedBuffers() as buffers:
+        numbers = memoryview(bytearray(8 * 3)).cast("d")
+        numbers[1] = 2.5
+        handle = buffers.put(numbers)
+        with attach(handle) as view:
+            assert view.cast("d").tolist() == [0.0, 2.5, 0.0]
+
+
+def test_released_at_exit() -> None:
+    # an application that exits with blocks still allocated, the atexit hook unlinks them
+    code = "\n".join(
+        [
+            "from {{cookiecutter.project_slug}}.clibones.shared_buffers import SHARED_BUFFERS",
+            "print(SHARED_BUFFERS.put(b'payload').name)",
+        ]
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert not _exists(SharedBuffer(result.stdout.strip(), 7))
+    assert "leaked" not in result.stderr
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the memory-mapped status page."""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+from typing import TYPE_CHECKING
+
+import pytest
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.__main__ import Settings, main
+from {{cookiecutter.project_slug}}.clibones.status_control import (
+    STATUS_SEQUENCE_OFFSET,
+    STATUS_SUBCOMMAND,
+    StatusControl,
+    StatusPage,
+    read_status,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from {{cookiecutter.project_slug}}.clibones.subcommands import Subcommand
+
+
+def test_status_page(tmp_path: Path) -> None:
+    path = tmp_path / "app.status"
+    page = StatusPage()
+    page.update(1)  # not open, ignored
+    page.open(path)
+    try:
+        status = read_status(path)
+        assert status.phase == "running"
+        assert status.iteration == 0
+        assert status.consistent
+
+        page.update(3, interrupted=True)
+        status = read_status(path)
+        assert status.iteration == 3
+        assert status.interrupted
+        assert status.heartbeat >= status.start_time
+        assert status.throughput > 0
+        assert "iteration:   3" in status.format()
+    finally:
+        page.close(phase="exited")
+    assert not page.enabled
+    assert read_status(path).phase == "exited"
+
+
+def test_read_status_while_updating(tmp_path: Path) -> None:
+    path = tmp_path / "app.status"
+    page = StatusPage()
+    page.open(path)
+    page.close()
+    # a writer that died mid-update leaves an odd sequence number
+    with path.open("r+b") as fp, mmap.mmap(fp.fileno(), 0) as mapping:
+        mapping[STATUS_SEQUENCE_OFFSET] |= 1
+    status = read_status(path)
+    assert not status.consistent
+    assert "inconsistent" in status.format()
+
+
+def test_read_status_not_a_status_file(tmp_path: Path) -> None:
+    path = tmp_path / "other"
+    path.write_bytes(b"x" * 256)
+    with pytest.raises(ValueError, match="not a status file"):
+        read_status(path)
+
+
+def test_status_control(tmp_path: Path) -> None:
+    path = tmp_path / "app.status"
+    page = StatusPage()
+    control = StatusControl(page=page)
+    control.setup(argparse.Namespace(status_file=str(path), show_status=None, quick_exit=False))
+    assert page.enabled
+    page.update(7)
+
+    settings = argparse.Namespace(status_file=None, show_status=str(path), quick_exit=False)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        StatusControl(page=StatusPage()).setup(settings)
+    finally:
+        logger.remove(handler_id)
+    assert settings.quick_exit
+    assert "iteration:   7" in "".join(messages)
+
+    control.teardown()
+    assert read_status(path).phase == "exited"
+
+
+def test_show_status_of_a_missing_file(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--show-status", str(tmp_path / "app.status")])
+    assert exc_info.value.code == 1
+
+
+def test_status_subcommand(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def add_subcommands(_: Settings) -> list[Subcommand]:
+        return [STATUS_SUBCOMMAND]
+
+    monkeypatch.setattr(Settings, "add_subcommands", add_subcommands)
+    path = tmp_path / "app.status"
+    page = StatusPage()
+    page.open(path)
+    page.update(7)
+    application_settings = Settings(args=["status", str(path)])
+    try:
+        with application_settings as settings:
+            messages: list[str] = []
+            handler_id = logger.add(messages.append, format="{message}")
+            try:
+                assert application_settings.run_subcommand(settings) == 0
+            finally:
+                logger.remove(handler_id)
+    finally:
+        page.close()
+    assert "iteration:   7" in "".join(messages)
+    assert main(["status", str(tmp_path / "missing.status")]) == 1
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the lazily loaded subcommands, only the selected subcommand's module may be imported."""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from {{cookiecutter.project_slug}}.__main__ import Settings
+from {{cookiecutter.project_slug}}.clibones.subcommands import Subcommand
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+SUBCOMMAND_COUNT = 50
+
+SUBCOMMAND_SOURCE = """
+import argparse
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--size", type=int, default=1)
+
+
+def validate_arguments(settings: argparse.Namespace) -> list[str]:
+    return ["--size must not be negative"] if settings.size < 0 else []
+
+
+def main(settings) -> int:
+    return settings.size
+"""
+
+
+class SubcommandSettings(Settings):
+    def add_subcommands(self) -> list[Subcommand]:
+        return [
+            Subcommand(f"sub{index:02d}", f"lazy_commands.sub_{index:02d}", f"subcommand {index}")
+            for index in range(SUBCOMMAND_COUNT)
+        ]
+
+
+def _imported() -> list[str]:
+    return sorted(name for name in sys.modules if name.startswith("lazy_commands.sub_"))
+
+
+@pytest.fixture()
+def _lazy_commands(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    package = tmp_path / "lazy_commands"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    for index in range(SUBCOMMAND_COUNT):
+        (package / f"sub_{index:02d}.py").write_text(SUBCOMMAND_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in [name for name in sys.modules if name.startswith("lazy_commands")]:
+        monkeypatch.delitem(sys.modules, name)
+    yield
+    for name in [name for name in sys.modules if name.startswith("lazy_commands")]:
+        del sys.modules[name]
+
+
+def _settings(args: list[str]) -> SubcommandSettings:
+    return SubcommandSettings(args=args)
+
+
+@pytest.mark.usefixtures("_lazy_commands")
+def test_only_selected_subcommand_is_imported() -> None:
+    application_settings = _settings(["sub07", "--size", "3"])
+    with application_settings as settings:
+        assert _imported() == ["lazy_commands.sub_07"]
+        assert settings.subcommand == "sub07"
+        assert settings.size == 3
+        assert application_settings.subcommand == Subcommand("sub07", "lazy_commands.sub_07", "subcommand 7")
+        assert application_settings.run_subcommand(settings) == 3
+
+
+@pytest.mark.usefixtures("_lazy_commands")
+def test_no_subcommand() -> None:
+    application_settings = _settings(["--count", "2"])
+    with application_settings as settings:
+        assert _imported() == []
+        assert settings.subcommand is None
+        assert application_settings.subcommand is None
+        with pytest.raises(ValueError, match="No subcommand"):
+            application_settings.run_subcommand(settings)
+
+
+@pytest.mark.usefixtures("_lazy_commands")
+def test_help_lists_subcommands(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit) as exc_info, _settings(["--help"]):
+        pass
+    assert exc_info.value.code == 0
+    help_text = capsys.readouterr().out
+    assert "sub00" in help_text
+    assert "subcommand 49" in help_text
+    assert _imported() == []
+
+
+@pytest.mark.usefixtures("_lazy_commands")
+def test_subcommand_validation() -> None:
+    with pytest.raises(SystemExit) as exc_info, _settings(["sub01", "--size", "-1"]):
+        pass
+    assert exc_info.value.code == 2
+    assert _imported() == ["lazy_commands.sub_01"]
+
+
+@pytest.mark.usefixtures("_lazy_commands")
+def test_unknown_subcommand() -> None:
+    with pytest.raises(SystemExit) as exc_info, _settings(["sub99"]):
+        pass
+    assert exc_info.value.code == 2
+    assert _imported() == []
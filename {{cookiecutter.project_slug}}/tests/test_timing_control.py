@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the --timings startup phase timing."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones import timing_control
+from {{cookiecutter.project_slug}}.clibones.timing_control import PhaseTimer
+
+if TYPE_CHECKING:
+    import pytest
+    from _pytest.capture import CaptureFixture
+
+PHASES = [
+    "import",
+    "settings init",
+    "config pre-parse",
+    "config load",
+    "parser construction",
+    "parse_known_args",
+    "save_config_file",
+    "LoggerControl.setup",
+    "InfoControl.setup",
+    "controls setup",
+    "validation",
+]
+
+
+def test_phase_timer() -> None:
+    timer = PhaseTimer(start_ns=0)
+    timer.mark("first")
+    timer.mark("second")
+    assert [phase for phase, _ in timer.phases] == ["first", "second"]
+    assert timer.total_ns == sum(elapsed for _, elapsed in timer.phases)
+
+
+def _json_timings(capsys: CaptureFixture[Any]) -> dict[str, Any]:
+    assert main(["--count", "0", "--timings", "json"]) == 0
+    timings: dict[str, Any] = json.loads(capsys.readouterr().err.splitlines()[-1])
+    return timings
+
+
+def test_timings_json(monkeypatch: pytest.MonkeyPatch, capsys: CaptureFixture[Any]) -> None:
+    # as if the settings context were the first of the process
+    monkeypatch.setattr(timing_control, "_import_timed", False)
+    timings = _json_timings(capsys)
+    assert [phase["phase"] for phase in timings["phases"]] == PHASES
+    assert timings["total_ms"] >= sum(phase["ms"] for phase in timings["phases"][1:])
+
+
+def test_import_phase_only_in_the_first_context(monkeypatch: pytest.MonkeyPatch, capsys: CaptureFixture[Any]) -> None:
+    monkeypatch.setattr(timing_control, "_import_timed", False)
+    first = _json_timings(capsys)
+    second = _json_timings(capsys)
+    assert first["phases"][0]["phase"] == "import"
+    # the second context imported nothing, its timing starts when it is created
+    assert [phase["phase"] for phase in second["phases"]] == PHASES[1:]
+
+
+def test_timings_table(capsys: CaptureFixture[Any]) -> None:
+    assert main(["--count", "0", "--timings"]) == 0
+    table = capsys.readouterr().err
+    assert all(f"\n{phase} " in table for phase in PHASES[1:])
+    assert "\ntotal " in table
+
+
+def test_no_timings_by_default(capsys: CaptureFixture[Any]) -> None:
+    assert main(["--count", "0"]) == 0
+    assert "parse_known_args" not in capsys.readouterr().err
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the --trace span tracing."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.__main__ import main
+from {{cookiecutter.project_slug}}.clibones.trace_control import TRACER, TraceControl, Tracer, span, traced
+
+
+def test_span_nesting() -> None:
+    tracer = Tracer(capacity=16)
+    tracer.enabled = True
+    with tracer.span("outer"), tracer.span("inner"):
+        pass
+    inner, outer = sorted(tracer.events(), key=lambda event: event["name"])
+    assert inner["args"]["parent"] == outer["args"]["id"]
+    assert outer["args"]["parent"] == 0
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_ring_buffer_keeps_most_recent() -> None:
+    tracer = Tracer(capacity=4)
+    tracer.enabled = True
+    for index in range(10):
+        with tracer.span(f"span {index}"):
+            pass
+    assert tracer.dropped == 6
+    assert [event["name"] for event in tracer.events()] == [f"span {index}" for index in range(6, 10)]
+
+
+def test_disabled_is_a_no_op() -> None:
+    @traced
+    def double(value: int) -> int:
+        return value * 2
+
+    assert not TRACER.enabled
+    with span("unused"):
+        assert double(2) == 4
+    assert TRACER.recorded == 0
+
+
+@pytest.mark.usefixtures("_all_controls")
+def test_trace_file() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_file = Path(tmp) / "trace.json"
+        assert main(["--count", "0", "--trace", str(trace_file)]) == 0
+        events = {event["name"]: event for event in json.loads(trace_file.read_text())["traceEvents"]}
+        assert events["parse_known_args"]["args"]["parent"] == events["ApplicationSettings.parse"]["args"]["id"]
+        assert (
+            events["ApplicationSettings.parse"]["args"]["parent"]
+            == events["ApplicationSettings.__enter__"]["args"]["id"]
+        )
+        assert all(event["ts"] >= 0 for event in events.values())
+        assert "application" in events
+        assert not TRACER.enabled
+        # the spans are not left in the tracer after the run
+        assert TRACER.recorded == 0
+
+
+def test_teardown_logs_the_spans_written(tmp_path: Path) -> None:
+    path = tmp_path / "trace.json"
+    tracer = Tracer(capacity=2)
+    control = TraceControl(tracer=tracer)
+    control.setup(argparse.Namespace(trace=str(path), trace_buffer=2, quick_exit=False))
+    for name in ("first", "second", "third"):
+        with tracer.span(name):
+            pass
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="DEBUG", format="{message}")
+    try:
+        control.teardown()
+    finally:
+        logger.remove(handler_id)
+    # the ring buffer kept the two most recent of the three spans
+    assert f"Wrote 2 spans to {path}\n" in messages
+    assert len(json.loads(path.read_text())["traceEvents"]) == 2
+    assert control.path is None
+    assert tracer.recorded == 0
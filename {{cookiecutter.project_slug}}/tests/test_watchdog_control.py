@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2024 Roy Wright
+#
+# SPDX-License-Identifier: MIT
+
+"""tests for the watchdog timeouts."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from {{cookiecutter.project_slug}}.clibones.graceful_interrupt_handler import GracefulInterruptHandler
+from {{cookiecutter.project_slug}}.clibones.watchdog_control import WATCHDOG_EXIT_CODE, Watchdog, WatchdogControl
+
+
+def _settings(timeout: float = 0.0, iteration_timeout: float = 0.0, grace: float = 10.0) -> argparse.Namespace:
+    return argparse.Namespace(
+        timeout=timeout, iteration_timeout=iteration_timeout, timeout_grace=grace, quick_exit=False
+    )
+
+
+def test_expired() -> None:
+    watchdog = Watchdog()
+    watchdog.timeout, watchdog.iteration_timeout = 10.0, 1.0
+    start = watchdog.start_time
+    assert watchdog.expired(start + 0.5) is None
+    assert "--iteration-timeout" in str(watchdog.expired(start + 2))
+    watchdog.last_kick = start + 9
+    assert watchdog.expired(start + 9.5) is None
+    assert "--timeout" in str(watchdog.expired(start + 11))
+
+
+def test_timeout_interrupts_then_exits() -> None:
+    exit_codes: list[int] = []
+    watchdog = Watchdog(exit_func=exit_codes.append)
+    control = WatchdogControl(watchdog=watchdog)
+    with GracefulInterruptHandler() as handler:
+        control.setup(_settings(timeout=0.1, grace=0.2))
+        try:
+            deadline = time.monotonic() + 5
+            while not handler.interrupted and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert handler.interrupted
+            # ignore the interrupt, the watchdog then exits
+            while not exit_codes and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert exit_codes == [WATCHDOG_EXIT_CODE]
+        finally:
+            control.teardown()
+
+
+def test_kicked_iterations_do_not_time_out() -> None:
+    exit_codes: list[int] = []
+    watchdog = Watchdog(exit_func=exit_codes.append)
+    control = WatchdogControl(watchdog=watchdog)
+    with GracefulInterruptHandler() as handler:
+        control.setup(_settings(iteration_timeout=0.2))
+        try:
+            for _ in range(10):
+                time.sleep(0.03)
+                watchdog.kick()
+            assert not handler.interrupted
+            assert watchdog.interrupted_at is None
+            assert exit_codes == []
+        finally:
+            control.teardown()
+
+
+def test_validate_arguments() -> None:
+    control = WatchdogControl(watchdog=Watchdog())
+    assert control.validate_arguments(_settings(timeout=1.0)) == []
+    errors = control.validate_arguments(_settings(timeout=-1.0, grace=-1.0))
+    assert len(errors) == 2
+    assert errors[1].startswith("--timeout-grace")